@@ -3,16 +3,63 @@ import subprocess
 import os
 import re
 import json
+import selectors
+import time
+import logging
+import threading
+import queue
+import collections
+import shutil
+import gzip
+import zlib
+import stat
+import sys
+import io
+import zipfile
+import uuid
+import hashlib
+import atexit
+import http.cookiejar
+from urllib.parse import unquote, quote
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
+from operator import itemgetter
+
+import requests
+import yt_dlp
+from urllib3.fields import RequestField
+from urllib3.filepost import choose_boundary
+from flask import Flask, render_template, stream_template, get_flashed_messages, request, send_from_directory, flash, url_for, Response, redirect, session, jsonify, g
+from werkzeug.security import safe_join
+from werkzeug.utils import secure_filename
+from jinja2 import FileSystemBytecodeCache, FileSystemLoader
+
+# orjson is optional; the history log and the progress stream fall back to
+# the stdlib json module
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _json_line(entry):
+    """Serialize one history entry as an NDJSON line (bytes)."""
+    if orjson is not None:
+        return orjson.dumps(entry) + b"\n"
+    return json.dumps(entry).encode("utf-8") + b"\n"
+
+
+def _json_loads(data):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
 
 def save_to_gofile_history(filename, download_page, size, file_id=None, direct_link=None):
-    """Save upload info to local history file"""
+    """Append upload info to the local NDJSON history log"""
+    global _gofile_history_lines
     try:
-        import time
-        history = []
-        if os.path.exists(GOFILE_HISTORY_FILE):
-            with open(GOFILE_HISTORY_FILE, 'r') as f:
-                history = json.load(f)
-        
         entry = {
             "name": filename,
             "link": download_page,
@@ -22,36 +69,112 @@ def save_to_gofile_history(filename, download_page, size, file_id=None, direct_l
             "createTime": int(time.time()),
             "type": "file"
         }
-        # Avoid duplicates
-        if not any(item.get("link") == download_page for item in history):
-            history.insert(0, entry) # Newest first
-            # Keep last 100 uploads
-            history = history[:100]
-            with open(GOFILE_HISTORY_FILE, 'w') as f:
-                json.dump(history, f, indent=4)
+        with _gofile_history_lock:
+            # Avoid duplicates
+            if download_page in _gofile_history_links:
+                return
+            _remember_gofile_entry(entry)
+            with open(GOFILE_HISTORY_FILE, 'ab') as f:
+                f.write(_json_line(entry))
+            _gofile_history_lines += 1
+            # Rewrite the log only once it holds twice what we keep in memory
+            if _gofile_history_lines > 2 * GOFILE_HISTORY_LIMIT:
+                _compact_gofile_history()
     except Exception as e:
         print(f"Error saving to Gofile history: {e}")
 
-import threading
-import queue
-import shutil
-import sys
-from urllib.parse import unquote, quote
-from datetime import timedelta
-import requests
+
+def _remember_gofile_entry(entry):
+    """Put an entry at the front of the in-memory history (newest first)."""
+    if len(_gofile_history) == _gofile_history.maxlen:
+        _gofile_history_links.discard(_gofile_history[-1].get("link"))
+    _gofile_history.appendleft(entry)
+    _gofile_history_links.add(entry.get("link"))
+
+
+def _compact_gofile_history():
+    """Rewrite the history log with only the entries kept in memory."""
+    global _gofile_history_lines
+    tmp_file = GOFILE_HISTORY_FILE + ".tmp"
+    with open(tmp_file, 'wb') as f:
+        f.write(b"".join(_json_line(entry) for entry in reversed(_gofile_history)))
+    os.replace(tmp_file, GOFILE_HISTORY_FILE)
+    _gofile_history_lines = len(_gofile_history)
+
+
+def load_gofile_history():
+    """Load the history log once at startup (migrating the old JSON file)."""
+    global _gofile_history_lines
+    with _gofile_history_lock:
+        if not os.path.exists(GOFILE_HISTORY_FILE) and os.path.exists(
+                GOFILE_HISTORY_FILE_LEGACY):
+            try:
+                with open(GOFILE_HISTORY_FILE_LEGACY, 'rb') as f:
+                    legacy = _json_loads(f.read())
+                # Legacy file is newest first, the log is oldest first
+                with open(GOFILE_HISTORY_FILE, 'wb') as f:
+                    f.write(b"".join(_json_line(entry) for entry in reversed(legacy)))
+            except Exception as e:
+                print(f"Error migrating Gofile history: {e}")
+        if not os.path.exists(GOFILE_HISTORY_FILE):
+            return
+        with open(GOFILE_HISTORY_FILE, 'rb') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                _gofile_history_lines += 1
+                try:
+                    entry = _json_loads(line)
+                except ValueError:
+                    continue
+                if entry.get("link") not in _gofile_history_links:
+                    _remember_gofile_entry(entry)
+
+
+def get_gofile_history():
+    """Return a copy of the upload history, newest first."""
+    with _gofile_history_lock:
+        return [dict(entry) for entry in _gofile_history]
+
+
+# Content-Disposition filename (RFC 5987 form first, then plain)
+_CD_FILENAME_EXT_RE = re.compile(r"filename\*=([^']*)''([^;]*)")
+_CD_FILENAME_RE = re.compile(r'filename="?([^"]+)"?')
+# Characters not allowed in titles used as output filenames
+_TITLE_UNSAFE_RE = re.compile(r'[\\/*?:"<>|]')
+
+_WT_CONFIG_RE = re.compile(r'appdata\.wt\s*=\s*["\']([^"\']+)["\']')
+_WT_HOME_RE = re.compile(r'wt\s*[:=]\s*["\']([^"\']+)["\']')
+# The website token rarely changes, so reuse it for an hour
+GOFILE_WT_TTL = 3600
+_WT_CACHE = {"token": None, "ts": 0}
+# One pooled keep-alive session for all upload/file-host API calls
+# (Gofile, Pixeldrain, 4stream), so repeat calls skip the TCP+TLS handshake.
+# It never stores cookies, so calls stay as independent as before.
+http_session = requests.Session()
+http_session.mount("https://", requests.adapters.HTTPAdapter(pool_connections=16,
+                                                             pool_maxsize=32))
+http_session.cookies.set_policy(
+    http.cookiejar.DefaultCookiePolicy(allowed_domains=[]))
+atexit.register(http_session.close)
 
 def get_gofile_website_token():
     """Dynamically fetch the required X-Website-Token from Gofile's JS"""
+    if _WT_CACHE["token"] and time.monotonic() - _WT_CACHE["ts"] < GOFILE_WT_TTL:
+        return _WT_CACHE["token"]
     try:
         # Try config.js first as it's the primary location for appdata.wt
-        r = requests.get("https://gofile.io/dist/js/config.js", timeout=10)
-        m = re.search(r'appdata\.wt\s*=\s*["\']([^"\']+)["\']', r.text)
-        if m: return m.group(1)
-        
-        # Fallback to home page if not found in config.js
-        r = requests.get("https://gofile.io/", timeout=10)
-        m = re.search(r'wt\s*[:=]\s*["\']([^"\']+)["\']', r.text)
-        if m: return m.group(1)
+        r = http_session.get("https://gofile.io/dist/js/config.js", timeout=10)
+        m = _WT_CONFIG_RE.search(r.text)
+        if not m:
+            # Fallback to home page if not found in config.js
+            r = http_session.get("https://gofile.io/", timeout=10)
+            m = _WT_HOME_RE.search(r.text)
+        if m:
+            _WT_CACHE["token"] = m.group(1)
+            _WT_CACHE["ts"] = time.monotonic()
+            return _WT_CACHE["token"]
     except:
         pass
     return "4fd6sg89d7s6" # Hardcoded fallback if detection fails
@@ -65,21 +188,66 @@ if os.path.exists(deno_bin) and deno_bin not in os.environ["PATH"]:
     os.environ["PATH"] += os.pathsep + deno_bin
 
     
+# --- RESOLVED BINARY PATH CACHE ---
+# Resolved tool paths are persisted so later startups skip the PATH scan.
+PATHS_CACHE_FILE = os.path.join(os.path.expanduser("~/.cache/idx-vid-down"),
+                                "paths.json")
+
+
+def _executable(path):
+    """True if path is a regular file with an execute bit (one stat call)."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return False
+    return stat.S_ISREG(st.st_mode) and bool(st.st_mode & 0o111)
+
+
+def _resolve_cached(cmd_name, resolver):
+    """Return the cached path for cmd_name if it is still executable,
+    otherwise run resolver(cmd_name) and persist an absolute result."""
+    try:
+        with open(PATHS_CACHE_FILE, "r") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        cache = {}
+    path = cache.get(cmd_name)
+    if path and _executable(path):
+        return path
+
+    path = resolver(cmd_name)
+    if os.path.isabs(path):
+        cache[cmd_name] = path
+        try:
+            os.makedirs(os.path.dirname(PATHS_CACHE_FILE), exist_ok=True)
+            tmp_file = PATHS_CACHE_FILE + ".tmp"
+            with open(tmp_file, "w") as f:
+                json.dump(cache, f)
+            os.replace(tmp_file, PATHS_CACHE_FILE)
+        except OSError as e:
+            print(f"Could not write path cache: {e}")
+    return path
+
+
 # --- YTDLP PATH CONFIGURATION ---
-def find_ytdlp():
+def _search_ytdlp(cmd_name):
     # 1. Try to find 'yt-dlp' in the system PATH
-    path = shutil.which("yt-dlp")
+    path = shutil.which(cmd_name)
     if path:
         return path
     
     # 2. Look in the same directory as the python executable (e.g., .venv/bin/)
     python_dir = os.path.dirname(sys.executable)
-    possible_path = os.path.join(python_dir, "yt-dlp")
-    if os.path.exists(possible_path):
+    possible_path = os.path.join(python_dir, cmd_name)
+    if _executable(possible_path):
         return possible_path
 
     # 3. Last resort: default to "yt-dlp" command string
-    return "yt-dlp"
+    return cmd_name
+
+
+def find_ytdlp():
+    return _resolve_cached("yt-dlp", _search_ytdlp)
 
 YTDLP_PATH = find_ytdlp()
 print(f"Using yt-dlp at: {YTDLP_PATH}")
@@ -91,13 +259,7 @@ COMMON_PATHS = [
 ]
 
 
-def find_command(cmd_name):
-    """Find command in env var, system PATH, or common paths"""
-    # Check environment variable first
-    env_path = os.environ.get(f"{cmd_name.upper()}_PATH", "").strip()
-    if env_path and os.path.exists(env_path):
-        return env_path
-
+def _search_command(cmd_name):
     # Check system PATH using shutil.which
     found = shutil.which(cmd_name)
     if found:
@@ -106,55 +268,249 @@ def find_command(cmd_name):
     # Check common system paths (useful for isolated Python environments)
     for base_path in COMMON_PATHS:
         full_path = os.path.join(base_path, cmd_name)
-        if os.path.exists(full_path) and os.access(full_path, os.X_OK):
+        if _executable(full_path):
             return full_path
 
-    # Try subprocess to find it via shell which
-    try:
-        result = subprocess.run(["sh", "-c", f"which {cmd_name}"],
-                                capture_output=True,
-                                text=True,
-                                timeout=2)
-        if result.returncode == 0:
-            path = result.stdout.strip()
-            if path and os.path.exists(path):
-                return path
-    except:
-        pass
-
     # Fallback to just the command name (will fail at runtime with useful error)
     return cmd_name
 
 
+def find_command(cmd_name):
+    """Find command in env var, cached lookup, system PATH, or common paths"""
+    # Check environment variable first
+    env_path = os.environ.get(f"{cmd_name.upper()}_PATH", "").strip()
+    if env_path and os.path.exists(env_path):
+        return env_path
+
+    return _resolve_cached(cmd_name, _search_command)
+
+
 FFMPEG_PATH = find_command("ffmpeg")
 FFPROBE_PATH = find_command("ffprobe")
 
+# ffmpeg "-progress pipe:1" emits key=value lines; we only care about out_time_ms
+_OUT_TIME_RE = re.compile(rb'out_time_ms=(\d+)')
+# Progress lines read from yt-dlp / ffmpeg output; each is only searched
+# after a cheap substring test, since most lines can't match
+_DL_PERCENT_RE = re.compile(r'\[download\]\s+([0-9.]+)%')
+_FFMPEG_TIME_RE = re.compile(r'time=(\d{2}):(\d{2}):(\d{2})\.(\d{2})')
+_VMAF_SCORE_RE = re.compile(r'VMAF score: (\d+\.\d+)')
+# Minimum seconds between two merge progress events pushed to the SSE queue
+MERGE_PROGRESS_INTERVAL = 0.2
+
+
+def drop_page_cache(path):
+    """Ask the kernel to write back and evict a large finished file from
+    the page cache so multi-GB outputs don't push out everything else."""
+    if sys.platform != "linux" or not hasattr(os, "posix_fadvise"):
+        return
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+# ffprobe results keyed by (path, mtime_ns, size) so unchanged files are
+# probed once; oldest entries are dropped past _PROBE_CACHE_MAX
+_probe_cache = {}
+_PROBE_CACHE_MAX = 4096
+_probe_cache_lock = threading.Lock()
+# Stream properties that must match for a lossless concat-copy merge
+_CONCAT_STREAM_KEYS = ("codec_type", "codec_name", "codec_tag", "width",
+                       "height", "pix_fmt", "time_base", "sample_rate",
+                       "channels")
+# Only the fields the app reads (concat check, get_media_info, duration,
+# channels); ffprobe skips everything else, keeping its JSON small
+_PROBE_ENTRIES = ("stream=" + ",".join(_CONCAT_STREAM_KEYS +
+                                       ("avg_frame_rate", "bit_rate")) +
+                  ":format=duration,bit_rate")
+
+
+def probe_stream(path, st=None):
+    """Return the parsed ffprobe stream/format JSON for a file, limited to
+    _PROBE_ENTRIES ({} on failure). st is the file's stat result if the
+    caller already has it.
+    Failed probes are not cached, so they are retried on the next call."""
+    if st is None:
+        try:
+            st = os.stat(path)
+        except OSError as e:
+            print(f"ffprobe failed for {path}: {e}")
+            return {}
+    key = (os.path.abspath(path), st.st_mtime_ns, st.st_size)
+    with _probe_cache_lock:
+        cached = _probe_cache.get(key)
+    if cached is not None:
+        return cached
+    try:
+        result = subprocess.run([
+            FFPROBE_PATH, "-v", "error", "-show_entries", _PROBE_ENTRIES,
+            "-of", "json", path
+        ],
+                                capture_output=True,
+                                timeout=30)
+        if result.returncode != 0:
+            err = result.stderr.decode(errors="replace").strip()
+            print(f"ffprobe failed for {path}: {err or result.returncode}")
+            return {}
+        data = json.loads(result.stdout)
+    except (OSError, subprocess.TimeoutExpired, ValueError) as e:
+        print(f"ffprobe failed for {path}: {e}")
+        return {}
+    with _probe_cache_lock:
+        if len(_probe_cache) >= _PROBE_CACHE_MAX:
+            del _probe_cache[next(iter(_probe_cache))]
+        _probe_cache[key] = data
+    return data
+
+
+def probe_files(paths):
+    """Probe several files in one go, their ffprobe processes running side
+    by side; returns {path: probe_stream(path)}."""
+    paths = list(dict.fromkeys(paths))
+    if not paths:
+        return {}
+    workers = min(32, (os.cpu_count() or 1) * 4, len(paths))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return dict(zip(paths, executor.map(probe_stream, paths)))
+
+
+def can_concat_copy(infos):
+    """True if all probed inputs share stream layout/codecs, False if they
+    differ, None if any input could not be probed."""
+    if not all(info.get("streams") for info in infos):
+        return None
+    signatures = {
+        tuple(
+            tuple(stream.get(k) for k in _CONCAT_STREAM_KEYS)
+            for stream in info["streams"]
+            if stream.get("codec_type") in ("video", "audio"))
+        for info in infos
+    }
+    return len(signatures) == 1
+
+
+# Hardware H.264 encoders in order of preference, with the device each one
+# needs; being listed by "ffmpeg -encoders" doesn't mean the GPU is there.
+_HW_H264_ENCODERS = [
+    ("h264_nvenc", "/dev/nvidia0"),
+    ("h264_vaapi", "/dev/dri/renderD128"),
+    ("h264_qsv", "/dev/dri/renderD128"),
+]
+_h264_encoder = None
+
+
+def pick_h264_encoder():
+    """Return the best available H.264 encoder (probed once, then cached)."""
+    global _h264_encoder
+    if _h264_encoder is None:
+        try:
+            out = subprocess.run([FFMPEG_PATH, "-hide_banner", "-encoders"],
+                                 capture_output=True,
+                                 text=True,
+                                 timeout=10).stdout
+        except (OSError, subprocess.TimeoutExpired):
+            out = ""
+        available = {line.split()[1] for line in out.splitlines()
+                     if len(line.split()) > 1}
+        _h264_encoder = "libx264"
+        for name, device in _HW_H264_ENCODERS:
+            if name in available and os.path.exists(device):
+                _h264_encoder = name
+                break
+    return _h264_encoder
+
+
+def h264_encode_args(encoder):
+    """(global args, output args) for encoder at roughly CRF 23 quality."""
+    if encoder == "h264_nvenc":
+        return [], ["-c:v", "h264_nvenc", "-preset", "p4", "-cq", "23"]
+    if encoder == "h264_vaapi":
+        return (["-vaapi_device", "/dev/dri/renderD128"],
+                ["-vf", "format=nv12,hwupload", "-c:v", "h264_vaapi",
+                 "-qp", "23"])
+    if encoder == "h264_qsv":
+        return [], ["-c:v", "h264_qsv", "-global_quality", "23"]
+    return (["-filter_threads", str(os.cpu_count() or 1)],
+            ["-c:v", "libx264", "-preset", "fast", "-crf", "23",
+             "-threads", "0"])
+
 
 def ffmpeg_merge_with_progress(files, output_path):
     list_file = os.path.join(DOWNLOAD_FOLDER, "merge_list.txt")
 
-    with open(list_file, "w", encoding="utf-8") as f:
-        for file in files:
-            # Fix for SyntaxError: f-string expression part cannot include a backslash
-            escaped_file = file.replace("'", "'\\''")
-            f.write(f"file '{escaped_file}'\n")
+    # Build the whole concat list up front and write it with one syscall
+    buf = "".join(
+        "file '" + file.replace("'", "'\\''") + "'\n" for file in files
+    ).encode("utf-8")
+    fd = os.open(list_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        os.write(fd, buf)
+    finally:
+        os.close(fd)
 
-    def run(cmd):
+    def run(cmd, stage="Merging…"):
+        # Registered so /stop_encode can kill it; a killed run returns a
+        # negative code and skips the fallbacks below
         process = subprocess.Popen(
-            cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True
+            cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT
         )
+        register_process(process)
         if process.stdout:
-            for line in process.stdout:
-                if "out_time_ms" in line:
+            # Read the progress pipe in large non-blocking chunks instead of
+            # line by line, and push at most one event per interval.
+            fd = process.stdout.fileno()
+            os.set_blocking(fd, False)
+            buf = bytearray()
+            last_push = 0.0
+            last_event = None
+            with selectors.DefaultSelector() as sel:
+                sel.register(fd, selectors.EVENT_READ)
+                eof = False
+                while not eof:
+                    sel.select()
                     try:
-                        out_ms = int(line.split("=")[1])
-                        progress_queue.put({"stage": "Merging…"})
-                    except:
+                        chunk = os.read(fd, 65536)
+                    except BlockingIOError:
+                        continue
+                    if not chunk:
+                        eof = True
+                    buf += chunk
+                    cut = buf.rfind(b"\n") + 1
+                    if eof:
+                        cut = len(buf)
+                    if not cut:
+                        continue
+                    lines = bytes(buf[:cut])
+                    del buf[:cut]
+                    match = None
+                    for match in _OUT_TIME_RE.finditer(lines):
                         pass
-        ret_code = process.wait()
-        if os.path.exists(list_file):
-            os.remove(list_file)
-        return ret_code
+                    if match:
+                        percent = None
+                        if total_us:
+                            percent = min(99, int(match.group(1)) * 100 // total_us)
+                        event = (stage, percent)
+                        # Only push when something visible changed
+                        now = time.monotonic()
+                        if (event != last_event
+                                and now - last_push >= MERGE_PROGRESS_INTERVAL):
+                            msg = {"stage": event[0]}
+                            if percent is not None:
+                                msg["percent"] = percent
+                            progress_queue.put(msg)
+                            last_event = event
+                            last_push = now
+            process.stdout.close()
+        returncode = process.wait()
+        unregister_process(process)
+        return returncode
 
     # 1️⃣ TRY FAST COPY MERGE
     cmd_copy = [
@@ -163,33 +519,58 @@ def ffmpeg_merge_with_progress(files, output_path):
         "-safe", "0",
         "-i", list_file,
         "-c", "copy",
+        "-progress", "pipe:1",
+        "-nostats",
+        "-loglevel", "error",
         output_path
     ]
 
-    ret = run(cmd_copy)
+    # Probe all inputs once up front: mismatched inputs skip the doomed copy
+    # pass, and the total duration turns out_time_ms into a percent
+    probes = probe_files(files)
+    infos = [probes[f] for f in files]
+    concat_ok = can_concat_copy(infos)
+    total_us = int(sum(
+        float(info.get("format", {}).get("duration") or 0)
+        for info in infos) * 1_000_000)
+    ret = run(cmd_copy) if concat_ok is not False else 1
 
     # 2️⃣ FALLBACK: RE-ENCODE (GUARANTEED)
-    if ret != 0 or not os.path.exists(output_path):
+    if ret >= 0 and (ret != 0 or not os.path.exists(output_path)):
         progress_queue.put({"stage": "Re-encoding for compatibility…"})
 
-        cmd_reencode = [
-            FFMPEG_PATH,
-            "-f", "concat",
-            "-safe", "0",
-            "-i", list_file,
-            "-map", "0:v:0",
-            "-map", "0:a?",
-            "-c:v", "libx264",
-            "-preset", "fast",
-            "-crf", "23",
-            "-c:a", "aac",
-            "-movflags", "+faststart",
-            output_path
-        ]
-
-        subprocess.run(cmd_reencode)
+        def cmd_reencode(encoder):
+            global_args, video_args = h264_encode_args(encoder)
+            return [
+                FFMPEG_PATH,
+                "-y",
+                *global_args,
+                "-f", "concat",
+                "-safe", "0",
+                "-i", list_file,
+                "-map", "0:v:0",
+                "-map", "0:a?",
+                *video_args,
+                "-c:a", "aac",
+                "-movflags", "+faststart",
+                "-progress", "pipe:1",
+                "-nostats",
+                "-loglevel", "error",
+                output_path
+            ]
+
+        encoder = pick_h264_encoder()
+        ret = run(cmd_reencode(encoder), "Re-encoding…")
+        if ret > 0 and encoder != "libx264":
+            # Hardware encoder refused the input; fall back to software
+            progress_queue.put({"log": f"{encoder} failed, retrying with libx264"})
+            run(cmd_reencode("libx264"), "Re-encoding…")
 
     # cleanup
+    if os.path.exists(list_file):
+        os.remove(list_file)
+    if os.path.exists(output_path):
+        drop_page_cache(output_path)
     progress_queue.put({"log": "DONE"})
 
 
@@ -221,21 +602,222 @@ if not ffmpeg_available:
     print(f"    - error: {ffmpeg_error}")
 print("✅ Python packages: flask, yt-dlp, requests (pre-installed)")
 
-from flask import Flask, render_template_string, request, send_from_directory, flash, url_for, Response, redirect, session, jsonify
-from werkzeug.utils import secure_filename
-import requests
-import yt_dlp
-
 # create app first
 app = Flask(__name__)
 app.secret_key = os.environ.get("SESSION_SECRET",
                                 "replit-video-downloader-secret-key")
+# Page templates are compiled once and cached; unversioned static requests
+# are served with a one-day max-age and ETag so browsers revalidate with 304s.
+app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 86400
+app.config['TEMPLATES_AUTO_RELOAD'] = False
+app.jinja_env.auto_reload = False
+# Compiled template bytecode survives restarts, so even the first request
+# after a deploy skips lexing/parsing the big page templates.
+# Entries are keyed by a hash of the template source, so an edited
+# template simply misses the cache.
+# Without JINJA_CACHE_DIR, Jinja picks its own per-user directory under
+# the temp dir and refuses one owned by someone else, so another local
+# user can't plant bytecode for the app to load. A configured directory
+# gets the same checks.
+JINJA_CACHE_DIR = os.environ.get("JINJA_CACHE_DIR")
+try:
+    if JINJA_CACHE_DIR:
+        os.makedirs(JINJA_CACHE_DIR, mode=0o700, exist_ok=True)
+        st = os.lstat(JINJA_CACHE_DIR)
+        if (not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid()
+                or st.st_mode & (stat.S_IWGRP | stat.S_IWOTH)):
+            raise PermissionError(
+                f"{JINJA_CACHE_DIR} must be a directory owned by this user "
+                "and not group/world-writable")
+        if not os.access(JINJA_CACHE_DIR, os.W_OK | os.X_OK):
+            raise PermissionError(f"{JINJA_CACHE_DIR} is not writable")
+    app.jinja_env.bytecode_cache = FileSystemBytecodeCache(
+        JINJA_CACHE_DIR, pattern="__jinja2_%s.cache")
+except OSError as e:
+    print(f"⚠️ Jinja bytecode cache disabled: {e}")
+_PRE_BLOCK_RE = re.compile(r"(<pre\b.*?</pre>)", re.S)
+_INDENT_RE = re.compile(r"^[ \t]+|\n(?=\n)", re.M)
+
+
+def strip_indentation(source):
+    """Drop leading indentation and blank lines from template source,
+    leaving <pre> blocks untouched. Line breaks are kept, so inline
+    scripts (// comments, ASI) behave the same."""
+    parts = _PRE_BLOCK_RE.split(source)
+    parts[::2] = [_INDENT_RE.sub("", part) for part in parts[::2]]
+    return "".join(parts)
+
+
+class IndentStrippingLoader(FileSystemLoader):
+    """templates/ loader that strips indentation before compiling, so
+    there is less text to emit on every render."""
+
+    def get_source(self, environment, template):
+        source, filename, uptodate = super().get_source(environment, template)
+        return strip_indentation(source), filename, uptodate
+
+
+app.jinja_loader = IndentStrippingLoader(
+    os.path.join(app.root_path, app.template_folder))
+
+# Static URLs carry the file's mtime (?v=...), so versioned assets can be
+# cached for a year without revalidation; an edited file gets a new URL.
+STATIC_IMMUTABLE_MAX_AGE = 31536000
+
+
+@app.url_defaults
+def add_static_version(endpoint, values):
+    if endpoint == "static" and "v" not in values:
+        try:
+            path = os.path.join(app.static_folder, values["filename"])
+            values["v"] = int(os.stat(path).st_mtime)
+        except (KeyError, OSError):
+            pass
+
+
+@app.after_request
+def cache_versioned_static(response):
+    if request.endpoint == "static" and request.args.get("v"):
+        response.cache_control.public = True
+        response.cache_control.max_age = STATIC_IMMUTABLE_MAX_AGE
+        response.cache_control.immutable = True
+    return response
 
-# Global for current encoding process
-current_process = None
+
+# Rendered HTML pages are gzipped when the browser accepts it. Streamed
+# responses (index.html, /progress) and files are left alone. A gzipped
+# body gets its own ETag (GZIP_ETAG_SUFFIX appended), so caches never
+# answer a request with the other encoding's bytes.
+GZIP_MIN_SIZE = 1024
+GZIP_ETAG_SUFFIX = "-gzip"
+
+
+@app.after_request
+def gzip_html(response):
+    if (response.mimetype != "text/html"
+            or response.status_code != 200
+            or response.is_streamed
+            or response.direct_passthrough
+            or "Content-Encoding" in response.headers
+            or "gzip" not in request.headers.get("Accept-Encoding", "")):
+        return response
+    data = response.get_data()
+    if len(data) < GZIP_MIN_SIZE:
+        return response
+    response.set_data(gzip.compress(data, 6))
+    response.headers["Content-Encoding"] = "gzip"
+    response.vary.add("Accept-Encoding")
+    etag, weak = response.get_etag()
+    if etag:
+        response.set_etag(etag + GZIP_ETAG_SUFFIX, weak)
+    return response
+
+
+# Page CSS/JS is constant between edits, so it is compressed once (at the
+# highest level) and the gzip bytes are reused: path -> ((mtime_ns, size), gz)
+STATIC_GZIP_TYPES = {"text/css", "text/javascript", "application/javascript"}
+_static_gzip_cache = {}
+
+
+@app.after_request
+def gzip_static(response):
+    if (request.endpoint != "static"
+            or response.status_code != 200
+            or response.mimetype not in STATIC_GZIP_TYPES
+            or "Content-Encoding" in response.headers
+            or "gzip" not in request.headers.get("Accept-Encoding", "")):
+        return response
+    path = safe_join(app.static_folder, request.view_args["filename"])
+    try:
+        st = os.stat(path)
+        version = (st.st_mtime_ns, st.st_size)
+        cached = _static_gzip_cache.get(path)
+        if cached is None or cached[0] != version:
+            with open(path, "rb") as f:
+                cached = (version, gzip.compress(f.read(), 9))
+            _static_gzip_cache[path] = cached
+    except (OSError, TypeError):
+        return response
+    # Swap the file body for the cached gzip bytes
+    if hasattr(response.response, "close"):
+        response.response.close()
+    response.direct_passthrough = False
+    response.vary.add("Accept-Encoding")
+    # The gzip body gets its own ETag, as in gzip_html; send_file only
+    # knows the identity tag, so revalidation of the gzip one is done here
+    etag, weak = response.get_etag()
+    if etag:
+        etag += GZIP_ETAG_SUFFIX
+        response.set_etag(etag, weak)
+        if request.if_none_match.contains_weak(etag):
+            response.status_code = 304
+            response.set_data(b"")
+            return response
+    response.set_data(cached[1])
+    response.headers["Content-Encoding"] = "gzip"
+    return response
+
+# -----------------------------
+# Background jobs
+# -----------------------------
+# Downloads, encodes and uploads run on daemon threads, at most
+# MAX_CONCURRENT_JOBS at a time (0 = no limit); later jobs wait for a
+# free slot. The work is mostly network I/O, so the cap is not tied to
+# the CPU count.
+MAX_CONCURRENT_JOBS = int(os.environ.get("MAX_CONCURRENT_JOBS", "4"))
+_job_slots = (threading.BoundedSemaphore(MAX_CONCURRENT_JOBS)
+              if MAX_CONCURRENT_JOBS > 0 else None)
+_job_local = threading.local()
+# External process (ffmpeg / yt-dlp) currently run by each job, by job id
+running_processes = {}
+_running_processes_lock = threading.Lock()
+# Ids of submitted jobs that have not finished yet (guarded by the same lock)
+active_jobs = set()
+
+
+def current_job_id():
+    """Id of the job running on this thread (None outside jobs)."""
+    return getattr(_job_local, "job_id", None)
+
+
+def register_process(process):
+    with _running_processes_lock:
+        running_processes[current_job_id()] = process
+
+
+def unregister_process(process):
+    with _running_processes_lock:
+        if running_processes.get(current_job_id()) is process:
+            del running_processes[current_job_id()]
+
+
+def _run_job(job_id, target, args):
+    _job_local.job_id = job_id
+    if _job_slots and not _job_slots.acquire(blocking=False):
+        progress_queue.put({"stage": "Waiting for a free job slot..."})
+        _job_slots.acquire()
+    try:
+        target(*args)
+    finally:
+        if _job_slots:
+            _job_slots.release()
+        with _running_processes_lock:
+            running_processes.pop(job_id, None)
+            active_jobs.discard(job_id)
+        _job_local.job_id = None
+
+
+def submit_job(target, args):
+    """Run target(*args) as a background job and return its job id."""
+    job_id = uuid.uuid4().hex[:8]
+    with _running_processes_lock:
+        active_jobs.add(job_id)
+    threading.Thread(target=_run_job,
+                     args=(job_id, target, args),
+                     daemon=True).start()
+    return job_id
 
 # Jinja Filter for Date Formatting
-from datetime import datetime
 @app.template_filter('datetime')
 def format_datetime(value):
     if not value: return ""
@@ -244,6 +826,12 @@ def format_datetime(value):
     except:
         return str(value)
 
+
+# Compile the page templates up front (now that their filters exist)
+for _name in ("index.html", "encode.html", "gofile_manager.html",
+              "trim.html", "file_operation.html", "files.html", "login.html"):
+    app.jinja_env.get_template(_name)
+
 # -----------------------------
 # Simple one-password protection
 # -----------------------------
@@ -258,8 +846,6 @@ if APP_PASSWORD == "1234":
 ADMIN_USERNAME = "admin"
 
 # Authentication decorator
-from functools import wraps
-
 def login_required(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
@@ -284,118 +870,7 @@ def login():
             flash("❌ Invalid username or password", "error")
     
     # Simple login page with popup styling
-    return render_template_string("""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <title>Login - Video Downloader</title>
-        <style>
-            * { margin: 0; padding: 0; box-sizing: border-box; }
-            body { 
-                font-family: 'Segoe UI', 'Roboto', sans-serif; 
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                min-height: 100vh;
-                display: flex;
-                align-items: center;
-                justify-content: center;
-                padding: 20px;
-            }
-            .login-box {
-                background: white;
-                padding: 40px;
-                border-radius: 16px;
-                box-shadow: 0 20px 60px rgba(0,0,0,0.3);
-                width: 100%;
-                max-width: 400px;
-            }
-            h1 { 
-                font-size: 24px; 
-                margin-bottom: 10px; 
-                color: #1a1a1a;
-                text-align: center;
-            }
-            p { 
-                text-align: center; 
-                color: #666; 
-                margin-bottom: 30px; 
-                font-size: 14px;
-            }
-            label { 
-                display: block; 
-                font-size: 13px; 
-                font-weight: 600; 
-                color: #3a3a3a; 
-                margin-bottom: 6px; 
-            }
-            input[type="text"], input[type="password"] {
-                width: 100%;
-                padding: 12px;
-                margin-bottom: 16px;
-                border: 1px solid #d0d0d0;
-                border-radius: 8px;
-                font-size: 14px;
-                font-family: inherit;
-            }
-            input:focus {
-                outline: none;
-                border-color: #667eea;
-                box-shadow: 0 0 0 3px rgba(102, 126, 234, 0.1);
-            }
-            button {
-                width: 100%;
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                color: white;
-                padding: 12px;
-                border: none;
-                border-radius: 8px;
-                font-size: 14px;
-                font-weight: 600;
-                cursor: pointer;
-                transition: all 0.2s ease;
-            }
-            button:hover {
-                transform: translateY(-2px);
-                box-shadow: 0 6px 16px rgba(102, 126, 234, 0.3);
-            }
-            .flash-msg {
-                padding: 12px;
-                margin-bottom: 20px;
-                border-radius: 8px;
-                font-size: 13px;
-                background: rgba(220, 53, 69, 0.1);
-                color: #721c24;
-                border-left: 4px solid #dc3545;
-            }
-        </style>
-    </head>
-    <body>
-        <div class="login-box">
-            <h1>🎬 Video Downloader</h1>
-            <p>Please sign in to continue</p>
-            
-            {% with messages = get_flashed_messages(with_categories=true) %}
-                {% if messages %}
-                    {% for category, message in messages %}
-                        <div class="flash-msg">{{ message }}</div>
-                    {% endfor %}
-                {% endif %}
-            {% endwith %}
-            
-            <form method="POST">
-                <label>Username:</label>
-                <input type="text" name="username" value="admin" required autofocus>
-                
-                <label>Password:</label>
-                <input type="password" name="password" required>
-                
-                <button type="submit">Sign In</button>
-            </form>
-        </div>
-    </body>
-    </html>
-    """)
+    return render_template("login.html")
 
 # Logout route
 @app.route("/logout")
@@ -413,16 +888,35 @@ def health():
     return "OK", 200
 
 
+class HealthShortcut:
+    """WSGI middleware answering /health before Flask builds a request,
+    runs hooks or opens the session."""
+
+    def __init__(self, wsgi_app):
+        self.wsgi_app = wsgi_app
+
+    def __call__(self, environ, start_response):
+        if environ.get("PATH_INFO") == "/health":
+            start_response("200 OK", [("Content-Type", "text/plain"),
+                                      ("Content-Length", "2")])
+            return [b"OK"]
+        return self.wsgi_app(environ, start_response)
+
+
+app.wsgi_app = HealthShortcut(app.wsgi_app)
+
+
 # -----------------------------
 # Suppress /health logs in Replit console
 # -----------------------------
-@app.after_request
-def suppress_health_logging(response):
-    if request.path == "/health":
-        # disable logging for health checks
-        import logging
-        logging.getLogger('werkzeug').setLevel(logging.ERROR)
-    return response
+# Installed once at import; drops only the health check access lines
+class _HealthFilter(logging.Filter):
+
+    def filter(self, record):
+        return "/health" not in record.getMessage()
+
+
+logging.getLogger('werkzeug').addFilter(_HealthFilter())
 
 
 # -----------------------------
@@ -430,7 +924,15 @@ def suppress_health_logging(response):
 # -----------------------------
 FLASK_PORT = 5000
 DOWNLOAD_FOLDER = os.path.join(os.getcwd(), "downloads")
-GOFILE_HISTORY_FILE = os.path.join(os.getcwd(), "gofile_history.json")
+GOFILE_HISTORY_FILE = os.path.join(os.getcwd(), "gofile_history.ndjson")
+GOFILE_HISTORY_FILE_LEGACY = os.path.join(os.getcwd(), "gofile_history.json")
+# Keep last 100 uploads
+GOFILE_HISTORY_LIMIT = 100
+_gofile_history = collections.deque(maxlen=GOFILE_HISTORY_LIMIT)
+_gofile_history_links = set()
+_gofile_history_lines = 0
+_gofile_history_lock = threading.Lock()
+load_gofile_history()
 os.makedirs(DOWNLOAD_FOLDER, exist_ok=True)
 
 COOKIES_FILE = os.path.join(os.getcwd(), "youtube_cookies.txt")
@@ -470,2087 +972,160 @@ print(
 # -----------------------------
 # Flask & SSE Setup
 # -----------------------------
-progress_queue = queue.Queue()
+class ProgressBus:
+    """Broadcast progress events to every connected SSE client.
+
+    Workers call put() exactly as they did with queue.Queue; each /progress
+    stream subscribes its own SimpleQueue, so several tabs no longer steal
+    events from each other. Recent events of every job are kept so a late
+    subscriber catches up; pages pick out their own jobs by job_id.
+
+    Each event is serialized to its SSE frame once, and the same bytes
+    object is handed to every subscriber. A stream stays open across jobs'
+    DONE/error frames (the bus is shared); pages unsubscribe themselves.
+    Frames are "J|<json>" for structured events, and a cheaper
+    "P|<percent>|<job_id>|<stage>" line followed by one data line per log
+    line for the coalesced ticks below (parsed by parseProgressEvent()).
+    Every frame carries an increasing SSE id, so a reconnecting browser
+    (Last-Event-ID) only gets what it missed from the replay history.
+
+    Plain stage/percent/log ticks are coalesced per job and flushed every
+    flush_interval seconds: stage and percent keep only the latest value,
+    log lines from the window are sent together as a list. Anything else
+    (errors, DONE, final_url, ...) flushes the job's pending tick and goes
+    out immediately, so ordering is preserved.
+    """
+
+    COALESCE_KEYS = frozenset(("stage", "percent", "log", "job_id"))
+
+    def __init__(self, maxlen=256, flush_interval=0.05):
+        self._subs = set()
+        self._lock = threading.Lock()
+        self._history = collections.deque(maxlen=maxlen)
+        self._seq = 0
+        self._pending = {}
+        self._flush_interval = flush_interval
+        self._wakeup = threading.Event()
+        self._flusher = None
+
+    def put(self, ev):
+        # Tag events from background jobs so the page can tell them apart
+        job_id = current_job_id()
+        if job_id and "job_id" not in ev:
+            ev = {**ev, "job_id": job_id}
+        job_id = ev.get("job_id")
+        with self._lock:
+            if ev.keys() <= self.COALESCE_KEYS and ev.get("log") != "DONE":
+                pending = self._pending.setdefault(job_id, {})
+                if "stage" in ev:
+                    pending["stage"] = ev["stage"]
+                if "percent" in ev:
+                    pending["percent"] = ev["percent"]
+                if "log" in ev:
+                    pending.setdefault("log", []).append(ev["log"])
+                if self._flusher is None:
+                    self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+                    self._flusher.start()
+                self._wakeup.set()
+                return
+            self._flush_job(job_id)
+            self._send(ev)
+
+    publish = put
+
+    def _send(self, ev):
+        # Caller holds self._lock
+        self._send_frame(b"data: J|" + _json_line(ev) + b"\n")
+
+    def _send_frame(self, frame):
+        # Caller holds self._lock
+        self._seq += 1
+        frame = b"id: %d\n" % self._seq + frame
+        self._history.append((self._seq, frame))
+        for sub in self._subs:
+            sub.put_nowait(frame)
+
+    def _flush_job(self, job_id):
+        # Caller holds self._lock
+        ev = self._pending.pop(job_id, None)
+        if not ev:
+            return
+        percent = ev.get("percent")
+        stage = " ".join(str(ev.get("stage", "")).splitlines())
+        lines = [f"P|{'' if percent is None else percent}|{job_id or ''}|{stage}"]
+        for entry in ev.get("log", ()):
+            # One SSE data line per log line; CR/LF inside would end the field
+            lines.extend(str(entry).splitlines())
+        self._send_frame("".join(f"data: {line}\n" for line in lines).encode("utf-8") + b"\n")
+
+    def _flush_loop(self):
+        while True:
+            self._wakeup.wait()
+            # Let the window fill up before sending
+            time.sleep(self._flush_interval)
+            with self._lock:
+                self._wakeup.clear()
+                for job_id in list(self._pending):
+                    self._flush_job(job_id)
+
+    def subscribe(self, last_event_id=None):
+        sub = queue.SimpleQueue()
+        with self._lock:
+            # An id from before a restart (ahead of ours) replays everything
+            if last_event_id is None or last_event_id > self._seq:
+                last_event_id = 0
+            for seq, frame in self._history:
+                if seq > last_event_id:
+                    sub.put_nowait(frame)
+            self._subs.add(sub)
+        return sub
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            self._subs.discard(sub)
+
+
+progress_queue = ProgressBus()
+# Seconds of silence before /progress sends a keepalive comment
+SSE_KEEPALIVE_INTERVAL = 15
+
 
 # -----------------------------
-# HTML Template (with CSS & JavaScript)
+# Helper Functions
 # -----------------------------
-TEMPLATE = """
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Video Downloader & Uploader</title>
-    <style>
-        * { margin: 0; padding: 0; box-sizing: border-box; }
-        body { font-family: 'Segoe UI', 'Roboto', '-apple-system', sans-serif; line-height: 1.6; background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); min-height: 100vh; padding: 15px; color: #1a1a1a; }
-        .sticky-header { position: sticky; top: 0; z-index: 100; background: rgba(255, 255, 255, 0.95); backdrop-filter: blur(10px); border-bottom: 1px solid rgba(0,0,0,0.1); padding: 18px; margin: -15px -15px 20px -15px; display: flex; justify-content: space-between; align-items: center; gap: 15px; box-shadow: 0 8px 32px rgba(0,0,0,0.1); }
-        .app-header { display: flex; align-items: center; gap: 12px; }
-        .app-icon { width: 44px; height: 44px; background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); border-radius: 12px; display: flex; align-items: center; justify-content: center; font-size: 24px; color: white; box-shadow: 0 4px 12px rgba(102, 126, 234, 0.3); }
-        .app-title h1 { font-size: 20px; font-weight: 700; margin: 0; color: #1a1a1a; }
-        .app-title p { font-size: 11px; color: #666; margin: 2px 0 0 0; }
-        .manage-btn { background: linear-gradient(135deg, #28a745 0%, #20c997 100%); color: white; padding: 10px 18px; border: none; border-radius: 8px; cursor: pointer; text-decoration: none; font-weight: 600; font-size: 12px; transition: all 0.3s ease; display: inline-flex; align-items: center; gap: 6px; box-shadow: 0 4px 12px rgba(40, 167, 69, 0.2); white-space: nowrap; }
-        .manage-btn:hover { transform: translateY(-2px); box-shadow: 0 6px 16px rgba(40, 167, 69, 0.3); }
-        .container { max-width: 1000px; margin: 0 auto; background: rgba(255, 255, 255, 0.97); backdrop-filter: blur(10px); border-radius: 16px; box-shadow: 0 20px 60px rgba(0,0,0,0.15); border: 1px solid rgba(255, 255, 255, 0.3); overflow: hidden; }
-        .tabs { display: flex; gap: 8px; padding: 18px 20px; border-bottom: 1px solid rgba(0,0,0,0.08); background: linear-gradient(to right, rgba(240,240,255,0.5), rgba(255,240,240,0.5)); overflow-x: auto; }
-        .tab-btn { padding: 10px 18px; border: 2px solid transparent; background: white; color: #666; border-radius: 8px; cursor: pointer; font-weight: 600; font-size: 13px; transition: all 0.3s ease; white-space: nowrap; box-shadow: 0 2px 4px rgba(0,0,0,0.05); }
-        .tab-btn.active { background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; box-shadow: 0 4px 12px rgba(102, 126, 234, 0.3); }
-        .tab-btn:hover { transform: translateY(-2px); box-shadow: 0 4px 12px rgba(0,0,0,0.1); }
-        .tab-content { display: none; padding: 25px; animation: fadeIn 0.3s ease; }
-        .tab-content.active { display: block; }
-        @keyframes fadeIn { from { opacity: 0; } to { opacity: 1; } }
-        .card { background: white; border: 1px solid rgba(0,0,0,0.08); border-radius: 12px; padding: 20px; margin-bottom: 18px; box-shadow: 0 4px 12px rgba(0,0,0,0.08); transition: all 0.3s ease; }
-        .card:hover { box-shadow: 0 8px 24px rgba(0,0,0,0.12); transform: translateY(-2px); }
-        .card-header { display: flex; align-items: center; gap: 12px; margin-bottom: 15px; }
-        .card-icon { width: 48px; height: 48px; border-radius: 10px; display: flex; align-items: center; justify-content: center; font-size: 24px; color: white; flex-shrink: 0; }
-        .card-icon.blue { background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); }
-        .card-icon.green { background: linear-gradient(135deg, #28a745 0%, #20c997 100%); }
-        .card-icon.orange { background: linear-gradient(135deg, #ff6b35 0%, #f7931e 100%); }
-        .card-icon.red { background: linear-gradient(135deg, #dc3545 0%, #c82333 100%); }
-        .card-title { font-size: 16px; font-weight: 700; color: #1a1a1a; margin: 0; }
-        .card-desc { font-size: 12px; color: #666; margin: 4px 0 0 0; }
-        .helper-text { font-size: 11px; color: #0c5460; background: #d1ecf1; border-left: 3px solid #00bcd4; padding: 10px 12px; border-radius: 6px; margin-bottom: 12px; }
-        h1 { font-size: 24px; font-weight: 700; color: #1a1a1a; margin-bottom: 10px; }
-        h2 { font-size: 18px; font-weight: 600; color: #2c2c2c; margin-top: 20px; margin-bottom: 15px; padding-bottom: 10px; border-bottom: 1px solid #e0e0e0; }
-        h3 { font-size: 15px; font-weight: 600; color: #3a3a3a; margin-bottom: 10px; }
-        label { display: block; font-size: 13px; font-weight: 600; color: #3a3a3a; margin-bottom: 6px; }
-        input[type="text"], input[type="number"], select { width: 100%; padding: 10px 12px; margin-bottom: 12px; border: 1px solid #d0d0d0; border-radius: 8px; font-size: 13px; transition: all 0.2s ease; font-family: inherit; background: white; }
-        input[type="text"]:focus, input[type="number"]:focus, select:focus { outline: none; border-color: #667eea; box-shadow: 0 0 0 3px rgba(102, 126, 234, 0.1); background: #f9fafb; }
-        input[type="file"] { margin-bottom: 12px; font-size: 12px; }
-        button { background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 10px 16px; border: none; border-radius: 8px; cursor: pointer; font-size: 12px; font-weight: 600; margin-right: 8px; margin-bottom: 8px; transition: all 0.2s ease; box-shadow: 0 4px 12px rgba(102, 126, 234, 0.2); }
-        button:hover { transform: translateY(-2px); box-shadow: 0 6px 16px rgba(102, 126, 234, 0.3); }
-        button:active { transform: translateY(0); }
-        button.delete { background: linear-gradient(135deg, #dc3545 0%, #c82333 100%); box-shadow: 0 4px 12px rgba(220, 53, 69, 0.2); }
-        button.delete:hover { box-shadow: 0 6px 16px rgba(220, 53, 69, 0.3); }
-        button.upload { background: linear-gradient(135deg, #28a745 0%, #20c997 100%); box-shadow: 0 4px 12px rgba(40, 167, 69, 0.2); }
-        button.upload:hover { box-shadow: 0 6px 16px rgba(40, 167, 69, 0.3); }
-        button.encode { background: linear-gradient(135deg, #00bcd4 0%, #0097a7 100%); box-shadow: 0 4px 12px rgba(0, 188, 212, 0.2); }
-        button.encode:hover { box-shadow: 0 6px 16px rgba(0, 188, 212, 0.3); }
-        button.rename { background: linear-gradient(135deg, #ffc107 0%, #ff9800 100%); color: white; box-shadow: 0 4px 12px rgba(255, 193, 7, 0.2); }
-        button.rename:hover { box-shadow: 0 6px 16px rgba(255, 193, 7, 0.3); }
-        a { color: #667eea; text-decoration: none; font-weight: 600; transition: color 0.2s ease; }
-        a:hover { color: #764ba2; }
-        pre { background-color: #f4f4f4; padding: 12px; border-radius: 8px; white-space: pre-wrap; word-wrap: break-word; color: #222; font-size: 11px; overflow-x: auto; border: 1px solid #e0e0e0; }
-        .flash-msg { padding: 14px 16px; border-radius: 8px; margin-bottom: 15px; font-weight: 600; border-left: 4px solid; font-size: 13px; }
-        .flash-success { background: rgba(40, 167, 69, 0.1); color: #155724; border-left-color: #28a745; }
-        .flash-error { background: rgba(220, 53, 69, 0.1); color: #721c24; border-left-color: #dc3545; }
-        .flash-info { background: rgba(102, 126, 234, 0.1); color: #0c5460; border-left-color: #667eea; }
-        .progress-container { display: none; margin-top: 20px; background: #f9f9f9; padding: 18px; border-radius: 12px; border: 1px solid rgba(0,0,0,0.08); }
-        .progress-bar { width: 100%; height: 30px; background-color: #e0e0e0; border-radius: 10px; overflow: hidden; margin: 15px 0; box-shadow: inset 0 2px 4px rgba(0,0,0,0.06); display: flex; align-items: center; }
-        .progress-bar-inner { height: 100%; background: linear-gradient(90deg, #667eea 0%, #764ba2 100%); text-align: center; line-height: 30px; color: white; transition: width 0.4s ease; border-radius: 10px; font-weight: 600; font-size: 12px; }
-        #progress-log { margin-top: 10px; font-family: 'Courier New', monospace; font-size: 11px; max-height: 200px; overflow-y: auto; background: white; color: #222; padding: 12px; border-radius: 8px; border: 1px solid #e0e0e0; }
-        .notification { position: fixed; top: 20px; right: 20px; padding: 14px 18px; border-radius: 8px; color: white; font-weight: 600; z-index: 10000; animation: slideIn 0.3s ease-out; box-shadow: 0 8px 24px rgba(0,0,0,0.2); font-size: 13px; }
-        .notification.success { background: linear-gradient(135deg, #28a745 0%, #20c997 100%); }
-        .notification.error { background: linear-gradient(135deg, #dc3545 0%, #c82333 100%); }
-        .notification.info { background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); }
-        @keyframes slideIn { from { transform: translateX(400px); opacity: 0; } to { transform: translateX(0); opacity: 1; } }
-        #global-progress-btn { position: fixed; bottom: 20px; right: 20px; z-index: 9998; background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 12px 20px; border: none; border-radius: 8px; cursor: pointer; display: none; box-shadow: 0 8px 24px rgba(102, 126, 234, 0.3); font-weight: 600; transition: all 0.2s ease; font-size: 13px; }
-        #global-progress-btn:hover { transform: translateY(-2px); box-shadow: 0 12px 32px rgba(102, 126, 234, 0.4); }
-        .modal { display: none; position: fixed; z-index: 9999; left: 0; top: 0; width: 100%; height: 100%; background-color: rgba(0,0,0,0.4); backdrop-filter: blur(4px); overflow-y: auto; }
-        .modal-content { background: rgba(255, 255, 255, 0.98); margin: 20px auto; padding: 28px; border-radius: 16px; width: 90%; max-width: 800px; box-shadow: 0 20px 60px rgba(0,0,0,0.2); border: 1px solid rgba(255, 255, 255, 0.3); backdrop-filter: blur(10px); }
-        .modal-content .close { float: right; font-size: 28px; font-weight: bold; cursor: pointer; color: #999; transition: color 0.2s ease; }
-        .modal-content .close:hover { color: #667eea; }
-        hr { border: 0; border-top: 1px solid rgba(0,0,0,0.08); margin: 20px 0; }
-        @media (max-width: 768px) {
-            .sticky-header { flex-direction: column; gap: 12px; padding: 14px; }
-            .app-header { width: 100%; }
-            .manage-btn { width: 100%; justify-content: center; }
-            .tabs { padding: 12px; }
-            .tab-btn { padding: 8px 14px; font-size: 12px; }
-            .tab-content { padding: 18px; }
-            .card { padding: 16px; margin-bottom: 14px; }
-            .card-icon { width: 40px; height: 40px; font-size: 20px; }
-            .container { border-radius: 12px; }
-            body { padding: 10px; }
-            h1 { font-size: 20px; }
-            h2 { font-size: 16px; margin-top: 15px; margin-bottom: 12px; }
-            h3 { font-size: 14px; }
-            label { font-size: 12px; margin-bottom: 5px; }
-            input[type="text"], input[type="number"], select { padding: 8px 10px; margin-bottom: 10px; font-size: 12px; }
-            button { padding: 8px 14px; font-size: 11px; margin-right: 6px; margin-bottom: 6px; }
-            .modal-content { padding: 20px; margin: 15px auto; width: 95%; }
-            #progress-log { max-height: 150px; font-size: 10px; }
-            .notification { top: 10px; right: 10px; padding: 10px 14px; font-size: 11px; }
-            #global-progress-btn { bottom: 10px; right: 10px; padding: 9px 14px; font-size: 11px; }
-        }
-        @media (max-width: 480px) {
-            .sticky-header { gap: 10px; padding: 12px; }
-            .app-title h1 { font-size: 16px; }
-            .app-title p { font-size: 10px; }
-            .tabs { padding: 10px; gap: 6px; }
-            .tab-btn { padding: 7px 12px; font-size: 11px; }
-            .tab-content { padding: 14px; }
-            .card { padding: 14px; margin-bottom: 12px; }
-            .card-icon { width: 36px; height: 36px; font-size: 18px; }
-            .card-title { font-size: 14px; }
-            body { padding: 8px; }
-            h1 { font-size: 18px; margin-bottom: 8px; }
-            h2 { font-size: 14px; margin-top: 12px; margin-bottom: 10px; }
-            h3 { font-size: 12px; }
-            label { font-size: 11px; margin-bottom: 4px; }
-            input[type="text"], input[type="number"], select { padding: 7px 8px; margin-bottom: 8px; font-size: 11px; }
-            button { padding: 7px 11px; font-size: 10px; margin-right: 4px; margin-bottom: 4px; }
-            .modal-content { padding: 15px; margin: 10px auto; width: 98%; }
-            pre { font-size: 9px; padding: 8px; }
-            .notification { top: 8px; right: 8px; padding: 8px 12px; font-size: 10px; }
-            #global-progress-btn { bottom: 8px; right: 8px; padding: 6px 11px; font-size: 9px; }
-            .modal-content .close { font-size: 24px; }
-        }
-    </style>
-    <script>
-        function validateForm() { return true; }
-        function validateEncodeForm() { return true; }
-        function validateYtForm() {
-            const codec = document.getElementById('yt_codec').value;
-            if (codec.includes('h265') || codec.includes('av1')) {
-                const preset = document.getElementById('yt_preset').value;
-                if (!preset) { alert('Please select a preset.'); return false; }
-                const passMode = document.getElementById('yt_pass_mode').value;
-                if (passMode === '2-pass') {
-                    const bitrate = document.getElementById('yt_bitrate').value;
-                    if (!bitrate || parseInt(bitrate) < 100) { alert('Please specify a valid video bitrate (minimum 100) for 2-pass encoding.'); return false; }
-                }
-            }
-            return true;
-        }
-        function switchTab(tabName, btnEl) {
-            const tabs = document.querySelectorAll('.tab-content'); 
-            const btns = document.querySelectorAll('.tab-btn'); 
-            tabs.forEach(t => t.classList.remove('active')); 
-            btns.forEach(b => b.classList.remove('active')); 
-            document.getElementById('tab-' + tabName).classList.add('active'); 
-            event.target.classList.add('active'); 
-        }
-    </script>
-</head>
-<body>
-<!-- Global Progress Elements -->
-<button id="global-progress-btn">📊 View Progress</button>
-<div id="global-progress-modal" class="modal">
-    <div class="modal-content">
-        <span class="close" onclick="closeGlobalProgressModal()">&times;</span>
-        <div id="global-progress-container" class="progress-container" style="display:block;">
-            <h3 id="global-progress-stage">...</h3>
-            <div class="progress-bar"><div id="global-progress-bar-inner" class="progress-bar-inner">0%</div></div>
-            <pre id="global-progress-log"></pre>
-            <button id="global-stop-button" class="delete" style="margin-top:10px;">⏹️ Stop Process</button>
-        </div>
-    </div>
-</div>
-
-<!-- Sticky Header -->
-<div class="sticky-header">
-    <div class="app-header">
-        <div class="app-icon">🎬</div>
-        <div class="app-title">
-            <h1>Video Downloader & Uploader</h1>
-            <p>Powered by yt-dlp, FFmpeg, Pixeldrain & 4stream</p>
-        </div>
-    </div>
-    <a href="{{ url_for('list_files', current_path='') }}" class="manage-btn">📂 Manage Files</a>
-</div>
-
-<div class="container">
-    <!-- Tab Buttons -->
-    <div class="tabs">
-        <button class="tab-btn {% if current_tab == 'advanced' %}active{% endif %}" onclick="switchTab('advanced', this)">⚙️ Advanced Download</button>
-        <button class="tab-btn {% if current_tab == 'youtube' %}active{% endif %}" onclick="switchTab('youtube', this)">🎥 YouTube Download</button>
-        <button class="tab-btn {% if current_tab == 'merge' %}active{% endif %}" onclick="switchTab('merge', this)">🔗 Format Merge</button>
-        <button class="tab-btn {% if current_tab == 'direct' %}active{% endif %}" onclick="switchTab('direct', this)">📥 Direct Download</button>
-        <button class="tab-btn {% if current_tab == 'upload' %}active{% endif %}" onclick="switchTab('upload', this)">☁️ Upload to Pixeldrain</button>
-        <button class="tab-btn {% if current_tab == '4stream' %}active{% endif %}" onclick="switchTab('4stream', this)">🎬 Upload to 4stream</button>
-        <button class="tab-btn {% if current_tab == 'links' %}active{% endif %}" onclick="switchTab('links', this)">🔗 External Links</button>
-    </div>
-    {% with messages = get_flashed_messages(with_categories=true) %}
-        {% if messages %}
-            {% for category, message in messages %}
-                <div class="flash-msg flash-{{ category }}">{{ message|safe }}</div>
-            {% endfor %}
-        {% endif %}
-    {% endwith %}
-
-    <!-- Advanced Download Tab -->
-    <div id="tab-advanced" class="tab-content {% if current_tab == 'advanced' %}active{% endif %}">
-        <div class="card">
-            <div class="card-header">
-                <div class="card-icon blue">⚙️</div>
-                <div>
-                    <h2 class="card-title">Advanced Download</h2>
-                    <p class="card-desc">Download and encode videos with full control over formats and codecs</p>
-                </div>
-            </div>
-            <div class="helper-text">💡 Fetch available formats first, then select your preferred video and audio quality</div>
-
-            <div id="progress-container" class="progress-container">
-                <h3 id="progress-stage">Starting...</h3>
-                <div class="progress-bar">
-                    <div id="progress-bar-inner" class="progress-bar-inner">0%</div>
-                </div>
-                <pre id="progress-log"></pre>
-                <button id="stop-button" class="delete">⏹️ Stop Encoding</button>
-            </div>
-
-            <form method="POST" action="{{ url_for('index') }}" id="download-form" onsubmit="return true;">
-        <label>Video URL:</label><br>
-        <input type="text" name="url" size="80" value="{{ url }}" required><br>
-        <button type="submit" name="action" value="fetch">Fetch Formats</button><br><br>
-
-        {% if formats %}
-            <input type="hidden" name="url" value="{{ url }}">
-
-            <label>Video Format:</label><br>
-            <select name="video_id" required>
-                {% for format in video_formats %}
-                    <option value="{{ format.id }}" {% if format.is_muxed %}style="font-style: italic;"{% endif %}>{{ format.display }}{% if format.is_muxed %} (with audio){% endif %}</option>
-                {% endfor %}
-            </select><br>
-
-            <label>Audio Format (optional):</label><br>
-            <select name="audio_id">
-                <option value="">Best Audio (default)</option>
-                {% for format in audio_formats %}
-                    <option value="{{ format.id }}">{{ format.display }}</option>
-                {% endfor %}
-            </select><br>
-
-            <label>Filename:</label><br>
-            <input type="text" name="filename" value="{{ original_name }}" required><br>
-            <label>Codec:</label><br>
-            <select name="codec" id="codec" required>
-                <option value="none" {% if codec == "none" %}selected{% endif %}>No Encoding</option>
-                <option value="h265" {% if codec == "h265" %}selected{% endif %}>Encode to H.265 (x265)</option>
-                <option value="av1" {% if codec == "av1" %}selected{% endif %}>Encode to AV1 (SVT-AV1)</option>
-                <option value="h265_copy_audio" {% if codec == "h265_copy_audio" %}selected{% endif %}>H.265 Video Only (Copy Audio)</option>
-                <option value="av1_copy_audio" {% if codec == "av1_copy_audio" %}selected{% endif %}>AV1 Video Only (Copy Audio)</option>
-                <option value="copy_video" {% if codec == "copy_video" %}selected{% endif %}>Copy Video (Encode Audio Only)</option>
-            </select><br>
-            <div id="encoding-options" style="display: {% if codec != 'none' %}block{% else %}none{% endif %};">
-                <div id="video-encoding-options">
-                    <label>Encoding Mode:</label><br>
-                    <select name="pass_mode" id="pass_mode">
-                        <option value="1-pass" {% if pass_mode == "1-pass" %}selected{% endif %}>1-pass (CRF)</option>
-                        <option value="2-pass" {% if pass_mode == "2-pass" %}selected{% endif %}>2-pass (VBR)</option>
-                    </select><br>
-                    <label>Preset (slower = better quality/smaller file):</label><br>
-                    <select name="preset" id="preset"></select><br>
-
-                    <label>Video Bitrate (kb/s, optional):</label><br>
-                    <input type="number" name="bitrate" id="bitrate" value="{{ bitrate }}" min="100" placeholder="e.g., 600 for AV1, 2000 for H.265"><br>
-
-                    <label>CRF (0–63, lower = better quality):</label><br>
-                    <input type="number" name="crf" id="crf" value="{{ crf|default(28 if codec == 'h265' else 45) }}" min="0" max="63" step="1" placeholder="e.g., 28 for H.265, 45 for AV1"><br>
-
-                    <label>Frame Rate (optional):</label><br>
-                    <select name="fps">
-                        <option value="">Original</option>
-                        <option value="24">24 fps</option>
-                        <option value="30">30 fps</option>
-                        <option value="60">60 fps</option>
-                    </select><br>
-
-                    <label>Resolution (Scale, optional):</label><br>
-                    <select name="scale">
-                        <option value="">Original</option>
-                        <option value="1920:-2">1080p (1920px wide)</option>
-                        <option value="1280:-2">720p (1280px wide)</option>
-                        <option value="854:-2">480p (854px wide)</option>
-                        <option value="640:-2">360p (640px wide)</option>
-                    </select><br>
-
-                    <label>Adaptive Quantization Mode (AV1 only):</label><br>
-                    <select name="aq_mode" id="aq_mode">
-                        <option value="0">Disabled</option>
-                        <option value="1">PSNR-based</option>
-                        <option value="2" selected>Variance-based</option>
-                    </select><br>
-
-                    <label>Variance Boost (AV1 only, 0–3):</label><br>
-                    <input type="number" name="variance_boost" id="variance_boost" value="2" min="0" max="3" step="1" placeholder="e.g., 2"><br>
-
-                    <label>Tiles (AV1 only, e.g., 2x2 for faster encoding):</label><br>
-                    <select name="tiles" id="tiles">
-                        <option value="">None</option>
-                        <option value="2x2" selected>2x2 (Recommended for 720p)</option>
-                        <option value="4x4">4x4</option>
-                    </select><br>
-
-                    <label><input type="checkbox" name="enable_vmaf" value="true"> Compute VMAF Quality Score (slower)</label><br>
-                </div>
-
-                <div id="audio-encoding-options">
-                    <label>Audio Bitrate (kb/s):</label><br>
-                    <input type="number" name="audio_bitrate" id="audio_bitrate" value="{{ audio_bitrate|default('32') }}" min="32" max="512" step="8" placeholder="e.g., 32, 64, 96, 128"><br>
-
-                    <label><input type="checkbox" name="force_stereo" value="true"> Force Stereo (2-channel) Audio</label><br>
-                </div>
-            </div>
-            <script>
-                const codecSelect = document.getElementById('codec');
-                const presetSelect = document.getElementById('preset');
-                const crfInput = document.getElementById('crf');
-                const passModeSelect = document.getElementById('pass_mode');
-                const bitrateInput = document.getElementById('bitrate');
-                const aqModeSelect = document.getElementById('aq_mode');
-                const varianceBoostInput = document.getElementById('variance_boost');
-                const tilesSelect = document.getElementById('tiles');
-
-                function updatePresetOptions() {
-                    const codec = codecSelect.value;
-                    const encodingOptions = document.getElementById('encoding-options');
-                    const videoEncodingOptions = document.getElementById('video-encoding-options');
-                    const audioEncodingOptions = document.getElementById('audio-encoding-options');
-                    encodingOptions.style.display = codec !== 'none' ? 'block' : 'none';
-                    if (codec === 'copy_video') {
-                        videoEncodingOptions.style.display = 'none';
-                        audioEncodingOptions.style.display = 'block';
-                    } else if (codec.endsWith('_copy_audio')) {
-                        videoEncodingOptions.style.display = 'block';
-                        audioEncodingOptions.style.display = 'none';
-                    } else if (codec !== 'none') {
-                        videoEncodingOptions.style.display = 'block';
-                        audioEncodingOptions.style.display = 'block';
-                    }
-
-                    presetSelect.innerHTML = '';
-                    if (codec === 'av1' || codec === 'av1_copy_audio') {
-                        for (let p = 0; p <= 13; p++) {
-                            let label = p.toString();
-                            if (p === 0) label += ' (slowest)';
-                            else if (p === 13) label += ' (fastest)';
-                            else if (p > 7) label += ' (fast)';
-                            else label += ' (medium)';
-                            const option = document.createElement('option');
-                            option.value = p; option.text = label;
-                            if (p === 7) option.selected = true;
-                            presetSelect.appendChild(option);
-                        }
-                        crfInput.value = crfInput.value || '45';
-                        crfInput.placeholder = 'e.g., 45 for AV1';
-                        aqModeSelect.disabled = false; varianceBoostInput.disabled = false; tilesSelect.disabled = false;
-                    } else if (codec === 'h265' || codec === 'h265_copy_audio') {
-                        const presets = ['ultrafast', 'superfast', 'veryfast', 'faster', 'fast', 'medium', 'slow', 'slower', 'veryslow', 'placebo'];
-                        presets.forEach(p => {
-                            const option = document.createElement('option');
-                            option.value = p; option.text = p;
-                            if (p === 'faster') option.selected = true;
-                            presetSelect.appendChild(option);
-                        });
-                        crfInput.value = crfInput.value || '28';
-                        crfInput.placeholder = 'e.g., 28 for H.265';
-                        aqModeSelect.disabled = true; varianceBoostInput.disabled = true; tilesSelect.disabled = true;
-                    } else {
-                        aqModeSelect.disabled = true; varianceBoostInput.disabled = true; tilesSelect.disabled = true;
-                    }
-
-                    if (codec === 'none') {
-                        bitrateInput.removeAttribute('required');
-                        bitrateInput.removeAttribute('min');
-                        bitrateInput.value = '';
-                    } else {
-                        bitrateInput.setAttribute('min', '100');
-                        if (passModeSelect.value === '2-pass') {
-                            bitrateInput.setAttribute('required', 'required');
-                        } else {
-                            bitrateInput.removeAttribute('required');
-                        }
-                    }
-                }
-                function validateForm() {
-                    const codec = codecSelect.value;
-                    if (codec.includes('h265') || codec.includes('av1')) {
-                        if (!presetSelect.value) { alert('Please select a preset.'); return false; }
-                        if (passModeSelect.value === '2-pass' && (!bitrateInput.value || parseInt(bitrateInput.value) < 100)) { alert('Please specify a valid video bitrate (minimum 100) for 2-pass encoding.'); return false; }
-                        if (codec.includes('av1')) {
-                            const varianceBoost = parseInt(varianceBoostInput.value);
-                            if (isNaN(varianceBoost) || varianceBoost < 0 || varianceBoost > 3) { alert('Variance Boost must be between 0 and 3.'); return false; }
-                        }
-                    }
-                    return true;
-                }
-                codecSelect.addEventListener('change', updatePresetOptions);
-                passModeSelect.addEventListener('change', function() {
-                    if (codecSelect.value !== 'none') {
-                        if (this.value === '2-pass') bitrateInput.setAttribute('required', 'required');
-                        else bitrateInput.removeAttribute('required');
-                    }
-                });
-                document.addEventListener('DOMContentLoaded', updatePresetOptions);
-            </script>
-            <br>
-            <label><input type="checkbox" name="upload_pixeldrain" value="true"> Upload to Pixeldrain after completion</label><br>
-            <label><input type="checkbox" name="upload_gofile" value="true"> Upload to Gofile after completion</label><br><br>
-                <button type="submit" name="action" value="download" class="encode">▶️ Download & Convert</button>
-                <h3 style="margin-top: 20px;">📋 Available Formats:</h3>
-                <pre>{{ formats }}</pre>
-            {% endif %}
-            </form>
-            <script>
-                let advEventSource = null;
-                const downloadForm = document.getElementById('download-form');
-
-                downloadForm.addEventListener('submit', function(e) {
-                    const action = e.submitter?.value;
-                    if (action === 'download') {
-                        e.preventDefault();
-                        const formData = new FormData(downloadForm);
-                        formData.set('action', 'download');
-
-                        const container = document.getElementById('progress-container');
-                        const log = document.getElementById('progress-log');
-                        container.style.display = 'block';
-                        log.innerHTML = '';
-
-                        fetch('/', { method: 'POST', body: formData }).then(r => r.text());
-                        setTimeout(() => startAdvancedProgressListener(), 300);
-                    }
-                });
-
-                function startAdvancedProgressListener() {
-                    if (advEventSource) advEventSource.close();
-                    advEventSource = new EventSource("/progress");
-                    const stage = document.getElementById('progress-stage');
-                    const progressBar = document.getElementById('progress-bar-inner');
-                    const log = document.getElementById('progress-log');
-                    const container = document.getElementById('progress-container');
-
-                    container.style.display = 'block';
-
-                    advEventSource.onmessage = function(event) {
-                        try {
-                            const data = JSON.parse(event.data);
-                            if (data.log === 'DONE') {
-                                stage.textContent = '✅ Completed!';
-                                progressBar.style.backgroundColor = '#28a745';
-                                progressBar.style.width = '100%';
-                                progressBar.textContent = '100%';
-                                log.innerHTML += "\n\n✅ Operation finished.";
-                                advEventSource.close();
-                                return;
-                            }
-                            if (data.error) {
-                                stage.textContent = '❌ Error!';
-                                progressBar.style.backgroundColor = '#dc3545';
-                                log.innerHTML += `\n\n❌ ERROR: ${data.error}`;
-                                advEventSource.close();
-                                return;
-                            }
-                            if (data.stage) stage.textContent = data.stage;
-                            if (data.percent) {
-                                const percent = Math.min(100, data.percent);
-                                progressBar.style.width = percent + '%';
-                                progressBar.textContent = percent.toFixed(1) + '%';
-                            }
-                            if (data.log) {
-                                log.innerHTML += data.log + '\n';
-                                log.scrollTop = log.scrollHeight;
-                            }
-                        } catch (e) { console.error('Progress error:', e); }
-                    };
-                    advEventSource.onerror = function() { if (advEventSource) advEventSource.close(); };
-                }
-
-                document.getElementById('stop-button')?.addEventListener('click', function() {
-                    if (advEventSource) advEventSource.close();
-                    fetch('/stop_process', { method: 'POST' });
-                });
-            </script>
-        </div>
-    </div>
-
-    <!-- YouTube Download Tab -->
-    <div id="tab-youtube" class="tab-content {% if current_tab == 'youtube' %}active{% endif %}">
-        <div class="card">
-            <div class="card-header">
-                <div class="card-icon blue">🎥</div>
-                <div>
-                    <h2 class="card-title">YouTube Download</h2>
-                    <p class="card-desc">Download YouTube videos using authentication cookies for restricted content</p>
-                </div>
-            </div>
-            <div class="helper-text">💡 Download YouTube videos with full format selection and encoding options</div>
-
-            <div id="yt-progress-container" class="progress-container">
-                <h3 id="yt-progress-stage">Starting...</h3>
-                <div class="progress-bar">
-                    <div id="yt-progress-bar-inner" class="progress-bar-inner">0%</div>
-                </div>
-                <pre id="yt-progress-log"></pre>
-                <button id="yt-stop-button" class="delete">⏹️ Stop Download</button>
-            </div>
-
-            <form method="POST" action="{{ url_for('youtube_download') }}" id="youtube-form">
-        <label>YouTube URL:</label><br>
-        <input type="text" name="yt_url" size="80" value="{{ yt_url }}" required placeholder="https://www.youtube.com/watch?v=..."><br>
-        <button type="submit" name="action" value="yt_fetch">🔍 Fetch Formats</button><br><br>
-
-        {% if yt_formats %}
-            <input type="hidden" name="yt_url" value="{{ yt_url }}">
-
-            <label>Video Format:</label><br>
-            <select name="yt_video_id" required>
-                {% for format in yt_video_formats %}
-                    <option value="{{ format.id }}" {% if format.is_muxed %}style="font-style: italic;"{% endif %}>{{ format.display }}{% if format.is_muxed %} (with audio){% endif %}</option>
-                {% endfor %}
-            </select><br>
-
-            <label>Audio Format (optional):</label><br>
-            <select name="yt_audio_id">
-                <option value="">Best Audio (default)</option>
-                {% for format in yt_audio_formats %}
-                    <option value="{{ format.id }}">{{ format.display }}</option>
-                {% endfor %}
-            </select><br>
-
-            <label>Filename:</label><br>
-            <input type="text" name="yt_filename" value="{{ yt_original_name }}" required><br>
-            <label>Codec:</label><br>
-            <select name="yt_codec" id="yt_codec" required>
-                <option value="none" {% if yt_codec == "none" %}selected{% endif %}>No Encoding</option>
-                <option value="h265" {% if yt_codec == "h265" %}selected{% endif %}>Encode to H.265 (x265)</option>
-                <option value="av1" {% if yt_codec == "av1" %}selected{% endif %}>Encode to AV1 (SVT-AV1)</option>
-                <option value="h265_copy_audio" {% if yt_codec == "h265_copy_audio" %}selected{% endif %}>H.265 Video Only (Copy Audio)</option>
-                <option value="av1_copy_audio" {% if yt_codec == "av1_copy_audio" %}selected{% endif %}>AV1 Video Only (Copy Audio)</option>
-                <option value="copy_video" {% if yt_codec == "copy_video" %}selected{% endif %}>Copy Video (Encode Audio Only)</option>
-            </select><br>
-            <div id="yt-encoding-options" style="display: {% if yt_codec != 'none' %}block{% else %}none{% endif %};">
-                <div id="yt-video-encoding-options" style="display:none;">
-                    <label>Encoding Mode:</label><br>
-                    <select name="yt_pass_mode" id="yt_pass_mode">
-                        <option value="1-pass" {% if yt_pass_mode == "1-pass" %}selected{% endif %}>1-pass (CRF)</option>
-                        <option value="2-pass" {% if yt_pass_mode == "2-pass" %}selected{% endif %}>2-pass (VBR)</option>
-                    </select><br>
-                    <label>Preset (slower = better quality/smaller file):</label><br>
-                    <select name="yt_preset" id="yt_preset"></select><br>
-
-                    <label>Video Bitrate (kb/s, optional):</label><br>
-                    <input type="number" name="yt_bitrate" id="yt_bitrate" value="{{ yt_bitrate }}" min="100" placeholder="e.g., 600 for AV1, 2000 for H.265"><br>
-
-                    <label>CRF (0–63, lower = better quality):</label><br>
-                    <input type="number" name="yt_crf" id="yt_crf" value="{{ yt_crf|default(28 if yt_codec == 'h265' else 45) }}" min="0" max="63" step="1" placeholder="e.g., 28 for H.265, 45 for AV1"><br>
-
-                    <label>Frame Rate (optional):</label><br>
-                    <select name="yt_fps">
-                        <option value="">Original</option>
-                        <option value="24">24 fps</option>
-                        <option value="30">30 fps</option>
-                        <option value="60">60 fps</option>
-                    </select><br>
-
-                    <label>Resolution (Scale, optional):</label><br>
-                    <select name="yt_scale">
-                        <option value="">Original</option>
-                        <option value="1920:-2">1080p (1920px wide)</option>
-                        <option value="1280:-2">720p (1280px wide)</option>
-                        <option value="854:-2">480p (854px wide)</option>
-                        <option value="640:-2">360p (640px wide)</option>
-                    </select><br>
-
-                    <label>Adaptive Quantization Mode (AV1 only):</label><br>
-                    <select name="yt_aq_mode" id="yt_aq_mode">
-                        <option value="0">Disabled</option>
-                        <option value="1">PSNR-based</option>
-                        <option value="2" selected>Variance-based</option>
-                    </select><br>
-
-                    <label>Variance Boost (AV1 only, 0–3):</label><br>
-                    <input type="number" name="yt_variance_boost" id="yt_variance_boost" value="2" min="0" max="3" step="1" placeholder="e.g., 2"><br>
-
-                    <label>Tiles (AV1 only, e.g., 2x2 for faster encoding):</label><br>
-                    <select name="yt_tiles" id="yt_tiles">
-                        <option value="">None</option>
-                        <option value="2x2" selected>2x2 (Recommended for 720p)</option>
-                        <option value="4x4">4x4</option>
-                    </select><br>
-
-                    <label><input type="checkbox" name="yt_enable_vmaf" value="true"> Compute VMAF Quality Score (slower)</label><br>
-                </div>
-
-                <div id="yt-audio-encoding-options">
-                    <label>Audio Bitrate (kb/s):</label><br>
-                    <input type="number" name="yt_audio_bitrate" id="yt_audio_bitrate" value="{{ yt_audio_bitrate|default('32') }}" min="32" max="512" step="8" placeholder="e.g., 32, 64, 96, 128"><br>
-
-                    <label><input type="checkbox" name="yt_force_stereo" value="true"> Force Stereo (2-channel) Audio</label><br>
-                </div>
-            </div>
-            <script>
-                const ytCodecSelect = document.getElementById('yt_codec');
-                const ytPresetSelect = document.getElementById('yt_preset');
-                const ytCrfInput = document.getElementById('yt_crf');
-                const ytPassModeSelect = document.getElementById('yt_pass_mode');
-                const ytBitrateInput = document.getElementById('yt_bitrate');
-                const ytAqModeSelect = document.getElementById('yt_aq_mode');
-                const ytVarianceBoostInput = document.getElementById('yt_variance_boost');
-                const ytTilesSelect = document.getElementById('yt_tiles');
-
-                function updateYtPresetOptions() {
-                    const codec = ytCodecSelect.value;
-                    const encodingOptions = document.getElementById('yt-encoding-options');
-                    const videoEncodingOptions = document.getElementById('yt-video-encoding-options');
-                    const audioEncodingOptions = document.getElementById('yt-audio-encoding-options');
-                    encodingOptions.style.display = codec !== 'none' ? 'block' : 'none';
-                    if (codec === 'copy_video') {
-                        videoEncodingOptions.style.display = 'none';
-                        audioEncodingOptions.style.display = 'block';
-                    } else if (codec.endsWith('_copy_audio')) {
-                        videoEncodingOptions.style.display = 'block';
-                        audioEncodingOptions.style.display = 'none';
-                    } else if (codec !== 'none') {
-                        videoEncodingOptions.style.display = 'block';
-                        audioEncodingOptions.style.display = 'block';
-                    }
-
-                    ytPresetSelect.innerHTML = '';
-                    if (codec === 'av1' || codec === 'av1_copy_audio') {
-                        for (let p = 0; p <= 13; p++) {
-                            let label = p.toString();
-                            if (p === 0) label += ' (slowest)';
-                            else if (p === 13) label += ' (fastest)';
-                            else if (p > 7) label += ' (fast)';
-                            else label += ' (medium)';
-                            const option = document.createElement('option');
-                            option.value = p; option.text = label;
-                            if (p === 7) option.selected = true;
-                            ytPresetSelect.appendChild(option);
-                        }
-                        ytCrfInput.value = ytCrfInput.value || '45';
-                        ytCrfInput.placeholder = 'e.g., 45 for AV1';
-                        ytAqModeSelect.disabled = false; ytVarianceBoostInput.disabled = false; ytTilesSelect.disabled = false;
-                    } else if (codec === 'h265' || codec === 'h265_copy_audio') {
-                        const presets = ['ultrafast', 'superfast', 'veryfast', 'faster', 'fast', 'medium', 'slow', 'slower', 'veryslow', 'placebo'];
-                        presets.forEach(p => {
-                            const option = document.createElement('option');
-                            option.value = p; option.text = p;
-                            if (p === 'faster') option.selected = true;
-                            ytPresetSelect.appendChild(option);
-                        });
-                        ytCrfInput.value = ytCrfInput.value || '28';
-                        ytCrfInput.placeholder = 'e.g., 28 for H.265';
-                        ytAqModeSelect.disabled = true; ytVarianceBoostInput.disabled = true; ytTilesSelect.disabled = true;
-                    } else {
-                        ytAqModeSelect.disabled = true; ytVarianceBoostInput.disabled = true; ytTilesSelect.disabled = true;
-                    }
-
-                    if (codec === 'none') {
-                        ytBitrateInput.removeAttribute('required');
-                        ytBitrateInput.removeAttribute('min');
-                        ytBitrateInput.value = '';
-                    } else {
-                        ytBitrateInput.setAttribute('min', '100');
-                        if (ytPassModeSelect.value === '2-pass') {
-                            ytBitrateInput.setAttribute('required', 'required');
-                        } else {
-                            ytBitrateInput.removeAttribute('required');
-                        }
-                    }
-                }
-                function validateYtForm() {
-                    const codec = ytCodecSelect.value;
-                    if (codec.includes('h265') || codec.includes('av1')) {
-                        if (!ytPresetSelect.value) { alert('Please select a preset.'); return false; }
-                        if (ytPassModeSelect.value === '2-pass' && (!ytBitrateInput.value || parseInt(ytBitrateInput.value) < 100)) { alert('Please specify a valid video bitrate (minimum 100) for 2-pass encoding.'); return false; }
-                        if (codec.includes('av1')) {
-                            const varianceBoost = parseInt(ytVarianceBoostInput.value);
-                            if (isNaN(varianceBoost) || varianceBoost < 0 || varianceBoost > 3) { alert('Variance Boost must be between 0 and 3.'); return false; }
-                        }
-                    }
-                    return true;
-                }
-                ytCodecSelect.addEventListener('change', updateYtPresetOptions);
-                ytPassModeSelect.addEventListener('change', function() {
-                    if (ytCodecSelect.value !== 'none') {
-                        if (this.value === '2-pass') ytBitrateInput.setAttribute('required', 'required');
-                        else ytBitrateInput.removeAttribute('required');
-                    }
-                });
-                document.addEventListener('DOMContentLoaded', updateYtPresetOptions);
-            </script>
-            <script>
-                let ytEventSource = null;
-                const youtubeForm = document.getElementById('youtube-form');
-
-                youtubeForm.addEventListener('submit', function(e) {
-                    const action = e.submitter?.value;
-                    if (action === 'yt_download') {
-                        e.preventDefault();
-                        const formData = new FormData(youtubeForm);
-                        formData.set('action', 'yt_download');
-
-                        const container = document.getElementById('yt-progress-container');
-                        const log = document.getElementById('yt-progress-log');
-                        container.style.display = 'block';
-                        log.innerHTML = '';
-
-                        fetch('/youtube', { method: 'POST', body: formData }).then(r => r.text());
-                        setTimeout(() => startYoutubeProgressListener(), 300);
-                    }
-                });
-
-                function startYoutubeProgressListener() {
-                    if (ytEventSource) {
-                        ytEventSource.close();
-                    }
-                    ytEventSource = new EventSource("/progress");
-                    const stage = document.getElementById('yt-progress-stage');
-                    const progressBar = document.getElementById('yt-progress-bar-inner');
-                    const log = document.getElementById('yt-progress-log');
-                    const container = document.getElementById('yt-progress-container');
-
-                    container.style.display = 'block';
-
-                    ytEventSource.onmessage = function(event) {
-                        try {
-                            const data = JSON.parse(event.data);
-
-                            if (data.log && data.log === 'DONE') {
-                                stage.textContent = '✅ Completed!';
-                                progressBar.style.backgroundColor = '#28a745';
-                                progressBar.style.width = '100%';
-                                progressBar.textContent = '100%';
-                                log.innerHTML += "\n\n✅ Operation finished.";
-                                ytEventSource.close();
-                                ytEventSource = null;
-                                return;
-                            }
-
-                            if (data.error) {
-                                stage.textContent = '❌ Error!';
-                                progressBar.style.backgroundColor = '#dc3545';
-                                log.innerHTML += `\n\n❌ ERROR: ${data.error}`;
-                                ytEventSource.close();
-                                ytEventSource = null;
-                                return;
-                            }
-
-                            if (data.stage) stage.textContent = data.stage;
-                            if (data.percent) {
-                                const percent = Math.min(100, data.percent);
-                                progressBar.style.width = percent + '%';
-                                progressBar.textContent = percent.toFixed(1) + '%';
-                            }
-                            if (data.log) {
-                                log.innerHTML += data.log + '\n';
-                                log.scrollTop = log.scrollHeight;
-                            }
-                        } catch (e) {
-                            console.error('Error parsing progress data:', e);
-                        }
-                    };
-
-                    ytEventSource.onerror = function(err) {
-                        if (ytEventSource) ytEventSource.close();
-                        ytEventSource = null;
-                        console.error('YouTube progress stream error:', err);
-                    };
-                }
-
-                const ytStopButton = document.getElementById('yt-stop-button');
-                ytStopButton.addEventListener('click', function() {
-                    if (ytEventSource) {
-                        ytEventSource.close();
-                        ytEventSource = null;
-                    }
-                    fetch('/stop_process', { method: 'POST' });
-                });
-            </script>
-            <br>
-            <label><input type="checkbox" name="yt_upload_pixeldrain" value="true"> Upload to Pixeldrain after completion</label><br>
-            <label><input type="checkbox" name="yt_upload_gofile" value="true"> Upload to Gofile after completion</label><br><br>
-                <button type="submit" name="action" value="yt_download" class="encode">▶️ Download & Convert</button>
-                <h3 style="margin-top: 20px;">📋 Available Formats:</h3>
-                <pre>{{ yt_formats }}</pre>
-            {% endif %}
-            </form>
-        </div>
-    </div>
-
-    <!-- Direct Download Tab -->
-    <div id="tab-direct" class="tab-content {% if current_tab == 'direct' %}active{% endif %}">
-        <div class="card">
-            <div class="card-header">
-                <div class="card-icon green">📥</div>
-                <div>
-                    <h2 class="card-title">Direct URL Download</h2>
-                    <p class="card-desc">Download any video or direct file without format selection</p>
-                </div>
-            </div>
-            <div class="helper-text">💡 Paste any URL (videos, playlists, direct files). Optional: Use username & password for authenticated downloads</div>
-
-            <form method="POST" action="{{ url_for('index') }}">
-                <label>URL (Video, Playlist, or any direct file):</label><br>
-                <input type="text" name="direct_url" size="80" required><br>
-
-                <label>Username (optional, leave empty if not needed):</label><br>
-                <input type="text" name="direct_username" placeholder="e.g., admin" size="80"><br>
-
-                <label>Password (optional, leave empty if not needed):</label><br>
-                <input type="text" name="direct_password" placeholder="e.g., 1234" size="80"><br>
-
-                <label><input type="checkbox" name="upload_pixeldrain_direct" value="true"> ☁️ Upload to Pixeldrain after download</label><br>
-                <label><input type="checkbox" name="upload_gofile_direct" value="true"> 📤 Upload to Gofile after download</label><br>
-                <button type="submit" name="action" value="direct_download">📥 Download to Server</button>
-                <button type="submit" name="action" value="direct_upload_pixeldrain" class="upload">☁️ Upload to Pixeldrain</button>
-            </form>
-        </div>
-    </div>
-
-    <!-- Upload Tab -->
-    <div id="tab-upload" class="tab-content {% if current_tab == 'upload' %}active{% endif %}">
-        <div class="card">
-            <div class="card-header">
-                <div class="card-icon orange">☁️</div>
-                <div>
-                    <h2 class="card-title">Upload File to Pixeldrain</h2>
-                    <p class="card-desc">Upload any file from your computer directly</p>
-                </div>
-            </div>
-            <div class="helper-text">💡 Select a file and upload. Pixeldrain provides fast, anonymous file hosting</div>
-
-            <form method="POST" action="{{ url_for('upload_direct') }}" enctype="multipart/form-data">
-                <label>Select a file from your computer:</label><br>
-                <input type="file" name="file" required><br>
-                <button type="submit" class="upload">☁️ Upload Directly</button>
-            </form>
-        </div>
-    </div>
-
-    <!-- Format Merge Tab -->
-    <div id="tab-merge" class="tab-content {% if current_tab == 'merge' %}active{% endif %}">
-        <div class="card">
-            <div class="card-header">
-                <div class="card-icon blue">🔗</div>
-                <div>
-                    <h2 class="card-title">Manual Format Merge</h2>
-                    <p class="card-desc">Fetch formats from a URL, then manually merge video and audio</p>
-                </div>
-            </div>
-            <div class="helper-text">💡 Fetch formats first, then specify Video/Audio IDs to merge into an MKV file</div>
-
-            <div id="merge-progress-container" class="progress-container">
-                <h3 id="merge-progress-stage">Starting...</h3>
-                <div class="progress-bar">
-                    <div id="merge-progress-bar-inner" class="progress-bar-inner">0%</div>
-                </div>
-                <pre id="merge-progress-log"></pre>
-                <button id="merge-stop-button" class="delete">⏹️ Stop</button>
-            </div>
-
-            <form method="POST" action="{{ url_for('index') }}" id="merge-form" onsubmit="return true;">
-                <label>Page URL:</label><br>
-                <input type="text" name="manual_url" size="80" value="{{ manual_url }}" required><br>
-                <button type="submit" name="action" value="manual_fetch">🔍 Fetch Formats</button><br><br>
-                {% if manual_formats_raw %}
-                    <input type="hidden" name="manual_url" value="{{ manual_url }}">
-                    <h3 style="margin-top: 15px;">📋 Available Formats:</h3>
-                    <pre>{{ manual_formats_raw }}</pre>
-                    <label>Video ID:</label><br>
-                    <input type="text" name="manual_video_id" required placeholder="Enter the ID of the video stream"><br>
-                    <label>Audio ID (optional):</label><br>
-                    <input type="text" name="manual_audio_id" placeholder="Enter ID of audio stream (leave blank for video-only)"><br>
-                    <label>Filename (will be saved as .mkv):</label><br>
-                    <input type="text" name="manual_filename" value="{{ manual_filename }}" required><br><br>
-                    <label><input type="checkbox" name="upload_pixeldrain" value="true"> Upload to Pixeldrain after completion</label><br>
-                    <label><input type="checkbox" name="upload_4stream" value="true"> 🎬 Upload to 4stream after completion</label><br>
-                    <label><input type="checkbox" name="upload_gofile" value="true"> Upload to Gofile after completion</label><br><br>
-                    <button type="submit" name="action" value="manual_merge" class="encode">🔗 Merge & Download</button>
-                {% endif %}
-            </form>
-            <script>
-                let mergeEventSource = null;
-                const mergeForm = document.getElementById('merge-form');
-
-                mergeForm.addEventListener('submit', function(e) {
-                    if (e.submitter?.value === 'manual_merge') {
-                        e.preventDefault();
-                        const formData = new FormData(mergeForm);
-                        formData.set('action', 'manual_merge');
-
-                        const container = document.getElementById('merge-progress-container');
-                        const log = document.getElementById('merge-progress-log');
-                        container.style.display = 'block';
-                        log.innerHTML = '';
-
-                        fetch('/', { method: 'POST', body: formData }).then(r => r.text());
-                        setTimeout(() => startMergeProgressListener(), 300);
-                    }
-                });
-
-                function startMergeProgressListener() {
-                    if (mergeEventSource) mergeEventSource.close();
-                    mergeEventSource = new EventSource("/progress");
-                    const stage = document.getElementById('merge-progress-stage');
-                    const progressBar = document.getElementById('merge-progress-bar-inner');
-                    const log = document.getElementById('merge-progress-log');
-                    const container = document.getElementById('merge-progress-container');
-
-                    container.style.display = 'block';
-                    log.innerHTML = '';
-
-                    mergeEventSource.onmessage = function(event) {
-                        try {
-                            const data = JSON.parse(event.data);
-                            if (data.log === 'DONE') {
-                                stage.textContent = '✅ Completed!';
-                                progressBar.style.backgroundColor = '#28a745';
-                                progressBar.style.width = '100%';
-                                progressBar.textContent = '100%';
-                                log.innerHTML += "\n\n✅ Operation finished.";
-                                mergeEventSource.close();
-                                return;
-                            }
-                            if (data.error) {
-                                stage.textContent = '❌ Error!';
-                                progressBar.style.backgroundColor = '#dc3545';
-                                log.innerHTML += `\n\n❌ ERROR: ${data.error}`;
-                                mergeEventSource.close();
-                                return;
-                            }
-                            if (data.stage) stage.textContent = data.stage;
-                            if (data.percent) {
-                                const percent = Math.min(100, data.percent);
-                                progressBar.style.width = percent + '%';
-                                progressBar.textContent = percent.toFixed(1) + '%';
-                            }
-                            if (data.log) {
-                                log.innerHTML += data.log + '\n';
-                                log.scrollTop = log.scrollHeight;
-                            }
-                        } catch (e) { console.error('Merge progress error:', e); }
-                    };
-                    mergeEventSource.onerror = function() { if (mergeEventSource) mergeEventSource.close(); };
-                }
-
-                document.getElementById('merge-stop-button')?.addEventListener('click', function() {
-                    if (mergeEventSource) mergeEventSource.close();
-                    fetch('/stop_process', { method: 'POST' });
-                });
-            </script>
-        </div>
-    </div>
-
-    <!-- 4stream Upload Tab -->
-    <div id="tab-4stream" class="tab-content {% if current_tab == '4stream' %}active{% endif %}">
-        <div class="card">
-            <div class="card-header">
-                <div class="card-icon orange">🎬</div>
-                <div>
-                    <h2 class="card-title">Upload to 4stream</h2>
-                    <p class="card-desc">Upload files to your 4stream account via API</p>
-                </div>
-            </div>
-            <div class="helper-text">💡 Select files from the downloads folder and upload them directly to your 4stream account</div>
-
-            <form method="POST" action="{{ url_for('upload_direct_to_4stream') }}" enctype="multipart/form-data">
-                <label>Select a file from your computer:</label><br>
-                <input type="file" name="file" required><br>
-                <button type="submit" class="upload">🎬 Upload to 4stream</button>
-            </form>
-        </div>
-    </div>
-
-    <!-- External Links Tab -->
-    <div id="tab-links" class="tab-content {% if current_tab == 'links' %}active{% endif %}">
-        <div class="card">
-            <div class="card-header">
-                <div class="card-icon red">🔗</div>
-                <div>
-                    <h2 class="card-title">External Links</h2>
-                    <p class="card-desc">Quick access to cloud storage services</p>
-                </div>
-            </div>
-            <div class="helper-text">💡 Open external storage services for easy file access and management</div>
-
-            <div style="display: flex; gap: 10px; flex-wrap: wrap;">
-                <a href="https://www.google.com" target="_blank" rel="noopener noreferrer"><button>🔍 Google</button></a>
-                <a href="https://mail.google.com" target="_blank" rel="noopener noreferrer"><button>📧 Gmail</button></a>
-                <a href="https://diploi.com" target="_blank" rel="noopener noreferrer"><button>📱 Diploi</button></a>
-                <a href="https://replit.com" target="_blank" rel="noopener noreferrer"><button>🖥️ Server</button></a>
-                <a href="https://u.pcloud.link/publink/show?code=kZMQ3n5ZSnXgcgvdcOufntHqQNgVVyxCSPVX" target="_blank" rel="noopener noreferrer"><button>☁️ pCloud</button></a>
-                <a href="https://www.dropbox.com/scl/fo/pbj4suf64bx3dy6823q4m/AH7sEbQozX07lWHDHE_8sgo?rlkey=52gqevdguucjpj6o0tyxzqlih&st=y3gaq1n7&dl=0" target="_blank" rel="noopener noreferrer"><button>📦 Dropbox</button></a>
-                <a href="https://www.1337x.to/" target="_blank" rel="noopener noreferrer"><button>🧲 Torrent</button></a>
-                <a href="http://were-ref.gl.at.ply.gg:36828/" target="_blank" rel="noopener noreferrer"><button>🌐 Toro</button></a>
-                <a href="https://studio.bilibili.tv/" target="_blank" rel="noopener noreferrer"><button>📺 Bilibili</button></a>
-                <a href="http://as-strap.gl.at.ply.gg:36363/" target="_blank" rel="noopener noreferrer"><button>🎬 AS-ST</button></a>
-                <a href="https://ext.to/" target="_blank" rel="noopener noreferrer"><button>🔗 EXT</button></a>
-                <a href="https://pixeldrain.com/user/filemanager#files" target="_blank" rel="noopener noreferrer"><button>💾 Pixeldrain</button></a>
-                <a href="https://up4stream.com/users/ogaoga" target="_blank" rel="noopener noreferrer"><button>🎬 4stream</button></a>
-                <a href="https://a.asd.homes/home3/" target="_blank" rel="noopener noreferrer"><button>🏠 ASD</button></a>
-            </div>
-        </div>
-    </div>
-</div>
-
-<script>
-    function showNotification(message, type = 'info') {
-        const notification = document.createElement('div');
-        notification.className = `notification ${type}`;
-        notification.textContent = message;
-        document.body.appendChild(notification);
-        setTimeout(() => {
-            notification.style.opacity = '0';
-            setTimeout(() => { document.body.removeChild(notification); }, 300);
-        }, 3000);
-    }
+_SIZE_UNITS = ('B', 'KiB', 'MiB', 'GiB', 'TiB')
 
-    const globalProgressBtn = document.getElementById('global-progress-btn');
-    const globalProgressModal = document.getElementById('global-progress-modal');
-    let globalEventSource = null;
-    let logLines = [];
 
-    function closeGlobalProgressModal() {
-        globalProgressModal.style.display = 'none';
-        if (globalEventSource) {
-            globalEventSource.close();
-            globalEventSource = null;
-        }
-    }
-
-    globalProgressBtn.onclick = function() {
-        globalProgressModal.style.display = 'block';
-        if (globalEventSource) globalEventSource.close();
-
-        const stage = document.getElementById('global-progress-stage');
-        const progressBar = document.getElementById('global-progress-bar-inner');
-        const log = document.getElementById('global-progress-log');
-
-        logLines = []; // Reset log lines
-        log.innerHTML = 'Connecting to progress stream...';
-
-        globalEventSource = new EventSource("{{ url_for('progress_stream') }}");
-        globalEventSource.onmessage = function(event) {
-            handleSseEvent(event, stage, progressBar, log, globalEventSource, true);
-        };
-        globalEventSource.onerror = function(err) {
-            stage.textContent = 'Connection error. Please refresh.';
-            if (globalEventSource) globalEventSource.close();
-        };
-    }
-
-    function handleSseEvent(event, stage, progressBar, log, eventSource, isGlobalModal) {
-        try {
-            const data = JSON.parse(event.data);
-            if (data.final_url) { window.finalUrl = data.final_url; }
-
-            if (data.log && data.log === 'DONE') {
-                eventSource.close();
-                stage.textContent = '✅ Completed!';
-                progressBar.style.backgroundColor = '#28a745';
-                log.innerHTML += "\\n\\nOperation finished. Redirecting...";
-                globalProgressBtn.style.display = 'none';
-
-                if (!isGlobalModal) {
-                    let redirectTarget = "{{ url_for('list_files', current_path='') }}";
-                    if (window.finalUrl) {
-                        redirectTarget = "{{ url_for('operation_complete') }}?url=" + encodeURIComponent(window.finalUrl);
-                    }
-                    setTimeout(() => { window.location.href = redirectTarget; }, 2000);
-                } else {
-                    setTimeout(closeGlobalProgressModal, 3000);
-                }
-                return;
-            }
-            if (data.error) {
-                eventSource.close();
-                stage.textContent = '❌ Error!';
-                progressBar.style.backgroundColor = '#dc3545';
-                logLines.push(`\\nERROR: ${data.error}`);
-                log.textContent = logLines.join('\\n');
-                showNotification('Operation failed: ' + data.error, 'error');
-                globalProgressBtn.style.display = 'none';
-                return;
-            }
-
-            if (data.stage) stage.textContent = data.stage;
-            if (data.percent) {
-                progressBar.style.width = data.percent + '%';
-                progressBar.textContent = data.percent.toFixed(1) + '%';
-            }
-            if (data.log) {
-                logLines.push(data.log);
-                const MAX_LOG_LINES = 150;
-                if (logLines.length > MAX_LOG_LINES) {
-                    logLines.shift(); // Remove the oldest line
-                }
-                log.textContent = logLines.join('\\n');
-                log.scrollTop = log.scrollHeight;
-            }
-        } catch (e) {
-            console.error('Error parsing SSE data:', e);
-        }
-    }
-
-    document.addEventListener("DOMContentLoaded", function() {
-        if ({{ session.get('task_active', 'false')|lower }}) {
-            globalProgressBtn.style.display = 'block';
-        }
-
-        const globalStopBtn = document.getElementById('global-stop-button');
-        if (globalStopBtn) {
-            globalStopBtn.addEventListener('click', function() {
-                fetch('/stop_encode', { method: 'POST' }).then(response => {
-                    if (response.ok) {
-                        document.getElementById('global-progress-stage').textContent = 'Process stop requested.';
-                    }
-                });
-            });
-        }
-
-        {% if download_started %}
-            var activeTab = "{{ current_tab }}";
-            var cId = "progress-container", sId = "progress-stage", bId = "progress-bar-inner", lId = "progress-log", stId = "stop-button";
-
-            if (activeTab === "youtube") {
-                cId = "yt-progress-container"; sId = "yt-progress-stage"; bId = "yt-progress-bar-inner"; lId = "yt-progress-log"; stId = "yt-stop-button";
-            } else if (activeTab === "merge") {
-                cId = "merge-progress-container"; sId = "merge-progress-stage"; bId = "merge-progress-bar-inner"; lId = "merge-progress-log"; stId = "merge-stop-button";
-            }
-
-            const progressContainer = document.getElementById(cId);
-            const stage = document.getElementById(sId);
-            const progressBar = document.getElementById(bId);
-            const log = document.getElementById(lId);
-            let inlineLogLines = [];
-
-            if(progressContainer) progressContainer.style.display = 'block';
-            globalProgressBtn.style.display = 'block';
-
-            const eventSource = new EventSource("{{ url_for('progress_stream') }}");
-            window.finalUrl = null;
-
-            eventSource.onmessage = function(event) {
-                handleSseEvent(event, stage, progressBar, log, eventSource, false);
-            };
-
-            eventSource.onerror = function(err) {
-                if(stage) stage.textContent = 'Connection error. Please refresh.';
-                eventSource.close();
-                console.error('SSE error:', err);
-            };
-
-            const stopBtn = document.getElementById(stId);
-            if (stopBtn) {
-                 stopBtn.addEventListener('click', function() {
-                    fetch('/stop_encode', {method: 'POST'}).then(response => {
-                        if (response.ok) {
-                            if(stage) stage.textContent = 'Encoding stopped.';
-                            if(progressBar) progressBar.style.backgroundColor = '#dc3545';
-                            eventSource.close();
-                        }
-                    });
-                });
-            }
-        {% endif %}
-    });
-</script>
-</body>
-</html>
-"""
-
-ENCODE_TEMPLATE = """
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Encode Video</title>
-    <style>
-        * { margin: 0; padding: 0; box-sizing: border-box; }
-        body { font-family: 'Segoe UI', 'Roboto', '-apple-system', sans-serif; line-height: 1.6; background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: #1a1a1a; padding: 15px; min-height: 100vh; }
-        .container { max-width: 900px; margin: 0 auto; background: rgba(255, 255, 255, 0.97); backdrop-filter: blur(10px); padding: 25px; border-radius: 16px; box-shadow: 0 20px 60px rgba(0,0,0,0.15); border: 1px solid rgba(255, 255, 255, 0.3); }
-        .card { background: white; border: 1px solid rgba(0,0,0,0.08); border-radius: 12px; padding: 20px; margin-bottom: 18px; box-shadow: 0 4px 12px rgba(0,0,0,0.08); transition: all 0.3s ease; }
-        .card:hover { box-shadow: 0 8px 24px rgba(0,0,0,0.12); transform: translateY(-2px); }
-        .card-header { display: flex; align-items: center; gap: 12px; margin-bottom: 15px; }
-        .card-icon { width: 48px; height: 48px; border-radius: 10px; display: flex; align-items: center; justify-content: center; font-size: 24px; color: white; background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); flex-shrink: 0; }
-        .card-title { font-size: 18px; font-weight: 700; color: #1a1a1a; margin: 0; }
-        h1, h2, h3 { color: #2c2c2c; font-weight: 600; }
-        h1 { font-size: 24px; margin-bottom: 10px; }
-        h2 { font-size: 18px; margin-top: 18px; margin-bottom: 12px; }
-        h3 { font-size: 15px; margin-bottom: 10px; }
-        input[type="text"], input[type="number"], select { width: 100%; padding: 10px 12px; margin: 5px 0 12px; border: 1px solid #d0d0d0; border-radius: 8px; font-size: 13px; transition: all 0.2s ease; background: white; }
-        input[type="text"]:focus, input[type="number"]:focus, select:focus { outline: none; border-color: #667eea; box-shadow: 0 0 0 3px rgba(102, 126, 234, 0.1); background: #f9fafb; }
-        button { background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 10px 16px; border: none; border-radius: 8px; cursor: pointer; font-size: 12px; font-weight: 600; transition: all 0.2s ease; margin-right: 8px; margin-bottom: 8px; box-shadow: 0 4px 12px rgba(102, 126, 234, 0.2); }
-        button:hover { transform: translateY(-2px); box-shadow: 0 6px 16px rgba(102, 126, 234, 0.3); }
-        button.delete { background: linear-gradient(135deg, #dc3545 0%, #c82333 100%); margin-top: 10px; box-shadow: 0 4px 12px rgba(220, 53, 69, 0.2); }
-        button.delete:hover { box-shadow: 0 6px 16px rgba(220, 53, 69, 0.3); }
-        a { color: #667eea; text-decoration: none; font-weight: 600; transition: color 0.2s ease; }
-        a:hover { color: #764ba2; }
-        .flash-msg { padding: 14px 16px; border-radius: 8px; margin-bottom: 15px; font-weight: 600; border-left: 4px solid; font-size: 13px; }
-        .flash-success { background: rgba(40, 167, 69, 0.1); color: #155724; border-left-color: #28a745; }
-        .flash-error { background: rgba(220, 53, 69, 0.1); color: #721c24; border-left-color: #dc3545; }
-        .progress-container { display: none; margin-top: 20px; background: #f9f9f9; padding: 18px; border-radius: 12px; border: 1px solid rgba(0,0,0,0.08); }
-        .progress-bar { width: 100%; height: 8px; background-color: #e0e0e0; border-radius: 10px; overflow: hidden; margin: 15px 0; box-shadow: inset 0 2px 4px rgba(0,0,0,0.06); }
-        .progress-bar-inner { width: 0%; height: 100%; background: linear-gradient(90deg, #667eea 0%, #764ba2 100%); text-align: center; line-height: 24px; color: white; border-radius: 10px; transition: width 0.4s ease; }
-        #progress-log { margin-top: 10px; font-family: 'Courier New', monospace; font-size: 11px; max-height: 200px; overflow-y: auto; background: white; color: #222; padding: 12px; border-radius: 8px; border: 1px solid #e0e0e0; }
-        #global-progress-btn { position: fixed; bottom: 20px; right: 20px; z-index: 9998; background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); padding: 12px 20px; display: none; color: white; border: none; border-radius: 8px; cursor: pointer; font-weight: 600; transition: all 0.2s ease; font-size: 13px; box-shadow: 0 8px 24px rgba(102, 126, 234, 0.3); }
-        #global-progress-btn:hover { transform: translateY(-2px); box-shadow: 0 12px 32px rgba(102, 126, 234, 0.4); }
-        .modal { display: none; position: fixed; z-index: 9999; left: 0; top: 0; width: 100%; height: 100%; background-color: rgba(0,0,0,0.4); backdrop-filter: blur(4px); overflow-y: auto; }
-        .modal-content { background: rgba(255, 255, 255, 0.98); margin: 20px auto; padding: 28px; border-radius: 16px; width: 90%; max-width: 800px; box-shadow: 0 20px 60px rgba(0,0,0,0.2); border: 1px solid rgba(255, 255, 255, 0.3); backdrop-filter: blur(10px); }
-        .modal-content .close { float: right; font-size: 28px; font-weight: bold; cursor: pointer; color: #999; transition: color 0.2s ease; }
-        .modal-content .close:hover { color: #667eea; }
-        @media (max-width: 768px) {
-            body { padding: 10px; }
-            .container { padding: 18px; }
-            h1 { font-size: 20px; }
-            h2 { font-size: 16px; }
-            h3 { font-size: 14px; }
-            input[type="text"], input[type="number"], select { padding: 8px 10px; font-size: 12px; }
-            button { padding: 8px 14px; font-size: 11px; }
-            #progress-log { max-height: 150px; font-size: 10px; }
-            #global-progress-btn { bottom: 10px; right: 10px; padding: 9px 14px; font-size: 11px; }
-            .modal-content { padding: 20px; margin: 15px auto; }
-        }
-        @media (max-width: 480px) {
-            body { padding: 8px; }
-            .container { padding: 14px; }
-            h1 { font-size: 18px; }
-            h2 { font-size: 14px; }
-            h3 { font-size: 12px; }
-            input[type="text"], input[type="number"], select { padding: 7px 8px; font-size: 11px; }
-            button { padding: 7px 11px; font-size: 10px; }
-            .modal-content { padding: 15px; margin: 10px auto; }
-            #global-progress-btn { bottom: 8px; right: 8px; padding: 6px 11px; font-size: 9px; }
-        }
-    </style>
-    <script>
-        function validateForm() { return true; }
-        function validateEncodeForm() { return true; }
-    </script>
-</head>
-<body>
-<!-- Global Progress Elements -->
-<button id="global-progress-btn">View Progress</button>
-<div id="global-progress-modal" class="modal">
-    <div class="modal-content">
-        <span class="close" onclick="closeGlobalProgressModal()">&times;</span>
-        <div id="global-progress-container" class="progress-container" style="display:block;">
-            <h3 id="global-progress-stage">...</h3>
-            <div class="progress-bar"><div id="global-progress-bar-inner" class="progress-bar-inner">0%</div></div>
-            <pre id="global-progress-log"></pre>
-            <button id="global-stop-button" class="delete" style="margin-top:10px;">Stop Process</button>
-        </div>
-    </div>
-</div>
-
-<div class="container">
-    {% with messages = get_flashed_messages(with_categories=true) %}
-        {% if messages %}
-            {% for category, message in messages %}
-                <div class="flash-msg flash-{{ category }}">{{ message|safe }}</div>
-            {% endfor %}
-        {% endif %}
-    {% endwith %}
-
-    <div class="card">
-        <div class="card-header">
-            <div class="card-icon">⚙️</div>
-            <div>
-                <h1 class="card-title">Encode Video</h1>
-                <p style="font-size: 12px; color: #666; margin: 4px 0 0 0;">{{ filepath }}</p>
-            </div>
-        </div>
-
-        <div id="progress-container" class="progress-container">
-            <h3 id="progress-stage">Starting...</h3>
-            <div class="progress-bar">
-                <div id="progress-bar-inner" class="progress-bar-inner">0%</div>
-            </div>
-            <pre id="progress-log"></pre>
-            <button id="stop-button" class="delete">⏹️ Stop Encoding</button>
-        </div>
-
-        <form method="POST" onsubmit="return validateEncodeForm()">
-        <label>Output Filename (relative to downloads folder):</label><br>
-        <input type="text" name="output_filename" value="{{ suggested_output }}" required><br>
-        <label>Codec:</label><br>
-        <select name="codec" id="codec" required>
-            <option value="none" {% if codec == "none" %}selected{% endif %}>No Encoding (Copy)</option>
-            <option value="h265" {% if codec == "h265" %}selected{% endif %}>Encode to H.265 (x265)</option>
-            <option value="av1" {% if codec == "av1" %}selected{% endif %}>Encode to AV1 (SVT-AV1)</option>
-            <option value="h265_copy_audio" {% if codec == "h265_copy_audio" %}selected{% endif %}>H.265 Video Only (Copy Audio)</option>
-            <option value="av1_copy_audio" {% if codec == "av1_copy_audio" %}selected{% endif %}>AV1 Video Only (Copy Audio)</option>
-            <option value="copy_video" {% if codec == "copy_video" %}selected{% endif %}>Copy Video (Encode Audio Only)</option>
-        </select><br>
-
-        <div id="encoding-options" style="display: {% if codec != 'none' %}block{% else %}none{% endif %};">
-            <div id="video-encoding-options">
-                <label>Encoding Mode:</label><br>
-                <select name="pass_mode" id="pass_mode">
-                    <option value="1-pass" {% if pass_mode == "1-pass" %}selected{% endif %}>1-pass (CRF)</option>
-                    <option value="2-pass" {% if pass_mode == "2-pass" %}selected{% endif %}>2-pass (VBR)</option>
-                </select><br>
-                <label>Preset (slower = better quality/smaller file):</label><br>
-                <select name="preset" id="preset"></select><br>
-                <label>Video Bitrate (kb/s, optional):</label><br>
-                <input type="number" name="bitrate" id="bitrate" value="{{ bitrate }}" min="100" placeholder="e.g., 600 for AV1, 2000 for H.265"><br>
-                <label>CRF (0–63, lower = better quality):</label><br>
-                <input type="number" name="crf" id="crf" value="{% if crf %}{{ crf }}{% elif codec == 'h265' or codec == 'h265_copy_audio' %}28{% else %}45{% endif %}" min="0" max="63" step="1" placeholder="e.g., 28 for H.265, 45 for AV1"><br>
-                <label>Frame Rate (optional):</label><br>
-                <select name="fps"><option value="">Original</option><option value="24">24 fps</option><option value="30">30 fps</option><option value="60">60 fps</option></select><br>
-                <label>Resolution (Scale, optional):</label><br>
-                <select name="scale"><option value="">Original</option><option value="1920:-2">1080p (1920px wide)</option><option value="1280:-2">720p (1280px wide)</option><option value="854:-2">480p (854px wide)</option><option value="640:-2">360p (640px wide)</option></select><br>
-                <label>Adaptive Quantization Mode (AV1 only):</label><br>
-                <select name="aq_mode" id="aq_mode"><option value="0">Disabled</option><option value="1">PSNR-based</option><option value="2" selected>Variance-based</option></select><br>
-                <label>Variance Boost (AV1 only, 0–3):</label><br>
-                <input type="number" name="variance_boost" id="variance_boost" value="2" min="0" max="3" step="1" placeholder="e.g., 2"><br>
-                <label>Tiles (AV1 only, e.g., 2x2 for faster encoding):</label><br>
-                <select name="tiles" id="tiles"><option value="">None</option><option value="2x2" selected>2x2 (Recommended for 720p)</option><option value="4x4">4x4</option></select><br>
-                <label><input type="checkbox" name="enable_vmaf" value="true"> Compute VMAF Quality Score (slower)</label><br>
-            </div>
-            <div id="audio-encoding-options">
-                <label>Audio Bitrate (kb/s):</label><br>
-                <input type="number" name="audio_bitrate" id="audio_bitrate" value="{{ audio_bitrate|default('32') }}" min="32" max="512" step="8" placeholder="e.g., 32, 64, 96, 128"><br>
-                <label><input type="checkbox" name="force_stereo" value="true" {% if force_stereo %}checked{% endif %}> Force Stereo (2-channel) Audio</label><br>
-            </div>
-        </div>
-
-        <script>
-            const codecSelect = document.getElementById('codec');
-            const presetSelect = document.getElementById('preset');
-            const crfInput = document.getElementById('crf');
-            const passModeSelect = document.getElementById('pass_mode');
-            const bitrateInput = document.getElementById('bitrate');
-            const aqModeSelect = document.getElementById('aq_mode');
-            const varianceBoostInput = document.getElementById('variance_boost');
-            const tilesSelect = document.getElementById('tiles');
-
-            function updatePresetOptions() {
-                const codec = codecSelect.value;
-                const encodingOptions = document.getElementById('encoding-options');
-                const videoEncodingOptions = document.getElementById('video-encoding-options');
-                const audioEncodingOptions = document.getElementById('audio-encoding-options');
-                encodingOptions.style.display = codec !== 'none' ? 'block' : 'none';
-                if (codec === 'copy_video') {
-                    videoEncodingOptions.style.display = 'none'; audioEncodingOptions.style.display = 'block';
-                } else if (codec.endsWith('_copy_audio')) {
-                    videoEncodingOptions.style.display = 'block'; audioEncodingOptions.style.display = 'none';
-                } else if (codec !== 'none') {
-                    videoEncodingOptions.style.display = 'block'; audioEncodingOptions.style.display = 'block';
-                }
-                presetSelect.innerHTML = '';
-                if (codec === 'av1' || codec === 'av1_copy_audio') {
-                    for (let p = 0; p <= 13; p++) {
-                        let label = p.toString();
-                        if (p === 0) label += ' (slowest)'; else if (p === 13) label += ' (fastest)'; else if (p > 7) label += ' (fast)'; else label += ' (medium)';
-                        const option = document.createElement('option');
-                        option.value = p; option.text = label;
-                        if (p === 7) option.selected = true;
-                        presetSelect.appendChild(option);
-                    }
-                    crfInput.value = crfInput.value || '45'; crfInput.placeholder = 'e.g., 45 for AV1';
-                    aqModeSelect.disabled = false; varianceBoostInput.disabled = false; tilesSelect.disabled = false;
-                } else if (codec === 'h265' || codec === 'h265_copy_audio') {
-                    const presets = ['ultrafast', 'superfast', 'veryfast', 'faster', 'fast', 'medium', 'slow', 'slower', 'veryslow', 'placebo'];
-                    presets.forEach(p => {
-                        const option = document.createElement('option');
-                        option.value = p; option.text = p;
-                        if (p === 'faster') option.selected = true;
-                        presetSelect.appendChild(option);
-                    });
-                    crfInput.value = crfInput.value || '28'; crfInput.placeholder = 'e.g., 28 for H.265';
-                    aqModeSelect.disabled = true; varianceBoostInput.disabled = true; tilesSelect.disabled = true;
-                } else {
-                    aqModeSelect.disabled = true; varianceBoostInput.disabled = true; tilesSelect.disabled = true;
-                }
-                if (codec === 'none') {
-                    bitrateInput.removeAttribute('required'); bitrateInput.removeAttribute('min'); bitrateInput.value = '';
-                } else {
-                    bitrateInput.setAttribute('min', '100');
-                    if (passModeSelect.value === '2-pass') bitrateInput.setAttribute('required', 'required');
-                    else bitrateInput.removeAttribute('required');
-                }
-            }
-            function validateEncodeForm() {
-                const codec = codecSelect.value;
-                if (codec.includes('h265') || codec.includes('av1')) {
-                    if (!presetSelect.value) { alert('Please select a preset.'); return false; }
-                    if (passModeSelect.value === '2-pass' && (!bitrateInput.value || parseInt(bitrateInput.value) < 100)) { alert('Please specify a valid video bitrate for 2-pass encoding.'); return false; }
-                    if (codec.includes('av1')) {
-                        const varianceBoost = parseInt(varianceBoostInput.value);
-                        if (isNaN(varianceBoost) || varianceBoost < 0 || varianceBoost > 3) { alert('Variance Boost must be between 0 and 3.'); return false; }
-                    }
-                }
-                return true;
-            }
-            codecSelect.addEventListener('change', updatePresetOptions);
-            passModeSelect.addEventListener('change', function() {
-                if (codecSelect.value !== 'none') {
-                    if (this.value === '2-pass') bitrateInput.setAttribute('required', 'required');
-                    else bitrateInput.removeAttribute('required');
-                }
-            });
-            document.addEventListener('DOMContentLoaded', updatePresetOptions);
-        </script>
-        <br>
-        <label><input type="checkbox" name="upload_pixeldrain" value="true"> Upload to Pixeldrain after completion</label><br>
-        <label><input type="checkbox" name="upload_4stream" value="true" {% if upload_4stream %}checked{% endif %}> Upload to 4stream after completion</label><br>
-        <label><input type="checkbox" name="upload_gofile" value="true"> Upload to Gofile after completion</label><br><br>
-        <button type="submit">▶️ Start Encoding</button>
-        <a href="{{ url_for('list_files', current_path=current_path) }}">← Back to Files</a>
-        </form>
-    </div>
-</div>
-
-<script>
-    const globalProgressBtn = document.getElementById('global-progress-btn');
-    const globalProgressModal = document.getElementById('global-progress-modal');
-    let globalEventSource = null;
-    let logLines = [];
-
-    function closeGlobalProgressModal() {
-        globalProgressModal.style.display = 'none';
-        if (globalEventSource) { globalEventSource.close(); globalEventSource = null; }
-    }
-
-    globalProgressBtn.onclick = function() {
-        globalProgressModal.style.display = 'block';
-        if (globalEventSource) globalEventSource.close();
-        const stage = document.getElementById('global-progress-stage');
-        const progressBar = document.getElementById('global-progress-bar-inner');
-        const log = document.getElementById('global-progress-log');
-        logLines = []; // Reset log
-        log.innerHTML = 'Connecting to progress stream...';
-        globalEventSource = new EventSource("{{ url_for('progress_stream') }}");
-        globalEventSource.onmessage = function(event) {
-            handleSseEvent(event, stage, progressBar, log, globalEventSource, true);
-        };
-        globalEventSource.onerror = function(err) {
-            stage.textContent = 'Connection error. Please refresh.';
-            if (globalEventSource) globalEventSource.close();
-        };
-    }
-
-    function handleSseEvent(event, stage, progressBar, log, eventSource, isGlobalModal) {
-        try {
-            const data = JSON.parse(event.data);
-            if (data.final_url) { window.finalUrl = data.final_url; }
-
-            if (data.log && data.log === 'DONE') {
-                eventSource.close();
-                stage.textContent = '✅ Completed!';
-                progressBar.style.backgroundColor = '#28a745';
-                log.innerHTML += "\\n\\nOperation finished. Redirecting...";
-                globalProgressBtn.style.display = 'none';
-
-                if (!isGlobalModal) {
-                    let redirectTarget = "{{ url_for('list_files', current_path=current_path) }}";
-                    if (window.finalUrl) {
-                        redirectTarget = "{{ url_for('operation_complete') }}?url=" + encodeURIComponent(window.finalUrl);
-                    }
-                    setTimeout(() => { window.location.href = redirectTarget; }, 2000);
-                } else {
-                     setTimeout(closeGlobalProgressModal, 3000);
-                }
-                return;
-            }
-
-            if (data.error) {
-                eventSource.close();
-                stage.textContent = '❌ Error!';
-                progressBar.style.backgroundColor = '#dc3545';
-                logLines.push(`\\nERROR: ${data.error}`);
-                log.textContent = logLines.join('\\n');
-                globalProgressBtn.style.display = 'none';
-                return;
-            }
-
-            if (data.stage) stage.textContent = data.stage;
-            if (data.percent) {
-                progressBar.style.width = data.percent + '%';
-                progressBar.textContent = data.percent.toFixed(1) + '%';
-            }
-            if (data.log) {
-                logLines.push(data.log);
-                const MAX_LOG_LINES = 150;
-                if (logLines.length > MAX_LOG_LINES) { logLines.shift(); }
-                log.textContent = logLines.join('\\n');
-                log.scrollTop = log.scrollHeight;
-            }
-        } catch (e) { console.error('Error parsing SSE data:', e); }
-    };
-
-    document.addEventListener("DOMContentLoaded", function() {
-        if ({{ session.get('task_active', 'false')|lower }}) {
-            globalProgressBtn.style.display = 'block';
-        }
-
-        const globalStopBtn = document.getElementById('global-stop-button');
-        if (globalStopBtn) {
-            globalStopBtn.addEventListener('click', function() {
-                fetch('/stop_encode', { method: 'POST' }).then(response => {
-                    if (response.ok) {
-                        document.getElementById('global-progress-stage').textContent = 'Process stop requested.';
-                    }
-                });
-            });
-        }
-
-        {% if download_started %}
-            const progressContainer = document.getElementById('progress-container');
-            const stage = document.getElementById('progress-stage');
-            const progressBar = document.getElementById('progress-bar-inner');
-            const log = document.getElementById('progress-log');
-
-            progressContainer.style.display = 'block';
-            globalProgressBtn.style.display = 'block';
-
-            const eventSource = new EventSource("{{ url_for('progress_stream') }}");
-            window.finalUrl = null;
-
-            eventSource.onmessage = function(event) {
-                handleSseEvent(event, stage, progressBar, log, eventSource, false);
-            };
-            eventSource.onerror = function(err) {
-                stage.textContent = 'Connection error. Please refresh.';
-                eventSource.close();
-            };
-            const stopBtn = document.getElementById('stop-button');
-            if (stopBtn) {
-                stopBtn.addEventListener('click', function() {
-                    fetch('/stop_encode', {method: 'POST'}).then(response => {
-                        if (response.ok) {
-                            stage.textContent = 'Encoding stopped.';
-                            progressBar.style.backgroundColor = '#dc3545';
-                            eventSource.close();
-                        }
-                    });
-                });
-            }
-        {% endif %}
-    });
-</script>
-</body>
-</html>
-"""
-
-
-GOFILE_MANAGER_TEMPLATE = """
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Gofile Manager</title>
-    <style>
-        * { margin: 0; padding: 0; box-sizing: border-box; }
-        body { font-family: 'Segoe UI', 'Roboto', sans-serif; line-height: 1.6; background: #f0f2f5; color: #1a1a1a; padding: 15px; }
-        .container { max-width: 1100px; margin: 0 auto; background: white; padding: 25px; border-radius: 16px; box-shadow: 0 10px 40px rgba(0,0,0,0.1); }
-        h1 { font-size: 28px; color: #9b59b6; margin-bottom: 20px; text-align: center; }
-        .back-link { display: inline-block; margin-bottom: 20px; color: #0066cc; text-decoration: none; font-weight: 600; }
-        
-        .premium-note { background: #fff8e1; border-left: 5px solid #ffc107; padding: 15px; border-radius: 8px; margin-bottom: 25px; font-size: 14px; }
-        .premium-note a { color: #d32f2f; font-weight: bold; }
-
-        .file-list { width: 100%; border-collapse: collapse; margin-top: 10px; }
-        .file-list th, .file-list td { padding: 15px; text-align: left; border-bottom: 1px solid #eee; }
-        .file-list th { background: #f8f9fa; color: #7f8c8d; text-transform: uppercase; font-size: 11px; letter-spacing: 1px; }
-        .file-list tr:hover { background: #fcfaff; }
-        
-        .btn { padding: 8px 15px; border: none; border-radius: 6px; cursor: pointer; font-size: 12px; font-weight: 600; text-decoration: none; color: white; transition: all 0.2s; display: inline-block; margin-right: 5px; }
-        .btn-blue { background: #3498db; }
-        .btn-blue:hover { background: #2980b9; }
-        .btn-green { background: #27ae60; }
-        .btn-green:hover { background: #219150; }
-        .btn-red { background: #e74c3c; }
-        .btn-red:hover { background: #c0392b; }
-        
-        .status-msg { padding: 10px; border-radius: 6px; margin-bottom: 20px; text-align: center; }
-        .status-success { background: #e8f5e9; color: #2e7d32; }
-        .status-error { background: #ffebee; color: #c62828; }
-        
-        .source-tag { font-size: 10px; padding: 2px 6px; border-radius: 4px; background: #eee; margin-left: 5px; color: #666; vertical-align: middle; }
-    </style>
-</head>
-<body>
-<div class="container">
-    <h1>📤 Gofile Upload Manager</h1>
-    <a href="{{ url_for('list_files') }}" class="back-link">← Back to Local File Manager</a>
-    
-    <div class="premium-note">
-        <strong>⚠️ Account Restriction:</strong> Gofile API restricts full account listings to <strong>Premium accounts only</strong>. 
-        Below we show files uploaded using this app. To see all files, visit the <a href="https://gofile.io/login" target="_blank">Gofile Website</a>.
-    </div>
-
-    {% with messages = get_flashed_messages(with_categories=true) %}
-        {% for category, message in messages %}
-            <div class="status-msg status-{% if category == 'error' %}error{% else %}success{% endif %}">
-                {{ message }}
-            </div>
-        {% endfor %}
-    {% endwith %}
-
-    <div style="background: #f8f9fa; border: 1px dashed #9b59b6; padding: 15px; border-radius: 12px; margin-bottom: 25px;">
-        <h4 style="color: #9b59b6; margin-bottom: 10px;">🛠️ Manual Restore (For older files)</h4>
-        <form method="POST" action="{{ url_for('gofile_add_to_local') }}" style="display: flex; gap: 10px;">
-            <input type="text" name="direct_link" placeholder="Paste direct link (https://storeX.gofile.io/download/direct/...)" style="margin:0; flex-grow: 1;">
-            <input type="hidden" name="filename" value="manual_restore.mkv">
-            <button type="submit" class="btn btn-green" style="margin:0;">Restore Manually</button>
-        </form>
-        <p style="font-size: 11px; color: #666; margin-top: 8px;">
-            If an old file fails to restore, open it in your browser, copy the real download link, and paste it here.
-        </p>
-    </div>
-
-    <h3>📋 Recent Uploads (Local History)</h3>
-    <table class="file-list">
-        <thead>
-            <tr>
-                <th>Name</th>
-                <th>Size</th>
-                <th>Uploaded</th>
-                <th>Actions</th>
-            </tr>
-        </thead>
-        <tbody>
-            {% if items %}
-                {% for item in items %}
-                <tr>
-                    <td><strong>{{ item.name }}</strong> {% if item.is_remote %}<span class="source-tag">Account</span>{% else %}<span class="source-tag">App History</span>{% endif %}</td>
-                    <td>{{ (item.size / 1024 / 1024)|round(2) }} MB</td>
-                    <td>{{ item.createTime|datetime }}</td>
-                    <td>
-                        <a href="{{ item.link }}" target="_blank" class="btn btn-blue">Open</a>
-                        {% if item.direct_link %}
-                        <a href="{{ item.direct_link }}" target="_blank" class="btn btn-blue" style="background:#8e44ad;">Direct</a>
-                        {% endif %}
-                        <form method="POST" action="{{ url_for('gofile_add_to_local') }}" style="display:inline;">
-                            <input type="hidden" name="fileId" value="{{ item.id }}">
-                            <input type="hidden" name="filename" value="{{ item.name }}">
-                            <input type="hidden" name="link" value="{{ item.link }}">
-                            <input type="hidden" name="direct_link" value="{{ item.direct_link or '' }}">
-                            <button type="submit" class="btn btn-green">Add to File List</button>
-                        </form>
-                        {% if item.is_remote %}
-                        <form method="POST" action="{{ url_for('gofile_delete') }}" style="display:inline;" onsubmit="return confirm('Really delete this file from Gofile?');">
-                            <input type="hidden" name="contentId" value="{{ item.id }}">
-                            <button type="submit" class="btn btn-red">Delete</button>
-                        </form>
-                        {% endif %}
-                    </td>
-                </tr>
-                {% endfor %}
-            {% else %}
-                <tr>
-                    <td colspan="4" style="text-align: center; padding: 40px; color: #95a5a6;">No upload history found. Upload a file to see it here!</td>
-                </tr>
-            {% endif %}
-        </tbody>
-    </table>
-</div>
-</body>
-</html>
-"""
-
-TRIM_TEMPLATE = """
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Trim Video</title>
-    <style>
-        * { margin: 0; padding: 0; box-sizing: border-box; }
-        body { font-family: 'Segoe UI', 'Roboto', '-apple-system', sans-serif; line-height: 1.6; background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: #1a1a1a; padding: 15px; min-height: 100vh; }
-        .container { max-width: 900px; margin: 0 auto; background: rgba(255, 255, 255, 0.97); backdrop-filter: blur(10px); padding: 25px; border-radius: 16px; box-shadow: 0 20px 60px rgba(0,0,0,0.15); border: 1px solid rgba(255, 255, 255, 0.3); }
-        .card { background: white; border: 1px solid rgba(0,0,0,0.08); border-radius: 12px; padding: 20px; margin-bottom: 18px; box-shadow: 0 4px 12px rgba(0,0,0,0.08); transition: all 0.3s ease; }
-        .card:hover { box-shadow: 0 8px 24px rgba(0,0,0,0.12); transform: translateY(-2px); }
-        .card-header { display: flex; align-items: center; gap: 12px; margin-bottom: 15px; }
-        .card-icon { width: 48px; height: 48px; border-radius: 10px; display: flex; align-items: center; justify-content: center; font-size: 24px; color: white; background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); flex-shrink: 0; }
-        .card-title { font-size: 18px; font-weight: 700; color: #1a1a1a; margin: 0; }
-        h1, h2, h3 { color: #2c2c2c; font-weight: 600; }
-        h1 { font-size: 24px; margin-bottom: 10px; }
-        input[type="text"] { width: 100%; padding: 10px 12px; margin: 5px 0 12px; border: 1px solid #d0d0d0; border-radius: 8px; font-size: 13px; transition: all 0.2s ease; background: white; }
-        input[type="text"]:focus { outline: none; border-color: #667eea; box-shadow: 0 0 0 3px rgba(102, 126, 234, 0.1); background: #f9fafb; }
-        button { background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 10px 16px; border: none; border-radius: 8px; cursor: pointer; font-size: 12px; font-weight: 600; transition: all 0.2s ease; margin-right: 8px; margin-bottom: 8px; box-shadow: 0 4px 12px rgba(102, 126, 234, 0.2); }
-        button:hover { transform: translateY(-2px); box-shadow: 0 6px 16px rgba(102, 126, 234, 0.3); }
-        a { color: #667eea; text-decoration: none; font-weight: 600; transition: color 0.2s ease; }
-        a:hover { color: #764ba2; }
-        .flash-msg { padding: 14px 16px; border-radius: 8px; margin-bottom: 15px; font-weight: 600; border-left: 4px solid; font-size: 13px; }
-        .flash-success { background: rgba(40, 167, 69, 0.1); color: #155724; border-left-color: #28a745; }
-        .flash-error { background: rgba(220, 53, 69, 0.1); color: #721c24; border-left-color: #dc3545; }
-        .double_range_slider_box { position: relative; width: 100%; height: 80px; display: flex; justify-content: center; align-items: center; margin: 20px 0; }
-        .double_range_slider { width: 90%; height: 5px; position: relative; background-color: #e0e0e0; border-radius: 3px; }
-        .range_track { height: 100%; position: absolute; border-radius: 3px; background: linear-gradient(90deg, #667eea 0%, #764ba2 100%); }
-        .minvalue { position: absolute; padding: 5px 10px; background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); border-radius: 4px; color: white; bottom: 0; transform: translate(0, -100%); left: 0; font-size: 11px; font-weight: 600; transition: left 0.3s cubic-bezier(0.165, 0.84, 0.44, 1); will-change: left, transform; }
-        .maxvalue { position: absolute; padding: 5px 10px; background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); border-radius: 4px; color: white; top: 0; transform: translate(0, 100%); right: 0; font-size: 11px; font-weight: 600; transition: right 0.3s cubic-bezier(0.165, 0.84, 0.44, 1); will-change: right, transform; }
-        input[type="range"] { position: absolute; width: 100%; height: 5px; background: none; pointer-events: none; -webkit-appearance: none; -moz-appearance: none; top: 50%; transform: translateY(-50%); }
-        input[type="range"]::-webkit-slider-thumb { height: 18px; width: 18px; border-radius: 50%; border: 3px solid white; background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); pointer-events: auto; -webkit-appearance: none; cursor: pointer; box-shadow: 0 2px 6px rgba(102, 126, 234, 0.3); }
-        input[type="range"]::-moz-range-thumb { height: 14px; width: 14px; border-radius: 50%; border: 2px solid white; background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); pointer-events: auto; -moz-appearance: none; cursor: pointer; box-shadow: 0 2px 6px rgba(102, 126, 234, 0.3); }
-        @media (max-width: 768px) {
-            body { padding: 10px; }
-            .container { padding: 15px; }
-            h1 { font-size: 20px; }
-            input[type="text"] { padding: 8px 10px; font-size: 13px; }
-            button { padding: 8px 14px; font-size: 11px; }
-            .double_range_slider_box { height: 70px; margin: 15px 0; }
-            .minvalue, .maxvalue { font-size: 10px; padding: 4px 8px; }
-        }
-        @media (max-width: 480px) {
-            body { padding: 8px; }
-            .container { padding: 12px; }
-            h1 { font-size: 18px; }
-            input[type="text"] { padding: 7px 8px; font-size: 12px; }
-            button { padding: 7px 12px; font-size: 10px; }
-            .double_range_slider_box { height: 60px; margin: 10px 0; }
-            .minvalue, .maxvalue { font-size: 9px; padding: 3px 6px; }
-        }
-    </style>
-</head>
-<body>
-<div class="container">
-    {% with messages = get_flashed_messages(with_categories=true) %}
-        {% if messages %}
-            {% for category, message in messages %}
-                <div class="flash-msg flash-{{ category }}">{{ message|safe }}</div>
-            {% endfor %}
-        {% endif %}
-    {% endwith %}
-
-    <div class="card">
-        <div class="card-header">
-            <div class="card-icon">✂️</div>
-            <div>
-                <h1 class="card-title">Trim Video</h1>
-                <p style="font-size: 12px; color: #666; margin: 4px 0 0 0;">{{ filepath }}</p>
-            </div>
-        </div>
-
-        <form method="POST">
-        <label>Output Filename (relative to downloads folder):</label><br>
-        <input type="text" name="output_filename" value="{{ suggested_output }}" required><br>
-
-        <div class="double_range_slider_box">
-            <div class="double_range_slider">
-                <span class="range_track" id="range_track"></span>
-
-                <input type="range" name="start_seconds" class="min" min="0" max="{{ duration }}" value="0" step="1" />
-                <input type="range" name="end_seconds" class="max" min="0" max="{{ duration }}" value="{{ duration }}" step="1" />
-
-                <div class="minvalue"></div>
-                <div class="maxvalue"></div>
-            </div>
-        </div>
-
-        <br>
-        <button type="submit">✂️ Trim Video (No Re-encoding)</button>
-        <a href="{{ url_for('list_files', current_path=current_path) }}">← Back to Files</a>
-        </form>
-    </div>
-</div>
-
-<script>
-    function formatTime(seconds) {
-        let h = Math.floor(seconds / 3600);
-        let m = Math.floor((seconds % 3600) / 60);
-        let s = Math.floor(seconds % 60);
-        return `${h.toString().padStart(2, '0')}:${m.toString().padStart(2, '0')}:${s.toString().padStart(2, '0')}`;
-    }
-
-    let minRangeValueGap = 1;
-    const range = document.getElementById("range_track");
-    const minval = document.querySelector(".minvalue");
-    const maxval = document.querySelector(".maxvalue");
-    const rangeInput = document.querySelectorAll("input[type='range']");
-    let minRange, maxRange, minPercentage, maxPercentage;
-    const minRangeFill = () => { range.style.left = (rangeInput[0].value / rangeInput[0].max) * 100 + "%"; };
-    const maxRangeFill = () => { range.style.right = 100 - (rangeInput[1].value / rangeInput[1].max) * 100 + "%"; };
-    const MinValueBubbleStyle = () => {
-        minPercentage = (minRange / rangeInput[0].max) * 100;
-        minval.style.left = minPercentage + "%";
-        minval.style.transform = `translate(-${minPercentage / 2}%, -100%)`;
-    };
-    const MaxValueBubbleStyle = () => {
-        maxPercentage = 100 - (maxRange / rangeInput[1].max) * 100;
-        maxval.style.right = maxPercentage + "%";
-        maxval.style.transform = `translate(${maxPercentage / 2}%, 100%)`;
-    };
-    const setMinValueOutput = () => { minRange = parseInt(rangeInput[0].value); minval.innerHTML = formatTime(rangeInput[0].value); };
-    const setMaxValueOutput = () => { maxRange = parseInt(rangeInput[1].value); maxval.innerHTML = formatTime(rangeInput[1].value); };
-
-    setMinValueOutput(); setMaxValueOutput(); minRangeFill(); maxRangeFill(); MinValueBubbleStyle(); MaxValueBubbleStyle();
-
-    rangeInput.forEach((input) => {
-        input.addEventListener("input", (e) => {
-            setMinValueOutput(); setMaxValueOutput(); minRangeFill(); maxRangeFill(); MinValueBubbleStyle(); MaxValueBubbleStyle();
-            if (maxRange - minRange < minRangeValueGap) {
-                if (e.target.className === "min") {
-                    rangeInput[0].value = maxRange - minRangeValueGap;
-                    setMinValueOutput(); minRangeFill(); MinValueBubbleStyle();
-                    e.target.style.zIndex = "2";
-                } else {
-                    rangeInput[1].value = minRange + minRangeValueGap;
-                    e.target.style.zIndex = "2";
-                    setMaxValueOutput(); maxRangeFill(); MaxValueBubbleStyle();
-                }
-            }
-        });
-    });
-</script>
-</body>
-</html>
-"""
-
-FILE_OPERATION_TEMPLATE = """
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Processing...</title>
-    <style>
-        * { margin: 0; padding: 0; box-sizing: border-box; }
-        body { font-family: 'Segoe UI', 'Roboto', sans-serif; line-height: 1.6; background: #f8f9fa; color: #1a1a1a; min-height: 100vh; padding: 15px; }
-        .header { display: flex; justify-content: space-between; align-items: center; margin-bottom: 20px; flex-wrap: wrap; gap: 10px; }
-        .header h1 { margin: 0; flex-grow: 1; font-size: 26px; font-weight: 700; color: #1a1a1a; }
-        .header-button { background: #28a745; color: white; padding: 9px 16px; border: none; border-radius: 6px; cursor: pointer; text-decoration: none; font-weight: 600; transition: all 0.2s ease; display: inline-block; font-size: 12px; }
-        .header-button:hover { background: #218838; transform: translateY(-1px); box-shadow: 0 2px 6px rgba(40, 167, 69, 0.2); }
-        .container { max-width: 900px; margin: 0 auto; background: white; padding: 20px; border-radius: 12px; box-shadow: 0 2px 8px rgba(0,0,0,0.06); border: 1px solid #e8e8e8; }
-        h1 { font-size: 24px; font-weight: 700; color: #1a1a1a; margin-bottom: 10px; }
-        h2 { font-size: 18px; font-weight: 600; color: #2c2c2c; margin-top: 20px; margin-bottom: 15px; padding-bottom: 10px; border-bottom: 1px solid #e0e0e0; }
-        h3 { font-size: 15px; font-weight: 600; color: #3a3a3a; margin-bottom: 10px; }
-        pre { background-color: #f4f4f4; padding: 12px; border-radius: 6px; white-space: pre-wrap; word-wrap: break-word; color: #222; font-size: 11px; overflow-x: auto; border: 1px solid #e0e0e0; font-family: 'Courier New', monospace; }
-        .progress-container { display: block; margin-top: 20px; }
-        .progress-info { background: #fff3cd; border-left: 4px solid #ffc107; padding: 12px; border-radius: 6px; margin-bottom: 15px; font-size: 12px; font-weight: bold; color: #333; line-height: 1.6; }
-        .progress-bar { width: 100%; height: 6px; background-color: #e0e0e0; border-radius: 8px; overflow: hidden; margin: 15px 0; }
-        .progress-bar-inner { width: 0%; height: 100%; background: #0066cc; text-align: center; line-height: 24px; color: white; transition: width 0.4s ease; border-radius: 8px; }
-        #progress-log { margin-top: 10px; font-family: 'Courier New', monospace; font-size: 11px; max-height: 200px; overflow-y: auto; background: #f4f4f4; color: #222; padding: 10px; border-radius: 6px; border: 1px solid #e0e0e0; }
-        #global-progress-btn { position: fixed; bottom: 15px; right: 15px; z-index: 9998; background: #0066cc; color: white; padding: 10px 18px; border: none; border-radius: 6px; cursor: pointer; display: none; font-weight: 600; transition: all 0.2s ease; font-size: 12px; }
-        #global-progress-btn:hover { background: #0052a3; transform: translateY(-2px); box-shadow: 0 4px 12px rgba(0, 102, 204, 0.3); }
-        button { background: #0066cc; color: white; padding: 9px 16px; border: none; border-radius: 6px; cursor: pointer; font-size: 12px; font-weight: 600; margin-right: 6px; margin-bottom: 6px; transition: all 0.2s ease; }
-        button:hover { background: #0052a3; transform: translateY(-1px); box-shadow: 0 2px 6px rgba(0, 102, 204, 0.2); }
-        button.delete { background: #dc3545; margin-top: 15px; }
-        button.delete:hover { background: #c82333; box-shadow: 0 2px 6px rgba(220, 53, 69, 0.2); }
-        .modal { display: none; position: fixed; z-index: 9999; left: 0; top: 0; width: 100%; height: 100%; background-color: rgba(0,0,0,0.5); overflow-y: auto; }
-        .modal-content { background-color: white; margin: 20px auto; padding: 25px; border-radius: 12px; width: 90%; max-width: 800px; box-shadow: 0 10px 40px rgba(0,0,0,0.2); border: 1px solid #e8e8e8; }
-        .modal-content .close { float: right; font-size: 24px; font-weight: bold; cursor: pointer; color: #999; transition: color 0.2s ease; }
-        .modal-content .close:hover { color: #333; }
-        @media (max-width: 768px) {
-            body { padding: 10px; }
-            .header { margin-bottom: 15px; }
-            .header h1 { font-size: 20px; }
-            .header-button { padding: 8px 14px; font-size: 11px; }
-            .container { padding: 15px; }
-            h2 { font-size: 16px; }
-            h3 { font-size: 14px; }
-            button { padding: 8px 14px; font-size: 11px; }
-            #progress-log { max-height: 150px; font-size: 10px; }
-            #global-progress-btn { bottom: 10px; right: 10px; padding: 8px 14px; font-size: 11px; }
-            .progress-info { font-size: 11px; padding: 10px; }
-        }
-        @media (max-width: 480px) {
-            body { padding: 8px; }
-            .header { margin-bottom: 10px; gap: 5px; }
-            .header h1 { font-size: 18px; }
-            .header-button { padding: 7px 12px; font-size: 10px; }
-            .container { padding: 12px; }
-            h2 { font-size: 14px; }
-            h3 { font-size: 12px; }
-            button { padding: 7px 12px; font-size: 10px; }
-            #progress-log { max-height: 120px; font-size: 9px; }
-            #global-progress-btn { bottom: 8px; right: 8px; padding: 6px 12px; font-size: 10px; }
-            .progress-info { font-size: 10px; padding: 8px; }
-        }
-    </style>
-    <script>
-        function validateForm() { return true; }
-        function validateEncodeForm() { return true; }
-    </script>
-</head>
-<body>
-<!-- Global Progress Elements -->
-<button id="global-progress-btn">View Progress</button>
-<div id="global-progress-modal" class="modal">
-    <div class="modal-content">
-        <span class="close" onclick="closeGlobalProgressModal()">&times;</span>
-        <div id="global-progress-container" class="progress-container" style="display:block;">
-            <h3 id="global-progress-stage">...</h3>
-            <div class="progress-bar"><div id="global-progress-bar-inner" class="progress-bar-inner">0%</div></div>
-            <pre id="global-progress-log"></pre>
-            <button id="global-stop-button" class="delete">Stop Process</button>
-        </div>
-    </div>
-</div>
-<div style="display: flex; justify-content: space-between; align-items: center; margin-bottom: 20px;">
-    <h1 style="margin: 0;">{{ operation_title }}</h1>
-    <a href="{{ url_for('list_files', current_path='') }}" class="header-button">📂 Manage Downloaded Files</a>
-</div>
-<div class="container">
-    <p>Please wait while the operation completes. You will be redirected automatically.</p>
-    <div id="progress-container" class="progress-container">
-        <div id="batch-info-section" style="display:none; background-color: #fff3cd; border: 2px solid #ffc107; padding: 20px; border-radius: 8px; margin-bottom: 20px;">
-            <div id="batch-filename" style="font-size: 18px; font-weight: bold; margin-bottom: 10px;">📁 Filename</div>
-            <div id="batch-stats" style="font-size: 14px;"><strong>✅ Passed:</strong> 0 | <strong>⏳ Encoding:</strong> 1 | <strong>⏱️ Waiting:</strong> 0</div>
-        </div>
-        <div id="progress-info" class="progress-info" style="display:none; margin-bottom: 20px;"></div>
-        <h3 id="progress-stage">Starting...</h3>
-        <div class="progress-bar" style="margin-top: 15px; margin-bottom: 15px;">
-            <div id="progress-bar-inner" class="progress-bar-inner" style="background-color: #17a2b8;">0%</div>
-        </div>
-        <pre id="progress-log"></pre>
-        <button id="batch-stop-button" class="delete" style="display:none;">Stop Batch Encoding</button>
-    </div>
-</div>
-
-<script>
-    const globalProgressBtn = document.getElementById('global-progress-btn');
-    const globalProgressModal = document.getElementById('global-progress-modal');
-    let globalEventSource = null;
-    let logLines = [];
-
-    function closeGlobalProgressModal() {
-        globalProgressModal.style.display = 'none';
-        if (globalEventSource) { globalEventSource.close(); globalEventSource = null; }
-    }
-
-    globalProgressBtn.onclick = function() {
-        globalProgressModal.style.display = 'block';
-        if (globalEventSource) globalEventSource.close();
-        const stage = document.getElementById('global-progress-stage');
-        const progressBar = document.getElementById('global-progress-bar-inner');
-        const log = document.getElementById('global-progress-log');
-        logLines = []; // Reset log
-        log.innerHTML = 'Connecting to progress stream...';
-        globalEventSource = new EventSource("{{ url_for('progress_stream') }}");
-        globalEventSource.onmessage = function(event) {
-            handleSseEvent(event, stage, progressBar, log, globalEventSource, true);
-        };
-        globalEventSource.onerror = function(err) {
-            stage.textContent = 'Connection error. Please refresh.';
-            if (globalEventSource) globalEventSource.close();
-        };
-    }
-
-    function handleSseEvent(event, stage, progressBar, log, eventSource, isGlobalModal) {
-        try {
-            const data = JSON.parse(event.data);
-            if (data.final_url) { window.finalUrl = data.final_url; }
-
-            if (data.log && data.log === 'DONE') {
-                eventSource.close();
-                stage.textContent = '✅ Completed!';
-                progressBar.style.backgroundColor = '#28a745';
-                log.innerHTML += "\\n\\nOperation finished. Redirecting...";
-                globalProgressBtn.style.display = 'none';
-
-                if (!isGlobalModal) {
-                    let redirectTarget = "{{ url_for('list_files', current_path=current_path) }}";
-                    if (window.finalUrl) {
-                        redirectTarget = "{{ url_for('operation_complete') }}?url=" + encodeURIComponent(window.finalUrl);
-                    }
-                    setTimeout(() => { window.location.href = redirectTarget; }, 2000);
-                } else {
-                     setTimeout(closeGlobalProgressModal, 3000);
-                }
-                return;
-            }
+def human_size(size_bytes):
+    if size_bytes is None or not isinstance(size_bytes,
+                                            (int, float)) or size_bytes == 0:
+        return "0 B"
+    # Unit index straight from the bit length: every 10 bits is one 1024 step
+    n = min(max(int(size_bytes).bit_length() - 1, 0) // 10, 4)
+    return f"{size_bytes / (1 << (10 * n)):.2f} {_SIZE_UNITS[n]}"
 
-            if (data.error) {
-                eventSource.close();
-                stage.textContent = '❌ Error!';
-                progressBar.style.backgroundColor = '#dc3545';
-                logLines.push(`\\nERROR: ${data.error}`);
-                log.textContent = logLines.join('\\n');
-                globalProgressBtn.style.display = 'none';
-                return;
-            }
 
-            if (data.stage) stage.textContent = data.stage;
-            if (data.percent) {
-                progressBar.style.width = data.percent + '%';
-                progressBar.textContent = data.percent.toFixed(1) + '%';
-            }
-            if (data.file_info) {
-                const batchSection = document.getElementById('batch-info-section');
-                if (batchSection) {
-                    batchSection.style.display = 'block';
-                    batchSection.innerHTML = data.file_info;
-                }
-            }
-            if (data.batch_encode_status) {
-                const batchStopBtn = document.getElementById('batch-stop-button');
-                if (batchStopBtn) batchStopBtn.style.display = 'block';
-            }
-            if (data.log) {
-                logLines.push(data.log);
-                const MAX_LOG_LINES = 150;
-                if (logLines.length > MAX_LOG_LINES) { logLines.shift(); }
-                log.textContent = logLines.join('\\n');
-                log.scrollTop = log.scrollHeight;
-            }
-        } catch (e) { console.error('Error parsing SSE data:', e); }
-    };
+_SAFE_NAME_TT = str.maketrans({c: '_' for c in '\\*?:"<>|'})
 
-    document.addEventListener("DOMContentLoaded", function() {
-        if ({{ session.get('task_active', 'false')|lower }}) {
-            globalProgressBtn.style.display = 'block';
-        }
 
-        const globalStopBtn = document.getElementById('global-stop-button');
-        if (globalStopBtn) {
-            globalStopBtn.addEventListener('click', function() {
-                fetch('/stop_encode', { method: 'POST' }).then(response => {
-                    if (response.ok) {
-                        document.getElementById('global-progress-stage').textContent = 'Process stop requested.';
-                    }
-                });
-            });
-        }
+def get_safe_filename(name):
+    """Sanitizes a string to be a valid filename component, allowing slashes for paths."""
+    # split()/join() collapses whitespace runs and strips the ends
+    return '/'.join(' '.join(part.translate(_SAFE_NAME_TT).split())
+                    for part in name.split('/'))
 
-        {% if download_started %}
-            const stage = document.getElementById('progress-stage');
-            const progressBar = document.getElementById('progress-bar-inner');
-            const log = document.getElementById('progress-log');
-            globalProgressBtn.style.display = 'block';
-            const eventSource = new EventSource("{{ url_for('progress_stream') }}");
-            window.finalUrl = null;
-            eventSource.onmessage = function(event) {
-                 handleSseEvent(event, stage, progressBar, log, eventSource, false);
-            };
-            eventSource.onerror = function(err) {
-                stage.textContent = 'Connection error. Please refresh.';
-                eventSource.close();
-            };
-
-            const batchStopBtn = document.getElementById('batch-stop-button');
-            if (batchStopBtn) {
-                batchStopBtn.addEventListener('click', function() {
-                    fetch('/stop_encode', { method: 'POST' }).then(response => {
-                        if (response.ok) {
-                            stage.textContent = 'Batch encoding stop requested.';
-                            progressBar.style.backgroundColor = '#dc3545';
-                        }
-                    });
-                });
-            }
-        {% endif %}
-    });
-</script>
-</body>
-</html>
-"""
 
+# Control characters, path separators and characters Windows rejects
+_FNAME_BAD_CHARS = ''.join(chr(c) for c in range(32)) + '/\\:*?"<>|'
+_FNAME_TT = str.maketrans({c: '_' for c in _FNAME_BAD_CHARS})
 
-# -----------------------------
-# Helper Functions
-# -----------------------------
-def human_size(size_bytes):
-    if size_bytes is None or not isinstance(size_bytes,
-                                            (int, float)) or size_bytes == 0:
-        return "0 B"
-    power = 1024
-    n = 0
-    power_labels = {0: 'B', 1: 'KiB', 2: 'MiB', 3: 'GiB', 4: 'TiB'}
-    while size_bytes >= power and n < len(power_labels) - 1:
-        size_bytes /= power
-        n += 1
-    return f"{size_bytes:.2f} {power_labels[n]}"
 
+def fast_secure_filename(name):
+    """Single-component filename safe to join onto DOWNLOAD_FOLDER.
 
-def get_safe_filename(name):
-    """Sanitizes a string to be a valid filename component, allowing slashes for paths."""
-    parts = name.split('/')
-    safe_parts = [re.sub(r'[\\*?:"<>|]', "_", part) for part in parts]
-    safe_parts = [re.sub(r'\s+', ' ', part).strip() for part in safe_parts]
-    return '/'.join(safe_parts)
+    One str.translate pass; only falls back to werkzeug's secure_filename
+    when nothing usable is left (e.g. names made only of dots)."""
+    return name.translate(_FNAME_TT).strip('._ ') or secure_filename(name)
 
 
 def get_unique_filepath(target_path):
@@ -2567,10 +1142,12 @@ def get_unique_filepath(target_path):
     return new_filepath
 
 
-def get_file_size(file_path):
+def get_file_size(file_path, st=None):
+    """Human-readable size; pass st (a stat result) to skip the stat call."""
     try:
-        return human_size(os.path.getsize(file_path))
-    except FileNotFoundError:
+        return human_size(st.st_size if st is not None else
+                          os.path.getsize(file_path))
+    except OSError:
         return "N/A"
 
 
@@ -2590,38 +1167,50 @@ def get_folder_total_size(folder_path):
     """Calculate total size of all files in folder recursively."""
     total_size = 0
     try:
-        for dirpath, dirnames, filenames in os.walk(folder_path):
-            for filename in filenames:
-                filepath = os.path.join(dirpath, filename)
+        with os.scandir(folder_path) as entries:
+            for entry in entries:
                 try:
-                    total_size += os.path.getsize(filepath)
-                except (OSError, FileNotFoundError):
+                    # Like os.walk: don't descend into symlinked folders
+                    if entry.is_dir():
+                        if not entry.is_symlink():
+                            total_size += get_folder_total_size(entry.path)
+                    else:
+                        total_size += entry.stat().st_size
+                except OSError:
                     pass
-    except Exception:
+    except OSError:
         pass
     return total_size
 
 
+# Free space changes slowly next to the request rate, so each path's
+# figure is reused for a couple of seconds: path -> (ts, bytes)
+DISK_SPACE_TTL = 2
+_disk_space_cache = {}
+
+
 def get_available_space(path):
     """Get available disk space for the given path in bytes."""
+    cached = _disk_space_cache.get(path)
+    if cached and time.monotonic() - cached[0] < DISK_SPACE_TTL:
+        return cached[1]
     try:
-        stat = os.statvfs(path)
-        available = stat.f_bavail * stat.f_frsize
-        return available
+        available = shutil.disk_usage(path).free
     except Exception:
         return 0
+    _disk_space_cache[path] = (time.monotonic(), available)
+    return available
 
 
 def get_media_info(file_path):
     """Fetches detailed media information using ffprobe."""
     try:
-        command = [
-            FFPROBE_PATH, "-v", "quiet", "-print_format", "json",
-            "-show_streams", "-show_format", file_path
-        ]
-        result = subprocess.check_output(command, stderr=subprocess.STDOUT)
-        data = json.loads(result)
-        info = {"file_size": get_file_size(file_path)}
+        # One stat serves both the probe cache key and the size
+        st = os.stat(file_path)
+        data = probe_stream(file_path, st)
+        if not data:
+            return {"error": "Could not retrieve media information."}
+        info = {"file_size": get_file_size(file_path, st)}
         format_info = data.get('format', {})
         duration_sec = float(format_info.get('duration', 0))
         info['duration'] = str(timedelta(seconds=int(duration_sec)))
@@ -2669,209 +1258,168 @@ def get_media_info(file_path):
 def get_media_duration(file_path):
     if not is_media_file(file_path): return 0
     try:
-        cmd = [
-            FFPROBE_PATH, "-v", "error", "-show_entries", "format=duration",
-            "-of", "default=noprint_wrappers=1:nokey=1", file_path
-        ]
-        duration_str = subprocess.check_output(
-            cmd, universal_newlines=True, stderr=subprocess.DEVNULL).strip()
-        return float(duration_str) if duration_str else 0
-    except (subprocess.CalledProcessError, FileNotFoundError, ValueError):
+        return float(probe_stream(file_path).get('format', {}).get('duration', 0))
+    except (OSError, ValueError):
         return 0
 
 
 def get_audio_channels(file_path):
     try:
-        cmd = [
-            FFPROBE_PATH, "-v", "error", "-select_streams", "a:0",
-            "-show_entries", "stream=channels", "-of",
-            "default=noprint_wrappers=1:nokey=1", file_path
-        ]
-        channels_str = subprocess.check_output(
-            cmd, universal_newlines=True, stderr=subprocess.DEVNULL).strip()
-        return int(channels_str) if channels_str else 2
-    except (subprocess.CalledProcessError, FileNotFoundError, ValueError):
+        audio_stream = next((s for s in probe_stream(file_path).get('streams', [])
+                             if s.get('codec_type') == 'audio'), {})
+        return int(audio_stream.get('channels') or 2)
+    except (OSError, ValueError):
         return 2
 
 
 def trim_video(input_path, output_path, start_time, end_time):
     try:
         unique_output_path = get_unique_filepath(output_path)
-        cmd = [
-            FFMPEG_PATH, "-y", "-i", input_path, "-ss", start_time, "-to",
-            end_time, "-c", "copy", unique_output_path
-        ]
-        subprocess.run(cmd,
-                       check=True,
-                       stdout=subprocess.DEVNULL,
-                       stderr=subprocess.DEVNULL)
-        return True, os.path.basename(unique_output_path)
+        # -ss/-to as input options seek in the demuxer, straight to the
+        # keyframe before start_time, which is where a stream copy can cut
+        # anyway; make_zero shifts the cut's timestamps to start at 0.
+        # Video, audio and subtitle streams are kept (data/tmcd tracks
+        # dropped); if the container can't hold the subtitles, fall back
+        # to ffmpeg's default stream selection.
+        for stream_map in (["-map", "0:v?", "-map", "0:a?", "-map", "0:s?",
+                            "-dn", "-ignore_unknown"], []):
+            cmd = [
+                FFMPEG_PATH, "-y", "-ss", start_time, "-to", end_time, "-i",
+                input_path, *stream_map, "-c", "copy", "-avoid_negative_ts",
+                "make_zero", unique_output_path
+            ]
+            result = subprocess.run(cmd,
+                                    stdout=subprocess.DEVNULL,
+                                    stderr=subprocess.DEVNULL)
+            if result.returncode == 0:
+                return True, os.path.basename(unique_output_path)
+        raise subprocess.CalledProcessError(result.returncode, cmd)
     except subprocess.CalledProcessError as e:
         raise Exception(f"FFmpeg error: {e.returncode}")
     except Exception as e:
         raise Exception(f"Trim failed: {str(e)}")
 
 
-def fetch_formats(url):
-    try:
-        ydl_opts = {
-            'quiet': True, 
-            'force_ipv4': True, 
-            'source_address': '0.0.0.0', 
-            'socket_timeout': 60
-        }
-        if os.path.exists(COOKIES_FILE):
-            ydl_opts['cookiefile'] = COOKIES_FILE  # type: ignore
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(url, download=False)
-        if info is None:
-            return "", [], []
-        formats = info.get('formats', [])
-        video_formats, audio_formats, raw_lines = [], [], []
-        for f in formats:
-            if not f.get('format_id'): continue
-            fid, ext = f['format_id'], f.get('ext', 'u')
-            height, width = f.get('height'), f.get('width')
-            vcodec, acodec = f.get('vcodec'), f.get('acodec')
-            fps = f.get('fps')
-            size_bytes = f.get('filesize') or f.get('filesize_approx')
-            res = f"{width}x{height}" if height else "audio"
-            fps_int = int(fps) if fps else 0
-            size = human_size(size_bytes)
-            raw_lines.append(
-                f"{fid:>3} {ext:<7} {res:<9} {fps_int:>3}fps {size:<10} {vcodec or 'none':<12} {acodec or 'none'}"
-            )
-            is_video = vcodec and vcodec != 'none' and height
-            is_audio = acodec and acodec != 'none'
-            if is_audio and not is_video:
-                abr = f.get('abr', 0)
-                audio_formats.append({
-                    'id': fid,
-                    'display': f"{acodec.upper()} | {int(abr)}k | ({size})",
-                    'br': abr or 0
-                })
-            elif is_video:
-                br = f.get('tbr') or f.get('vbr') or 0
-                video_formats.append({
-                    'id': fid,
-                    'display':
-                    f"{height}p | {fps_int}fps | {vcodec.upper()} | {int(br)}k | ({size})",
-                    'h': height,
-                    'fps': fps_int,
-                    'is_muxed': is_audio
-                })
-        video_formats.sort(key=lambda x: (x.get('h', 0), x.get('fps', 0)),
-                           reverse=True)
-        audio_formats.sort(key=lambda x: x.get('br', 0), reverse=True)
-        return '\n'.join(raw_lines), video_formats, audio_formats
-    except Exception as e:
-        flash(f"❌ Error fetching formats: {str(e)}", "error")
-        return "", [], []
-
-
-def get_original_filename(url):
-    try:
-        ydl_opts = {
-            'quiet': True,
-            'extractor_args': {
-                'youtube': ['player_client=android']
-            },
-            'socket_timeout': 60,
-            'force_ipv4': True,
-            'source_address': '0.0.0.0'
-        }
-        if os.path.exists(COOKIES_FILE): ydl_opts['cookiefile'] = COOKIES_FILE
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(url, download=False)
-        if info is None:
-            return "download.mkv"
-        title = info.get('title', 'download')
-        if title is None:
-            title = 'download'
-        title = title.strip()
-        safe_title = re.sub(r'[\\/*?:"<>|]', '_', title)
-        return f"{safe_title}.mkv"
-    except Exception:
-        return "download.mkv"
+# yt-dlp metadata lookups are slow network round trips. One
+# extract_info() per (url, use_cookies) feeds both the format list and
+# the title, and is reused for FORMAT_INFO_TTL seconds, so repeat fetches
+# and a fetch followed by a download don't query the site again; at most
+# FORMAT_INFO_MAX entries are kept.
+FORMAT_INFO_TTL = 600
+FORMAT_INFO_MAX = 256
+_format_info_cache = {}
+_format_info_lock = threading.Lock()
+
+
+def build_ydl_opts(use_cookies=True):
+    """yt-dlp options for metadata lookups; the YouTube tab passes
+    use_cookies=False to skip cookies.txt."""
+    ydl_opts = {
+        'quiet': True,
+        'force_ipv4': True,
+        'source_address': '0.0.0.0',
+        'socket_timeout': 60
+    }
+    if use_cookies and os.path.exists(COOKIES_FILE):
+        ydl_opts['cookiefile'] = COOKIES_FILE
+    return ydl_opts
+
+
+def get_video_info(url, use_cookies=True):
+    """extract_info(url, download=False), cached; cookies.txt is used when
+    use_cookies is set and the file exists."""
+    key = (url, use_cookies)
+    with _format_info_lock:
+        cached = _format_info_cache.get(key)
+    if cached and time.monotonic() - cached[0] < FORMAT_INFO_TTL:
+        return cached[1]
+    with yt_dlp.YoutubeDL(build_ydl_opts(use_cookies)) as ydl:
+        info = ydl.extract_info(url, download=False)
+    if info is not None:
+        now = time.monotonic()
+        with _format_info_lock:
+            for k in [k for k, (ts, _) in _format_info_cache.items()
+                      if now - ts >= FORMAT_INFO_TTL]:
+                del _format_info_cache[k]
+            if len(_format_info_cache) >= FORMAT_INFO_MAX:
+                del _format_info_cache[next(iter(_format_info_cache))]
+            _format_info_cache[key] = (now, info)
+    return info
+
+
+def forget_format_info(url):
+    """Drop cached lookups for url so the next fetch queries the site."""
+    with _format_info_lock:
+        for k in [k for k in _format_info_cache if k[0] == url]:
+            del _format_info_cache[k]
+
+
+def split_formats(formats):
+    """Turn yt-dlp's format list into (raw listing text, video formats,
+    audio formats), best first. Formats with neither a video nor an audio
+    stream (storyboards etc.) are skipped before any text is built."""
+    video_formats, audio_formats, raw_lines = [], [], []
+    for f in formats:
+        fid = f.get('format_id')
+        if not fid: continue
+        vcodec = f.get('vcodec') or 'none'
+        acodec = f.get('acodec') or 'none'
+        height = f.get('height')
+        is_video = vcodec != 'none' and height
+        is_audio = acodec != 'none'
+        if not (is_video or is_audio): continue
+        fps = f.get('fps')
+        fps_int = int(fps) if fps else 0
+        size = human_size(f.get('filesize') or f.get('filesize_approx'))
+        res = f"{f.get('width')}x{height}" if height else "audio"
+        raw_lines.append(
+            f"{fid:>3} {f.get('ext', 'u'):<7} {res:<9} {fps_int:>3}fps {size:<10} {vcodec:<12} {acodec}"
+        )
+        if is_video:
+            br_int = int(f.get('tbr') or f.get('vbr') or 0)
+            video_formats.append({
+                'id': fid,
+                'display':
+                f"{height}p | {fps_int}fps | {vcodec.upper()} | {br_int}k | ({size})",
+                'h': height,
+                'fps': fps_int,
+                'is_muxed': is_audio
+            })
+        else:
+            abr = f.get('abr') or 0
+            audio_formats.append({
+                'id': fid,
+                'display': f"{acodec.upper()} | {int(abr)}k | ({size})",
+                'br': abr
+            })
+    # 'h', 'fps' and 'br' are always set above, so the sort keys can be
+    # plain itemgetters
+    video_formats.sort(key=itemgetter('h', 'fps'), reverse=True)
+    audio_formats.sort(key=itemgetter('br'), reverse=True)
+    return '\n'.join(raw_lines), video_formats, audio_formats
 
 
-def fetch_formats_no_cookies(url):
-    """Fetch formats WITHOUT using cookies"""
+def fetch_formats(url, use_cookies=True):
     try:
-        ydl_opts = {
-            'quiet': True, 
-            'force_ipv4': True,
-            'source_address': '0.0.0.0',
-            'socket_timeout': 60
-        }
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(url, download=False)
+        info = get_video_info(url, use_cookies)
         if info is None:
             return "", [], []
-        formats = info.get('formats', [])
-        video_formats, audio_formats, raw_lines = [], [], []
-        for f in formats:
-            if not f.get('format_id'): continue
-            fid, ext = f['format_id'], f.get('ext', 'u')
-            height, width = f.get('height'), f.get('width')
-            vcodec, acodec = f.get('vcodec'), f.get('acodec')
-            fps = f.get('fps')
-            size_bytes = f.get('filesize') or f.get('filesize_approx')
-            res = f"{width}x{height}" if height else "audio"
-            fps_int = int(fps) if fps else 0
-            size = human_size(size_bytes)
-            raw_lines.append(
-                f"{fid:>3} {ext:<7} {res:<9} {fps_int:>3}fps {size:<10} {vcodec or 'none':<12} {acodec or 'none'}"
-            )
-            is_video = vcodec and vcodec != 'none' and height
-            is_audio = acodec and acodec != 'none'
-            if is_audio and not is_video:
-                abr = f.get('abr', 0)
-                audio_formats.append({
-                    'id': fid,
-                    'display': f"{acodec.upper()} | {int(abr)}k | ({size})",
-                    'br': abr or 0
-                })
-            elif is_video:
-                br = f.get('tbr') or f.get('vbr') or 0
-                video_formats.append({
-                    'id': fid,
-                    'display':
-                    f"{height}p | {fps_int}fps | {vcodec.upper()} | {int(br)}k | ({size})",
-                    'h': height,
-                    'fps': fps_int,
-                    'is_muxed': is_audio
-                })
-        video_formats.sort(key=lambda x: (x.get('h', 0), x.get('fps', 0)),
-                           reverse=True)
-        audio_formats.sort(key=lambda x: x.get('br', 0), reverse=True)
-        return '\n'.join(raw_lines), video_formats, audio_formats
+        return split_formats(info.get('formats', []))
     except Exception as e:
         flash(f"❌ Error fetching formats: {str(e)}", "error")
         return "", [], []
 
 
-def get_original_filename_no_cookies(url):
-    """Get filename WITHOUT using cookies"""
+def get_original_filename(url, use_cookies=True):
     try:
-        ydl_opts = {
-            'quiet': True,
-            'extractor_args': {
-                'youtube': ['player_client=android']
-            },
-            'socket_timeout': 60,
-            'force_ipv4': True,
-            'source_address': '0.0.0.0'
-        }
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(url, download=False)
+        info = get_video_info(url, use_cookies)
         if info is None:
             return "download.mkv"
         title = info.get('title', 'download')
         if title is None:
             title = 'download'
         title = title.strip()
-        safe_title = re.sub(r'[\\/*?:"<>|]', '_', title)
+        safe_title = _TITLE_UNSAFE_RE.sub('_', title)
         return f"{safe_title}.mkv"
     except Exception:
         return "download.mkv"
@@ -2884,15 +1432,82 @@ def run_command_with_progress(command, stage, q):
                                universal_newlines=True,
                                encoding='utf-8',
                                errors='ignore')
-    if process.stdout is None:
-        raise Exception("Process stdout is None")
-    for line in iter(process.stdout.readline, ''):
-        q.put({"log": line.strip()})
-        match = re.search(r'\[download\]\s+([0-9.]+)%', line)
-        if match:
-            q.put({"stage": stage, "percent": float(match.group(1))})
-    if process.wait() != 0:
-        raise subprocess.CalledProcessError(process.returncode, command)
+    register_process(process)
+    try:
+        if process.stdout is None:
+            raise Exception("Process stdout is None")
+        for line in iter(process.stdout.readline, ''):
+            q.put({"log": line.strip()})
+            match = '%' in line and _DL_PERCENT_RE.search(line)
+            if match:
+                q.put({"stage": stage, "percent": float(match.group(1))})
+        returncode = process.wait()
+    finally:
+        unregister_process(process)
+    if returncode != 0:
+        raise subprocess.CalledProcessError(returncode, command)
+
+
+class MultipartFileBody:
+    """Stream a multipart/form-data upload straight from disk.
+
+    requests builds the whole body in memory when given files=, which for
+    multi-GB videos means multi-GB of RSS before the first byte is sent.
+    This yields the part headers, then the file in large chunks, then the
+    closing boundary; __len__ lets requests send a Content-Length.
+    on_progress(sent, total), if given, is called after each chunk has
+    been handed to the socket.
+    """
+
+    CHUNK_SIZE = 4 * 1024 * 1024
+
+    def __init__(self, file_path, filename, field="file", fields=None,
+                 on_progress=None):
+        self.file_path = file_path
+        self.on_progress = on_progress
+        self.boundary = choose_boundary()
+        self.content_type = f"multipart/form-data; boundary={self.boundary}"
+        head = b""
+        for name, value in (fields or {}).items():
+            head += self._part_header(RequestField(name=name, data=value))
+            head += str(value).encode() + b"\r\n"
+        head += self._part_header(
+            RequestField(name=field, data=b"", filename=filename))
+        self._head = head
+        self._tail = f"\r\n--{self.boundary}--\r\n".encode()
+        self._size = os.path.getsize(file_path)
+
+    def _part_header(self, rf):
+        rf.make_multipart()
+        return f"--{self.boundary}\r\n".encode() + rf.render_headers().encode()
+
+    def __len__(self):
+        return len(self._head) + self._size + len(self._tail)
+
+    def __iter__(self):
+        yield self._head
+        with open(self.file_path, "rb") as f:
+            if hasattr(os, "posix_fadvise"):
+                os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            sent = 0
+            while True:
+                chunk = f.read(self.CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+                sent += len(chunk)
+                if self.on_progress:
+                    self.on_progress(sent, self._size)
+        yield self._tail
+
+
+def upload_progress(q, stage, start, end):
+    """on_progress callback for MultipartFileBody mapping bytes sent onto
+    start..end percent of the job's progress bar."""
+    def on_progress(sent, total):
+        percent = start + (end - start) * sent / total if total else end
+        q.put({"stage": stage, "percent": percent})
+    return on_progress
 
 
 def upload_to_pixeldrain(file_path, filename, q):
@@ -2902,11 +1517,14 @@ def upload_to_pixeldrain(file_path, filename, q):
             "percent": 10
         })
         api_url = "https://pixeldrain.com/api/file"
-        with open(file_path, 'rb') as f:
-            files = {'file': (filename, f)}
-            auth = ('', PIXELDRAIN_API_KEY) if PIXELDRAIN_API_KEY else None
-            q.put({"stage": "Sending data...", "percent": 50})
-            response = requests.post(api_url, files=files, auth=auth)
+        body = MultipartFileBody(
+            file_path, filename,
+            on_progress=upload_progress(q, "Sending data...", 10, 99))
+        auth = ('', PIXELDRAIN_API_KEY) if PIXELDRAIN_API_KEY else None
+        response = http_session.post(api_url,
+                                     data=body,
+                                     headers={"Content-Type": body.content_type},
+                                     auth=auth)
         response.raise_for_status()
         result = response.json()
         if result.get("success"):
@@ -2938,7 +1556,7 @@ def upload_to_4stream(file_path, filename, q):
         q.put({"stage": "Getting upload server...", "percent": 10})
 
         # Step 1: Get upload server
-        server_response = requests.get(
+        server_response = http_session.get(
             "https://up4stream.com/api/upload/server",
             params={"key": UP4STREAM_API_KEY},
             timeout=10)
@@ -2956,31 +1574,15 @@ def upload_to_4stream(file_path, filename, q):
         upload_server = server_data["result"]
         q.put({"stage": "Got upload server, uploading file...", "percent": 30})
 
-        # Step 2: Upload file to the server
-        file_size = os.path.getsize(file_path)
-
-        with open(file_path, 'rb') as f:
-            files = {
-                'file': (filename, f),
-                'key': (None, UP4STREAM_API_KEY),
-            }
-
-            # Track upload progress
-            def upload_with_progress():
-                uploaded = [0]
-
-                def update_progress(monitor):
-                    uploaded[0] = monitor.bytes_read
-                    percent = min(99, int((uploaded[0] / file_size) * 60) + 30)
-                    q.put({"stage": "Uploading file...", "percent": percent})
-
-                # Simple progress tracking
-                response = requests.post(upload_server,
-                                         files=files,
-                                         timeout=300)
-                return response
-
-            response = upload_with_progress()
+        # Step 2: Stream the file to the server, reporting 30-90%
+        body = MultipartFileBody(
+            file_path, filename, fields={'key': UP4STREAM_API_KEY},
+            on_progress=upload_progress(q, "Uploading file...", 30, 90))
+        response = http_session.post(
+            upload_server,
+            data=body,
+            headers={"Content-Type": body.content_type},
+            timeout=300)
 
         response.raise_for_status()
         upload_result = response.json()
@@ -3020,11 +1622,14 @@ def upload_to_pixeldrain_alt(file_path, filename, q, api_key):
             "percent": 10
         })
         api_url = "https://pixeldrain.com/api/file"
-        with open(file_path, 'rb') as f:
-            files = {'file': (filename, f)}
-            auth = ('', api_key) if api_key else None
-            q.put({"stage": "Sending data...", "percent": 50})
-            response = requests.post(api_url, files=files, auth=auth)
+        body = MultipartFileBody(
+            file_path, filename,
+            on_progress=upload_progress(q, "Sending data...", 10, 99))
+        auth = ('', api_key) if api_key else None
+        response = http_session.post(api_url,
+                                     data=body,
+                                     headers={"Content-Type": body.content_type},
+                                     auth=auth)
         response.raise_for_status()
         result = response.json()
         if result.get("success"):
@@ -3057,7 +1662,7 @@ def upload_to_gofile(file_path, filename, q):
         q.put({"stage": "Getting Gofile upload server...", "percent": 10})
 
         # Step 1: Get the list of upload servers
-        server_response = requests.get(
+        server_response = http_session.get(
             "https://api.gofile.io/servers",
             headers={"Authorization": f"Bearer {GOFILE_API_TOKEN}"},
             timeout=10
@@ -3078,28 +1683,22 @@ def upload_to_gofile(file_path, filename, q):
         file_size = os.path.getsize(file_path)
         upload_url = f"https://{upload_server}.gofile.io/uploadFile"
 
-        with open(file_path, 'rb') as f:
-            files = {'file': (filename, f)}
-            headers = {
-                "Authorization": f"Bearer {GOFILE_API_TOKEN}",
-                "X-Website-Token": get_gofile_website_token()
-            }
+        body = MultipartFileBody(
+            file_path, filename,
+            on_progress=upload_progress(q, "Uploading file...", 30, 99))
+        headers = {
+            "Authorization": f"Bearer {GOFILE_API_TOKEN}",
+            "X-Website-Token": get_gofile_website_token(),
+            "Content-Type": body.content_type
+        }
 
-            # Track upload progress (simplified)
-            uploaded = [0]
-            
-            def update_progress():
-                # Simple progress simulation
-                for i in range(30, 90, 10):
-                    q.put({"stage": "Uploading to Gofile...", "percent": i})
-            
-            # Upload the file
-            response = requests.post(
-                upload_url,
-                files=files,
-                headers=headers,
-                timeout=600  # 10 minutes for large files
-            )
+        # Upload the file
+        response = http_session.post(
+            upload_url,
+            data=body,
+            headers=headers,
+            timeout=600  # 10 minutes for large files
+        )
 
         response.raise_for_status()
         upload_result = response.json()
@@ -3155,7 +1754,7 @@ def upload_to_4stream_alt(file_path, filename, q, api_key):
         q.put({"stage": "Getting upload server...", "percent": 10})
 
         # Step 1: Get upload server
-        server_response = requests.get(
+        server_response = http_session.get(
             "https://up4stream.com/api/upload/server",
             params={"key": api_key},
             timeout=10)
@@ -3173,31 +1772,15 @@ def upload_to_4stream_alt(file_path, filename, q, api_key):
         upload_server = server_data["result"]
         q.put({"stage": "Got upload server, uploading file...", "percent": 30})
 
-        # Step 2: Upload file to the server
-        file_size = os.path.getsize(file_path)
-
-        with open(file_path, 'rb') as f:
-            files = {
-                'file': (filename, f),
-                'key': (None, api_key),
-            }
-
-            # Track upload progress
-            def upload_with_progress():
-                uploaded = [0]
-
-                def update_progress(monitor):
-                    uploaded[0] = monitor.bytes_read
-                    percent = min(99, int((uploaded[0] / file_size) * 60) + 30)
-                    q.put({"stage": "Uploading file...", "percent": percent})
-
-                # Simple progress tracking
-                response = requests.post(upload_server,
-                                         files=files,
-                                         timeout=300)
-                return response
-
-            response = upload_with_progress()
+        # Step 2: Stream the file to the server, reporting 30-90%
+        body = MultipartFileBody(
+            file_path, filename, fields={'key': api_key},
+            on_progress=upload_progress(q, "Uploading file...", 30, 90))
+        response = http_session.post(
+            upload_server,
+            data=body,
+            headers={"Content-Type": body.content_type},
+            timeout=300)
 
         response.raise_for_status()
         upload_result = response.json()
@@ -3230,6 +1813,73 @@ def upload_to_4stream_alt(file_path, filename, q, api_key):
         q.put({"log": "DONE"})
 
 
+class _UploadChannel:
+    """Progress queue for one of several parallel uploads.
+
+    Stage lines are prefixed with the destination, and percents are
+    reported as the mean over all destinations, so the shared bar moves
+    forward instead of jumping between uploads. The uploader's error and
+    DONE events are held back; run_uploads() sends one final event once
+    every upload has finished."""
+
+    def __init__(self, q, name, percents, errors):
+        self._q = q
+        self.name = name
+        self._percents = percents
+        self._errors = errors
+
+    def put(self, ev):
+        if "error" in ev:
+            self._errors.append(f"{self.name}: {ev['error']}")
+            ev = {k: v for k, v in ev.items() if k != "error"}
+        if ev.get("log") == "DONE":
+            ev = {k: v for k, v in ev.items() if k != "log"}
+        if "percent" in ev:
+            self._percents[self.name] = ev["percent"]
+            ev["percent"] = sum(self._percents.values()) / len(self._percents)
+        if "stage" in ev:
+            ev["stage"] = f"[{self.name}] {ev['stage']}"
+        if ev:
+            self._q.put(ev)
+
+
+def run_uploads(uploads, q):
+    """Run a job's chosen uploads, each (upload_fn, file_path, filename).
+    Several destinations upload side by side, as they are independent
+    network transfers; once all have finished a single DONE follows, or
+    one error naming every upload that failed."""
+    if len(uploads) <= 1:
+        for upload_fn, file_path, filename in uploads:
+            upload_fn(file_path, filename, q)
+        return
+    job_id = current_job_id()
+    percents = {}
+    errors = []
+    channels = []
+    for upload_fn, _, _ in uploads:
+        name = upload_fn.__name__.removeprefix("upload_to_").capitalize()
+        percents[name] = 0
+        channels.append(_UploadChannel(q, name, percents, errors))
+
+    def run(upload, channel):
+        # Keep the job's id so progress stays tagged and stoppable
+        _job_local.job_id = job_id
+        upload_fn, file_path, filename = upload
+        try:
+            upload_fn(file_path, filename, channel)
+        except Exception as e:
+            channel.put({"error": str(e)})
+        finally:
+            channel.put({"percent": 100})
+            _job_local.job_id = None
+
+    with ThreadPoolExecutor(max_workers=len(uploads)) as executor:
+        list(executor.map(run, uploads, channels))
+    if errors:
+        q.put({"error": "Upload failed - " + "; ".join(errors)})
+    q.put({"log": "DONE"})
+
+
 def encode_file(input_path,
                 output_filename,
                 codec,
@@ -3249,7 +1899,6 @@ def encode_file(input_path,
                 upload_pixeldrain=False,
                 upload_4stream=False,
                 upload_gofile=False):
-    global current_process
     if scale:
         scale_map = {
             "1920:-2": "1080p",
@@ -3267,8 +1916,6 @@ def encode_file(input_path,
     safe_output = os.path.basename(output_path)
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
     try:
-        while not q.empty():
-            q.get()
         q.put({"stage": "Initializing encoding...", "percent": 0})
         if not is_media_file(input_path):
             q.put({"error": "File type cannot be encoded."})
@@ -3349,19 +1996,19 @@ def encode_file(input_path,
             if enable_vmaf: vf_params.append("libvmaf")
             if vf_params: ffmpeg_cmd.extend(["-vf", ",".join(vf_params)])
             ffmpeg_cmd.append(output_path)
-            current_process = subprocess.Popen(ffmpeg_cmd,
-                                               stdout=subprocess.PIPE,
-                                               stderr=subprocess.STDOUT,
-                                               universal_newlines=True,
-                                               encoding='utf-8',
-                                               errors='ignore')
-            if current_process.stdout is None:
+            process = subprocess.Popen(ffmpeg_cmd,
+                                       stdout=subprocess.PIPE,
+                                       stderr=subprocess.STDOUT,
+                                       universal_newlines=True,
+                                       encoding='utf-8',
+                                       errors='ignore')
+            register_process(process)
+            if process.stdout is None:
                 raise Exception("Process stdout is None")
-            for line in iter(current_process.stdout.readline, ''):
+            for line in iter(process.stdout.readline, ''):
                 q.put({"log": line.strip()})
                 if duration > 0:
-                    match = re.search(r'time=(\d{2}):(\d{2}):(\d{2})\.(\d{2})',
-                                      line)
+                    match = 'time=' in line and _FFMPEG_TIME_RE.search(line)
                     if match:
                         h, m, s, ms = map(int, match.groups())
                         percent = min(
@@ -3370,31 +2017,33 @@ def encode_file(input_path,
                             100)
                         q.put({"stage": stage_msg, "percent": percent})
                     if enable_vmaf:
-                        vmaf_match = re.search(r'VMAF score: (\d+\.\d+)', line)
+                        vmaf_match = ('VMAF score' in line
+                                      and _VMAF_SCORE_RE.search(line))
                         if vmaf_match:
                             q.put(
                                 {"log": f"VMAF Score: {vmaf_match.group(1)}"})
-            current_process.wait()
-            if current_process.returncode != 0:
+            process.wait()
+            unregister_process(process)
+            if process.returncode != 0:
                 q.put({"error": "Encoding process terminated."})
-                current_process = None
                 return
-            current_process = None
             q.put({
                 "stage": "✅ Done!",
                 "percent": 100,
                 "log": f"{codec.upper()} encoding complete."
             })
+        output_name = os.path.basename(safe_output)
+        uploads = []
         if upload_pixeldrain:
-            upload_to_pixeldrain(output_path, os.path.basename(safe_output), q)
+            uploads.append((upload_to_pixeldrain, output_path, output_name))
         elif upload_4stream:
-            upload_to_4stream(output_path, os.path.basename(safe_output), q)
+            uploads.append((upload_to_4stream, output_path, output_name))
         if upload_gofile:
-            upload_to_gofile(output_path, os.path.basename(safe_output), q)
+            uploads.append((upload_to_gofile, output_path, output_name))
+        run_uploads(uploads, q)
     except Exception as e:
         q.put({"error": str(e)})
     finally:
-        current_process = None
         if not (upload_pixeldrain or upload_4stream or upload_gofile):
             q.put({"log": "DONE"})
 
@@ -3407,8 +2056,6 @@ def download_file_directly(url,
                            password="",
                            referer=None):
     try:
-        while not q.empty():
-            q.get()
         q.put({"stage": "Starting direct download...", "percent": 0})
 
         # Prepare auth tuple
@@ -3445,7 +2092,7 @@ def download_file_directly(url,
                         wt = get_gofile_website_token()
                         headers['X-Website-Token'] = wt
                         
-                        token_resp = requests.post("https://api.gofile.io/accounts", headers={
+                        token_resp = http_session.post("https://api.gofile.io/accounts", headers={
                             'User-Agent': headers['User-Agent'],
                             'Referer': 'https://gofile.io/',
                             'X-Website-Token': wt
@@ -3499,10 +2146,8 @@ def download_file_directly(url,
                     filename = "direct_download"
                     cd_header = response.headers.get('content-disposition')
                     if cd_header:
-                        match = re.search(r"filename\*=([^']*)''([^;]*)",
-                                          cd_header) or re.search(
-                                              r'filename="?([^"]+)"?',
-                                              cd_header)
+                        match = (_CD_FILENAME_EXT_RE.search(cd_header)
+                                 or _CD_FILENAME_RE.search(cd_header))
                         if match: filename = unquote(match.group(1))
                     if filename == "direct_download":
                         filename_from_url = url.split('/')[-1].split('?')[0]
@@ -3555,10 +2200,9 @@ def download_file_directly(url,
                                 cd_header = response.headers.get(
                                     'content-disposition')
                                 if cd_header:
-                                    match = re.search(
-                                        r"filename\*=([^']*)''([^;]*)",
-                                        cd_header) or re.search(
-                                            r'filename="?([^"]+)"?', cd_header)
+                                    match = (
+                                        _CD_FILENAME_EXT_RE.search(cd_header)
+                                        or _CD_FILENAME_RE.search(cd_header))
                                     if match:
                                         filename = unquote(match.group(1))
                                 if filename == "direct_download":
@@ -3605,10 +2249,13 @@ def download_file_directly(url,
             raise
 
         q.put({"stage": "✅ Download complete!", "percent": 100})
-        if upload_pixeldrain_direct and final_path and safe_name:
-            upload_to_pixeldrain(final_path, safe_name, q)
-        if upload_gofile_direct and final_path and safe_name:
-            upload_to_gofile(final_path, safe_name, q)
+        if final_path and safe_name:
+            uploads = []
+            if upload_pixeldrain_direct:
+                uploads.append((upload_to_pixeldrain, final_path, safe_name))
+            if upload_gofile_direct:
+                uploads.append((upload_to_gofile, final_path, safe_name))
+            run_uploads(uploads, q)
     except requests.exceptions.HTTPError as e:
         if e.response.status_code == 401:
             q.put({
@@ -3626,8 +2273,6 @@ def download_file_directly(url,
 
 def upload_file_directly_to_pixeldrain(url, q):
     try:
-        while not q.empty():
-            q.get()
         q.put({"stage": "Starting direct remote upload...", "percent": 0})
         with requests.get(url,
                           stream=True,
@@ -3637,9 +2282,8 @@ def upload_file_directly_to_pixeldrain(url, q):
             filename = "direct_upload"
             cd_header = r.headers.get('content-disposition')
             if cd_header:
-                match = re.search(r"filename\*=([^']*)''([^;]*)",
-                                  cd_header) or re.search(
-                                      r'filename="?([^"]+)"?', cd_header)
+                match = (_CD_FILENAME_EXT_RE.search(cd_header)
+                         or _CD_FILENAME_RE.search(cd_header))
                 if match: filename = unquote(match.group(1))
             if filename == "direct_upload":
                 filename_from_url = url.split('/')[-1].split('?')[0]
@@ -3652,10 +2296,10 @@ def upload_file_directly_to_pixeldrain(url, q):
                                        'application/octet-stream'))
             }
             auth = ('', PIXELDRAIN_API_KEY) if PIXELDRAIN_API_KEY else None
-            response = requests.post(api_url,
-                                     files=files,
-                                     auth=auth,
-                                     stream=True)
+            response = http_session.post(api_url,
+                                         files=files,
+                                         auth=auth,
+                                         stream=True)
             response.raise_for_status()
             result = response.json()
             if result.get("success"):
@@ -3698,7 +2342,6 @@ def download_and_convert(url,
                          tiles="2x2",
                          enable_vmaf=False,
                          use_cookies=True):
-    global current_process
     safe_name = get_safe_filename(filename)
     final_path_check = os.path.join(DOWNLOAD_FOLDER, safe_name)
     final_path_check = get_unique_filepath(final_path_check)
@@ -3708,8 +2351,6 @@ def download_and_convert(url,
     tmp_path_template = os.path.join(DOWNLOAD_FOLDER, base_name + ".part")
     actual_tmp_path = None
     try:
-        while not q.empty():
-            q.get()
         q.put({"stage": "Initializing download...", "percent": 0})
         # Only merge audio if explicitly selected
         if audio_id:
@@ -3758,12 +2399,16 @@ def download_and_convert(url,
             encode_file(**encode_options, q=q, upload_pixeldrain=False)
         final_file_to_upload = final_path if codec == "none" else (
             final_path_mkv or final_path)
-        if upload_pixeldrain and os.path.exists(final_file_to_upload):
-            upload_to_pixeldrain(final_file_to_upload,
-                                 os.path.basename(final_file_to_upload), q)
-        if upload_gofile and os.path.exists(final_file_to_upload):
-            upload_to_gofile(final_file_to_upload,
-                             os.path.basename(final_file_to_upload), q)
+        if os.path.exists(final_file_to_upload):
+            upload_name = os.path.basename(final_file_to_upload)
+            uploads = []
+            if upload_pixeldrain:
+                uploads.append(
+                    (upload_to_pixeldrain, final_file_to_upload, upload_name))
+            if upload_gofile:
+                uploads.append(
+                    (upload_to_gofile, final_file_to_upload, upload_name))
+            run_uploads(uploads, q)
     except Exception as e:
         q.put({"error": str(e)})
     finally:
@@ -3789,8 +2434,6 @@ def manual_merge_worker(url,
     final_path = os.path.join(DOWNLOAD_FOLDER, base_name + ".mkv")
     final_path = get_unique_filepath(final_path)
     try:
-        while not q.empty():
-            q.get()
         q.put({"stage": "Initializing manual download...", "percent": 0})
         video_id_clean = video_id.strip()
         audio_id_clean = audio_id.strip() if audio_id else ""
@@ -3804,12 +2447,16 @@ def manual_merge_worker(url,
         run_command_with_progress(yt_dlp_cmd,
                                   "Downloading & Merging with yt-dlp...", q)
         q.put({"stage": "✅ Download Complete!", "percent": 100})
-        if upload_pixeldrain and os.path.exists(final_path):
-            upload_to_pixeldrain(final_path, os.path.basename(final_path), q)
-        if upload_4stream and os.path.exists(final_path):
-            upload_to_4stream(final_path, os.path.basename(final_path), q)
-        if upload_gofile and os.path.exists(final_path):
-            upload_to_gofile(final_path, os.path.basename(final_path), q)
+        if os.path.exists(final_path):
+            upload_name = os.path.basename(final_path)
+            uploads = []
+            if upload_pixeldrain:
+                uploads.append((upload_to_pixeldrain, final_path, upload_name))
+            if upload_4stream:
+                uploads.append((upload_to_4stream, final_path, upload_name))
+            if upload_gofile:
+                uploads.append((upload_to_gofile, final_path, upload_name))
+            run_uploads(uploads, q)
     except Exception as e:
         q.put({"error": str(e)})
     finally:
@@ -3820,19 +2467,62 @@ def manual_merge_worker(url,
 # -----------------------------
 # Flask Routes
 # -----------------------------
+def default_crf(codec, crf=None):
+    """CRF to prefill in an encode form: the submitted value if any, else
+    the codec's default (28 for H.265, 45 otherwise)."""
+    if crf:
+        return crf
+    return 28 if codec in ("h265", "h265_copy_audio") else 45
+
+
+def render_index(**context):
+    """Stream index.html so the browser starts on the head and tabs while
+    the (possibly large) formats listing is still being rendered."""
+    for p in ("", "yt_"):
+        context[p + "crf"] = default_crf(context.get(p + "codec"),
+                                         context.get(p + "crf"))
+    # Pop flashes now; once streaming starts the session can't be saved
+    get_flashed_messages(with_categories=True)
+    response = Response(stream_template("index.html", **context))
+    # Keep nginx-style proxies from buffering the chunked body
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
+
+
 def start_task(target, args):
     session['task_active'] = True
-    thread = threading.Thread(target=target, args=args)
-    thread.daemon = True
-    thread.start()
-    return thread
+    job_id = submit_job(target, args)
+    # The page follows (and stops) the jobs started by this request
+    g.setdefault('job_ids', []).append(job_id)
+    session['job_ids'] = g.job_ids
+    return job_id
+
+
+def request_job_ids():
+    """Job ids sent by the page, as form fields or in a JSON body."""
+    ids = request.values.getlist("job_id")
+    data = request.get_json(silent=True) or {}
+    if data.get("job_id"):
+        ids.append(data["job_id"])
+    return set(filter(None, ids))
+
+
+def direct_urls():
+    """URLs from the direct download box, one per line."""
+    return [u.strip() for u in request.form.get("direct_url", "").splitlines()
+            if u.strip()]
+
+
+def is_async_submit():
+    """True for the page's fetch() submits, which only need the job id back."""
+    return request.headers.get("X-Requested-With") == "fetch"
 
 
 @app.route("/merge_files", methods=["POST"])
 def merge_files_route():
     data = request.json or {}
     files = data.get("files", [])
-    output = secure_filename(data.get("output", "merged.mp4"))
+    output = fast_secure_filename(data.get("output", "merged.mp4"))
 
     if len(files) < 2:
         return jsonify({"error": "Select at least 2 files"}), 400
@@ -3848,13 +2538,10 @@ def merge_files_route():
     if len(valid_files) < 2:
         return jsonify({"error": "Invalid file selection"}), 400
 
-    threading.Thread(
-        target=ffmpeg_merge_with_progress,
-        args=(valid_files, os.path.join(DOWNLOAD_FOLDER, output)),
-        daemon=True
-    ).start()
+    job_id = submit_job(ffmpeg_merge_with_progress,
+                        (valid_files, os.path.join(DOWNLOAD_FOLDER, output)))
 
-    return jsonify({"started": True})
+    return jsonify({"started": True, "job_id": job_id})
 
 
 @app.route("/")
@@ -3865,17 +2552,16 @@ def index():
         flash(
             f"✅ Upload completed! <a href='{upload_url}' target='_blank'>View on Pixeldrain</a>",
             "success")
-    return render_template_string(TEMPLATE,
-                                  url="",
-                                  formats=None,
-                                  download_started=False,
-                                  manual_url="",
-                                  manual_formats_raw=None,
-                                  manual_filename="",
-                                  yt_url="",
-                                  yt_formats=None,
-                                  yt_download_started=False,
-                                  current_tab="advanced")
+    return render_index(url="",
+                        formats=None,
+                        download_started=False,
+                        manual_url="",
+                        manual_formats_raw=None,
+                        manual_filename="",
+                        yt_url="",
+                        yt_formats=None,
+                        yt_download_started=False,
+                        current_tab="advanced")
 
 
 @app.route("/", methods=["POST"])
@@ -3893,6 +2579,9 @@ def index_post():
         "yt_download_started": False,
         "current_tab": "advanced"
     }
+    if action in ("fetch", "manual_fetch") and request.values.get("refresh"):
+        forget_format_info(form_data["url"] if action == "fetch" else
+                           form_data["manual_url"])
     if action == "fetch":
         formats_string, video_formats, audio_formats = fetch_formats(
             form_data["url"])
@@ -3918,7 +2607,7 @@ def index_post():
                 request.form.get("audio_bitrate", "96")
             })
             flash("✅ Formats fetched successfully!", "success")
-        return render_template_string(TEMPLATE, **form_data)
+        return render_index(**form_data)
 
     if action == "manual_fetch":
         form_data["current_tab"] = "merge"
@@ -3926,13 +2615,20 @@ def index_post():
         formats_raw, _, __ = fetch_formats(url)
         if formats_raw:
             form_data["manual_formats_raw"] = formats_raw
-            try:
-                form_data["manual_filename"] = get_original_filename(
-                    url).replace('.mkv', '')
-            except Exception:
-                form_data["manual_filename"] = "video"
+            form_data["manual_filename"] = get_original_filename(
+                url).replace('.mkv', '')
             flash("✅ Manual formats fetched successfully!", "success")
-        return render_template_string(TEMPLATE, **form_data)
+        return render_index(**form_data)
+
+    if (action in ["direct_download", "direct_upload_pixeldrain"]
+            and not direct_urls()):
+        if is_async_submit():
+            return jsonify({"error": "No URL given."}), 400
+        flash("❌ Enter at least one URL.", "error")
+        form_data["current_tab"] = "direct"
+        response = render_index(**form_data)
+        response.status_code = 400
+        return response
 
     if action in [
             "download", "direct_download", "direct_upload_pixeldrain",
@@ -3972,15 +2668,18 @@ def index_post():
                     request.form.get("enable_vmaf") == "true")
             start_task(download_and_convert, args)
         elif action == "direct_download":
-            args = (request.form.get("direct_url"), progress_queue,
-                    request.form.get("upload_pixeldrain_direct") == "true",
-                    request.form.get("upload_gofile_direct") == "true",
-                    request.form.get("direct_username", ""),
-                    request.form.get("direct_password", ""))
-            start_task(download_file_directly, args)
+            # One job per URL (one per line); they download side by side
+            for direct_url in direct_urls():
+                args = (direct_url, progress_queue,
+                        request.form.get("upload_pixeldrain_direct") == "true",
+                        request.form.get("upload_gofile_direct") == "true",
+                        request.form.get("direct_username", ""),
+                        request.form.get("direct_password", ""))
+                start_task(download_file_directly, args)
         elif action == "direct_upload_pixeldrain":
-            args = (request.form.get("direct_url"), progress_queue)
-            start_task(upload_file_directly_to_pixeldrain, args)
+            for direct_url in direct_urls():
+                args = (direct_url, progress_queue)
+                start_task(upload_file_directly_to_pixeldrain, args)
         elif action == "manual_merge":
             args = (request.form.get("manual_url"),
                     request.form.get("manual_video_id"),
@@ -3990,8 +2689,10 @@ def index_post():
                     request.form.get("upload_4stream") == "true",
                     request.form.get("upload_gofile") == "true")
             start_task(manual_merge_worker, args)
-        pass  # current_tab set earlier
-    return render_template_string(TEMPLATE, **form_data)
+        if is_async_submit():
+            # Jobs are queued; the page follows them over /progress
+            return jsonify({"job_ids": g.job_ids}), 202
+    return render_index(**form_data)
 
 
 # YouTube Download Routes (without cookies)
@@ -4013,8 +2714,10 @@ def youtube_download():
     }
 
     if action == "yt_fetch":
-        formats_string, video_formats, audio_formats = fetch_formats_no_cookies(
-            yt_url)
+        if request.values.get("refresh"):
+            forget_format_info(yt_url)
+        formats_string, video_formats, audio_formats = fetch_formats(
+            yt_url, use_cookies=False)
         if formats_string:
             form_data.update({
                 "yt_formats":
@@ -4024,7 +2727,7 @@ def youtube_download():
                 "yt_audio_formats":
                 audio_formats,
                 "yt_original_name":
-                get_original_filename_no_cookies(yt_url),
+                get_original_filename(yt_url, use_cookies=False),
                 "yt_codec":
                 request.form.get("yt_codec", "none"),
                 "yt_pass_mode":
@@ -4037,7 +2740,7 @@ def youtube_download():
                 request.form.get("yt_audio_bitrate", "96")
             })
             flash("✅ YouTube formats fetched successfully!", "success")
-        return render_template_string(TEMPLATE, **form_data)
+        return render_index(**form_data)
 
     if action == "yt_download":
         form_data["yt_download_started"] = True
@@ -4045,8 +2748,8 @@ def youtube_download():
         form_data["current_tab"] = "youtube"
         is_muxed = False
         try:
-            _, vformats, aformats = fetch_formats_no_cookies(
-                request.form.get("yt_url"))
+            _, vformats, aformats = fetch_formats(
+                request.form.get("yt_url"), use_cookies=False)
             selected_video_format = next(
                 (f for f in vformats
                  if f['id'] == request.form.get("yt_video_id")), None)
@@ -4097,27 +2800,62 @@ def youtube_download():
                                  "1"), request.form.get("yt_tiles", "2x2"),
                 request.form.get("yt_enable_vmaf") == "true", False)
         start_task(download_and_convert, args)
-        return render_template_string(TEMPLATE, **form_data)
+        if is_async_submit():
+            return jsonify({"job_ids": g.job_ids}), 202
+        return render_index(**form_data)
 
-    return render_template_string(TEMPLATE, **form_data)
+    return render_index(**form_data)
 
 
 @app.route("/progress")
 def progress_stream():
 
+    last_event_id = request.headers.get("Last-Event-ID", "")
+    last_event_id = int(last_event_id) if last_event_id.isdigit() else None
+
     def generate():
-        while True:
-            try:
-                msg = progress_queue.get(timeout=30)
-                yield f"data: {json.dumps(msg)}\n\n"
-                if msg.get("log") == "DONE" or "error" in msg:
-                    break
-            except queue.Empty:
-                break
-            except GeneratorExit:
-                break
+        sub = progress_queue.subscribe(last_event_id)
+        try:
+            while True:
+                try:
+                    # Runs until the browser disconnects: the bus carries
+                    # every job, so one job's DONE doesn't end the stream
+                    yield sub.get(timeout=SSE_KEEPALIVE_INTERVAL)
+                except queue.Empty:
+                    # Idle: the thread sleeps in get() rather than polling;
+                    # a comment line keeps proxies from closing the stream
+                    yield b": keepalive\n\n"
+        finally:
+            progress_queue.unsubscribe(sub)
 
-    return Response(generate(), mimetype="text/event-stream")
+    def gzipped(frames):
+        # Sync-flush after every frame so each event reaches the browser
+        # immediately; the repeated keys/stage text compress very well
+        z = zlib.compressobj(6, zlib.DEFLATED, 31)
+        try:
+            for frame in frames:
+                yield z.compress(frame) + z.flush(zlib.Z_SYNC_FLUSH)
+            yield z.flush()
+        finally:
+            frames.close()
+
+    if "gzip" not in request.headers.get("Accept-Encoding", ""):
+        return Response(generate(), mimetype="text/event-stream")
+    response = Response(gzipped(generate()), mimetype="text/event-stream")
+    response.headers["Content-Encoding"] = "gzip"
+    response.headers["Vary"] = "Accept-Encoding"
+    return response
+
+
+@app.route("/progress/status")
+def progress_status():
+    """Cheap check the page makes before opening the /progress stream."""
+    job_ids = request_job_ids()
+    with _running_processes_lock:
+        active = bool(active_jobs & job_ids if job_ids else active_jobs)
+    response = jsonify({"active": active})
+    response.headers["Cache-Control"] = "private, max-age=2"
+    return response
 
 
 @app.route("/upload_direct", methods=["POST"])
@@ -4134,10 +2872,10 @@ def upload_direct():
         file.save(save_path)
         args = (save_path, os.path.basename(save_path), progress_queue)
         start_task(upload_to_pixeldrain, args)
-        return render_template_string(FILE_OPERATION_TEMPLATE,
-                                      operation_title=f"Uploading: {filename}",
-                                      download_started=True,
-                                      current_path='')
+        return render_template("file_operation.html",
+                               operation_title=f"Uploading: {filename}",
+                               download_started=True,
+                               current_path='')
     flash("No file selected", "error")
     return redirect(url_for('index'))
 
@@ -4197,6 +2935,42 @@ def upload_folder():
     return redirect(url_for('list_files', current_path=current_path))
 
 
+# Changes on every start, so pages cached against an older process's
+# templates and static versions are re-rendered
+RENDER_ETAG_SEED = uuid.uuid4().hex
+
+
+def render_with_etag(template_name, **context):
+    """Render a page that depends only on its context, answering 304 when
+    the browser's copy was rendered from the same context. Pages with
+    pending flash messages are always rendered (and the flashes shown)."""
+    if session.get('_flashes'):
+        return render_template(template_name, **context)
+    key = json.dumps([RENDER_ETAG_SEED, template_name, context,
+                      bool(session.get('task_active')),
+                      session.get('job_ids')],
+                     sort_keys=True, default=str)
+    etag = hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+    # The browser may hold either encoding; answer with the tag it sent
+    matched = next((tag for tag in (etag, etag + GZIP_ETAG_SUFFIX)
+                    if request.if_none_match.contains(tag)), None)
+    if matched:
+        response = Response(status=304)
+        etag = matched
+    else:
+        response = Response(render_template(template_name, **context))
+    response.set_etag(etag)
+    response.vary.add("Accept-Encoding")
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+
+def path_url_prefix(endpoint, arg):
+    """URL of a route ending in <path:arg>, without the path."""
+    return url_for(endpoint, **{arg: "_"})[:-1]
+
+
 @app.route("/files/")
 @app.route("/files/<path:current_path>")
 @login_required
@@ -4240,16 +3014,18 @@ def list_files(current_path=""):
     try:
         for entry in os.scandir(browse_folder):
             relative_path = os.path.relpath(entry.path, DOWNLOAD_FOLDER)
+            is_folder = entry.is_dir()
+            st = entry.stat()
             item_info = {
                 'name': entry.name,
                 'path': relative_path,
-                'is_folder': entry.is_dir(),
-                'mtime': entry.stat().st_mtime
+                'is_folder': is_folder,
+                'mtime': st.st_mtime
             }
-            if entry.is_dir():
+            if is_folder:
                 item_info['size'], item_info['is_media'] = '-', False
             else:
-                item_info['size'] = human_size(entry.stat().st_size)
+                item_info['size'] = get_file_size(entry.path, st)
                 item_info['is_media'] = is_media_file(entry.path)
             all_items.append(item_info)
     except NotADirectoryError:
@@ -4277,860 +3053,24 @@ def list_files(current_path=""):
     total_files_size_human = human_size(total_files_size)
     available_space_human = human_size(available_space)
 
-    return render_template_string(
-        """
-<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Downloaded Files</title>
-    <style>
-        * { margin: 0; padding: 0; box-sizing: border-box; }
-        body { font-family: 'Segoe UI', 'Roboto', sans-serif; line-height: 1.6; background: #f8f9fa; color: #1a1a1a; min-height: 100vh; padding: 15px; }
-        .container { max-width: 1200px; margin: 0 auto; background: white; padding: 20px; border-radius: 12px; box-shadow: 0 2px 8px rgba(0,0,0,0.06); border: 1px solid #e8e8e8; }
-        h1 { font-size: 26px; font-weight: 700; color: #1a1a1a; margin-bottom: 10px; }
-        h3 { font-size: 15px; font-weight: 600; color: #3a3a3a; margin-bottom: 10px; }
-        table { width: 100%; border-collapse: collapse; margin-top: 18px; font-size: 13px; }
-        th, td { padding: 12px 10px; text-align: left; border-bottom: 1px solid #e0e0e0; }
-        th { background-color: #f5f5f5; font-weight: 600; color: #2c2c2c; font-size: 12px; }
-        tr:hover { background-color: #fafbff; }
-        .file-name-cell { max-width: 400px; word-wrap: break-word; overflow-wrap: break-word; white-space: normal; }
-        a { color: #0066cc; text-decoration: none; margin-right: 4px; font-weight: 600; transition: color 0.2s ease; font-size: 12px; }
-        a:hover { color: #0052a3; }
-        button { background-color: #0066cc; color: white; padding: 7px 12px; border: none; border-radius: 6px; cursor: pointer; margin-right: 4px; font-size: 11px; font-weight: 600; transition: all 0.2s ease; }
-        button:hover { background-color: #0052a3; transform: translateY(-1px); box-shadow: 0 2px 6px rgba(0, 102, 204, 0.2); }
-        button.delete { background-color: #dc3545; }
-        button.delete:hover { background-color: #c82333; box-shadow: 0 2px 6px rgba(220, 53, 69, 0.2); }
-        button.upload { background-color: #28a745; }
-        button.upload:hover { background-color: #218838; box-shadow: 0 2px 6px rgba(40, 167, 69, 0.2); }
-        button.encode { background-color: #007bff; }
-        button.encode:hover { background-color: #0056b3; box-shadow: 0 2px 6px rgba(0, 123, 255, 0.2); }
-        button.rename { background-color: #ffc107; color: #000; }
-        button.rename:hover { background-color: #e0a800; box-shadow: 0 2px 6px rgba(255, 193, 7, 0.2); }
-        button.info { background-color: #0dcaf0; color: #000; }
-        button.info:hover { background-color: #0cb9d7; box-shadow: 0 2px 6px rgba(13, 202, 240, 0.2); }
-        button:disabled { background-color: #6c757d; cursor: not-allowed; }
-        .actions { font-size: 11px; display: flex; flex-wrap: wrap; gap: 4px; min-width: 250px; }
-        .modal { display: none; position: fixed; z-index: 1000; left: 0; top: 0; width: 100%; height: 100%; background-color: rgba(0,0,0,0.5); overflow-y: auto; }
-        .modal-content { background-color: white; margin: 20px auto; padding: 25px; border-radius: 12px; width: 90%; max-width: 700px; box-shadow: 0 10px 40px rgba(0,0,0,0.2); border: 1px solid #e8e8e8; }
-        .modal-content h3 { margin-bottom: 18px; font-size: 15px; }
-        .modal-content input { width: 100%; padding: 9px 11px; margin: 10px 0; border: 1px solid #d0d0d0; border-radius: 6px; font-size: 13px; transition: all 0.2s ease; }
-        .modal-content input:focus { outline: none; border-color: #0066cc; box-shadow: 0 0 0 2px rgba(0, 102, 204, 0.1); }
-        .modal-content pre { background-color: #f4f4f4; font-family: 'Courier New', monospace; padding: 10px; border-radius: 6px; border: 1px solid #e0e0e0; color: #222; font-size: 11px; }
-        .modal-content button { margin-top: 12px; margin-right: 8px; padding: 8px 14px; font-size: 11px; }
-        .flash-msg { padding: 12px; border-radius: 6px; margin-bottom: 15px; font-weight: 600; border-left: 4px solid; font-size: 13px; }
-        .flash-success { background-color: #d4edda; color: #155724; border-left-color: #28a745; }
-        .flash-error { background-color: #f8d7da; color: #721c24; border-left-color: #dc3545; }
-        a.trim { background-color: #6f42c1; color: white; padding: 7px 12px; border-radius: 6px; text-decoration: none; font-weight: 600; font-size: 11px; transition: all 0.2s ease; display: inline-block; }
-        a.trim:hover { background-color: #5a32a3; transform: translateY(-1px); box-shadow: 0 2px 6px rgba(111, 66, 193, 0.2); }
-        .breadcrumbs { margin-bottom: 15px; font-size: 12px; padding: 10px; background: #f5f5f5; border-radius: 6px; }
-        .breadcrumbs a { margin: 0 6px; font-size: 12px; }
-        .upload-section { border: 1px solid #e0e0e0; padding: 15px; border-radius: 12px; margin-top: 20px; margin-bottom: 20px; background: #f9fafb; }
-        .upload-section input[type="file"] { padding: 7px; margin-right: 8px; font-size: 12px; }
-        .upload-section button { font-size: 12px; padding: 8px 14px; }
-        #drag-drop-zone { border: 2px dashed #0066cc; border-radius: 8px; padding: 20px; text-align: center; cursor: pointer; margin-top: 15px; background-color: #f0f7ff; transition: all 0.3s ease; }
-        #drag-drop-zone:hover { background-color: #e6f0ff; border-color: #0052a3; }
-        #drag-drop-zone.drag-over { background-color: #0066cc; color: white; border-color: #0052a3; }
-        #drag-drop-zone p { margin: 10px 0; color: #666; font-size: 13px; }
-        #drag-drop-zone.drag-over p { color: white; }
-        .file-row { cursor: grab; }
-        .file-row:active { cursor: grabbing; }
-        @media (max-width: 768px) {
-            body { padding: 10px; }
-            .container { padding: 15px; }
-            h1 { font-size: 20px; }
-            h3 { font-size: 13px; }
-            table { font-size: 11px; }
-            th, td { padding: 10px 8px; font-size: 11px; }
-            button { padding: 6px 10px; font-size: 10px; margin-right: 3px; }
-            a { font-size: 11px; }
-            a.trim { padding: 6px 10px; font-size: 10px; }
-            .actions { font-size: 10px; }
-            .modal-content { padding: 20px; margin: 15px auto; }
-            .breadcrumbs { font-size: 11px; padding: 8px; }
-            .upload-section { padding: 12px; margin-top: 15px; margin-bottom: 15px; }
-        }
-        @media (max-width: 480px) {
-            body { padding: 8px; }
-            .container { padding: 12px; }
-            h1 { font-size: 18px; }
-            h3 { font-size: 12px; }
-            table { display: block; width: 100%; border: none; }
-            thead { display: none; }
-            tbody { display: block; }
-            tr { display: block; margin-bottom: 12px; border: 1px solid #ddd; border-radius: 8px; overflow: hidden; background: #fafbff; box-shadow: 0 2px 4px rgba(0,0,0,0.05); }
-            td { display: block; width: 100%; padding: 8px 10px !important; border: none; font-size: 12px; text-align: left; word-break: break-word; }
-            td[style*="width:30px"] { display: none; }
-            td:before { content: attr(data-label); font-weight: 700; color: #0066cc; display: block; margin-bottom: 4px; font-size: 11px; text-transform: uppercase; }
-            tr td:last-child { border-bottom: none; }
-            button { padding: 6px 8px; font-size: 10px; margin: 3px 3px 3px 0; flex-shrink: 0; }
-            a { font-size: 11px; margin-right: 3px; }
-            a.trim { padding: 6px 8px; font-size: 10px; }
-            .actions { font-size: 11px; flex-wrap: wrap; }
-            .modal-content { padding: 15px; margin: 10px auto; }
-            .breadcrumbs { font-size: 10px; padding: 6px; }
-            .upload-section { padding: 10px; margin-top: 12px; margin-bottom: 12px; }
-            .upload-section input[type="file"] { margin-right: 5px; font-size: 11px; }
-        }
-    </style>
-</head>
-<body>
-<div class="container">
-    <h1>Downloaded Files</h1>
-    <p>
-        <a href="{{ url_for('index') }}">← Back to Downloader</a> | 
-        <a href="{{ url_for('gofile_manager') }}" style="color: #9b59b6; font-weight: bold;">📊 Gofile Manager</a>
-    </p>
-
-    {% with messages = get_flashed_messages(with_categories=true) %}
-        {% for category, message in messages %}
-            <div class="flash-msg flash-{{ category }}">{{ message|safe }}</div>
-        {% endfor %}
-    {% endwith %}
-
-    <div class="breadcrumbs">
-        <a href="{{ url_for('list_files', current_path='') }}">Home</a>
-        {% for crumb in breadcrumbs %}
-            / <a href="{{ url_for('list_files', current_path=crumb.path) }}">{{ crumb.name }}</a>
-        {% endfor %}
-        <div style="float: right; display: flex; gap: 10px; align-items: center;">
-            <label for="sort-select" style="margin: 0; font-weight: 600; font-size: 12px;">Sort by:</label>
-            <select id="sort-select" onchange="changeSortOrder(this.value)" style="padding: 6px 10px; border: 1px solid #d0d0d0; border-radius: 6px; font-size: 12px; cursor: pointer;">
-                <option value="newest" {% if request.args.get('sort', 'newest') == 'newest' %}selected{% endif %}>📅 Newest First</option>
-                <option value="name_asc" {% if request.args.get('sort') == 'name_asc' %}selected{% endif %}>🔤 A-Z</option>
-                <option value="name_desc" {% if request.args.get('sort') == 'name_desc' %}selected{% endif %}>🔤 Z-A</option>
-            </select>
-        </div>
-    </div>
-    <div style="clear: both;"></div>
-
-    <div style="margin: 15px 0; padding: 12px; background: #e3f2fd; border-left: 4px solid #2196F3; border-radius: 4px; font-size: 13px;">
-        <strong>💾 Storage Info:</strong> Total Files: {{ total_files_size_human }} | Available Space: {{ available_space_human }}
-    </div>
-
-    <div class="upload-section">
-        <h3>Upload to this Folder ({{ current_path or '/' }})</h3>
-        <form method="POST" action="{{ url_for('upload_local') }}" enctype="multipart/form-data" style="display:inline-block; margin-right:20px;">
-            <input type="hidden" name="current_path" value="{{ current_path }}">
-            <input type="file" name="file" required>
-            <button type="submit">Upload File</button>
-        </form>
-        <form method="POST" action="{{ url_for('upload_folder') }}" enctype="multipart/form-data" style="display:inline-block;">
-            <input type="hidden" name="current_path" value="{{ current_path }}">
-            <input type="file" name="files[]" webkitdirectory directory multiple required>
-            <button type="submit">Upload Folder</button>
-        </form>
-        <div id="drag-drop-zone">
-            <p>📁 Or drag and drop files here</p>
-        </div>
-    </div>
-
-    <div id="batch-operations" style="display:none; margin-top:20px; padding:15px; background:#f0f0f0; border-radius:8px;">
-        <strong>Selected: <span id="selected-count">0</span> file(s)</strong>
-        <button onclick="batchDelete()" class="delete" style="margin-left:10px;">Delete Selected</button>
-        <button onclick="showBatchMoveModal()" style="background-color: #6f42c1; color: white; margin-left:5px;">Move Selected</button>
-        <button onclick="showBatchEncodeModal()" class="encode" style="margin-left:5px;">Encode Selected</button>
-    </div>
-
-    <div class="card" style="margin-top:20px;">
-      <div class="card-header">
-        <div class="card-icon blue">🔗</div>
-        <div>
-          <h2 class="card-title">Merge Files</h2>
-          <p class="card-desc">Select files from the list above, then merge</p>
-        </div>
-      </div>
-
-      <button type="button" class="encode" onclick="startMerge()" style="margin-top:10px;">🔗 Merge Selected</button>
-
-      <div id="merge-progress-container" class="progress-container" style="display:none; margin-top:15px; background:#f9f9f9; padding:15px; border-radius:8px; border:1px solid #ddd;">
-        <h3 id="merge-stage">Preparing…</h3>
-        <div class="progress-bar" style="width:100%; height:20px; background:#e0e0e0; border-radius:10px; overflow:hidden;">
-          <div id="merge-bar" class="progress-bar-inner" style="height:100%; width:0%; background:linear-gradient(90deg, #667eea 0%, #764ba2 100%); text-align:center; color:white; font-size:12px; line-height:20px; transition:width 0.4s ease;">0%</div>
-        </div>
-      </div>
-    </div>
-        <button onclick="batchUploadPixeldrain()" class="upload" style="margin-left:5px;">Upload to Pixeldrain</button>
-        <button onclick="batchUploadPixeldrainAlt()" class="upload" style="background-color: #3498db; margin-left:5px;">Upload to Pixeldrain 2</button>
-        <button onclick="batchUpload4stream()" style="background-color: #e74c3c; margin-left:5px;">Upload to 4stream</button>
-        <button onclick="batchUpload4streamAlt()" style="background-color: #ff6b6b; margin-left:5px;">Upload to 4stream 2</button>
-        <button onclick="batchUploadGofile()" style="background-color: #9b59b6; margin-left:5px;">Upload to Gofile</button>
-        <button onclick="batchDownload()" style="margin-left:5px;">Download Selected (ZIP)</button>
-        <button onclick="clearSelection()" style="margin-left:5px;">Clear Selection</button>
-    </div>
-
-    <table>
-    <thead><tr><th style="width:30px;"><input type="checkbox" id="select-all" onchange="toggleSelectAll(this)"></th><th>Name</th><th>Size</th><th>Actions</th></tr></thead>
-    <tbody>
-        {% if current_path %}
-            <tr><td style="width:30px;"></td><td><a href="{{ url_for('list_files', current_path=parent_dir) }}">⬆️ Parent Directory</a></td><td>-</td><td></td></tr>
-        {% endif %}
-        {% for item in items %}
-        <tr draggable="true" class="file-row" data-filepath="{{ item.path }}" data-is-media="{{ item.is_media|lower }}">
-            <td style="width:30px;">{% if not item.is_folder %}<input type="checkbox" class="file-checkbox" value="{{ item.path }}" onchange="updateSelection()">{% endif %}</td>
-                <td class="file-name file-name-cell" data-filename="{{ item.path }}">
-                {% if item.is_folder %}
-                    <a href="{{ url_for('list_files', current_path=item.path) }}">📁 <strong>{{ item.name }}</strong></a>
-                {% else %}
-                    📄 {{ item.name }}
-                {% endif %}
-            </td>
-            <td>{{ item.size }}</td>
-            <td class="actions">
-                {% if not item.is_folder %}<a href="{{ url_for('download_file', filepath=item.path) }}">Download</a>{% endif %}
-                <button onclick="showRenameModal('{{ item.path }}', '{{ item.name }}')" class="rename">Rename</button>
-                <button onclick="showMoveModal('{{ item.path }}', '{{ item.name }}')" style="background-color: #6f42c1; color: white; padding: 7px 12px; border: none; border-radius: 6px; cursor: pointer; font-size: 11px; font-weight: 600;">Move</button>
-                {% if not item.is_folder %}
-                    <form method="POST" action="{{ url_for('upload_to_pixeldrain_file') }}" style="display:inline;"><input type="hidden" name="filepath" value="{{ item.path }}"><button type="submit" class="upload">Upload</button></form>
-                    <form method="POST" action="{{ url_for('upload_to_pixeldrain_file_alt') }}" style="display:inline;"><input type="hidden" name="filepath" value="{{ item.path }}"><button type="submit" class="upload" style="background-color: #3498db;">💾 Pixeldrain 2</button></form>
-                    <form method="POST" action="{{ url_for('upload_to_4stream_file') }}" style="display:inline;"><input type="hidden" name="filepath" value="{{ item.path }}"><button type="submit" style="background-color: #e74c3c;">🎬 4stream</button></form>
-                    <form method="POST" action="{{ url_for('upload_to_4stream_file_alt') }}" style="display:inline;"><input type="hidden" name="filepath" value="{{ item.path }}"><button type="submit" style="background-color: #ff6b6b;">🎬 4stream 2</button></form>
-                    <form method="POST" action="{{ url_for('upload_to_gofile_file') }}" style="display:inline;"><input type="hidden" name="filepath" value="{{ item.path }}"><button type="submit" style="background-color: #9b59b6;">📤 Gofile</button></form>
-                    {% if item.is_media %}
-                        <a href="{{ url_for('encode_page', filepath=item.path) }}" class="encode">Encode</a>
-                        <a href="{{ url_for('trim_page', filepath=item.path) }}" class="trim">Trim</a>
-                        <button type="button" onclick="showInfoModal('{{ item.path }}')" class="info">Info</button>
-                    {% endif %}
-                {% endif %}
-                <button type="button" class="delete" onclick="showDeleteModal('{{ item.path }}', '{{ item.name }}')">Delete</button>
-            </td>
-        </tr>
-        {% endfor %}
-        {% if not items %}<tr><td colspan="3">{% if current_path %}This folder is empty.{% else %}No files downloaded yet.{% endif %}</td></tr>{% endif %}
-    </tbody>
-    </table>
-</div>
-
-<div id="renameModal" class="modal"><div class="modal-content">
-    <h3>Rename File or Folder</h3>
-    <p>Current name: <strong id="currentName"></strong></p>
-    <label>New name (within same folder):</label>
-    <input type="text" id="newName" placeholder="Enter new name">
-    <button onclick="confirmRename()">Rename</button><button onclick="closeRenameModal()">Cancel</button>
-</div></div>
-<div id="moveModal" class="modal"><div class="modal-content">
-    <h3>Move File or Folder</h3>
-    <p>Moving: <strong id="moveFileName"></strong></p>
-    <label>Select destination folder:</label>
-    <select id="moveDestFolder" style="width: 100%; padding: 8px; margin: 10px 0; border: 1px solid #d0d0d0; border-radius: 6px;">
-        <option value="/">📁 Home</option>
-    </select>
-    <button onclick="confirmMove()">Move</button><button onclick="closeMoveModal()">Cancel</button>
-</div></div>
-<div id="batchMoveModal" class="modal"><div class="modal-content">
-    <h3>Move Selected Files</h3>
-    <p>Moving <strong id="batchMoveCount">0</strong> file(s)</p>
-    <label>Select destination folder:</label>
-    <select id="batchMoveDestFolder" style="width: 100%; padding: 8px; margin: 10px 0; border: 1px solid #d0d0d0; border-radius: 6px;">
-        <option value="/">📁 Home</option>
-    </select>
-    <button onclick="confirmBatchMove()">Move</button><button onclick="closeBatchMoveModal()">Cancel</button>
-</div></div>
-<div id="infoModal" class="modal"><div class="modal-content">
-    <h3>Media Information</h3>
-    <p><strong>File:</strong> <span id="infoFilename"></span></p>
-    <pre id="infoContent"></pre>
-    <button type="button" onclick="closeInfoModal()">Close</button>
-</div></div>
-<div id="deleteModal" class="modal"><div class="modal-content">
-    <h3>⚠️ Confirm Delete</h3>
-    <p>Are you sure you want to delete <strong id="deleteFileName"></strong>?</p>
-    <p style="color: #999; font-size: 12px;">This action cannot be undone.</p>
-    <button onclick="confirmDelete()" class="delete" style="background-color: #dc3545;">Delete</button><button onclick="closeDeleteModal()">Cancel</button>
-</div></div>
-
-<div id="batchEncodeModal" class="modal"><div class="modal-content" style="width:700px; max-height:90vh; overflow-y:auto;">
-    <h3>Batch Encode Settings - <span id="batchEncodeFileCount">0</span> file(s)</h3>
-    <form id="batchEncodeForm">
-        <label>Codec:</label><select id="batchCodec" name="codec" required onchange="updateBatchPresetOptions()">
-            <option value="none">No Encoding (Copy)</option>
-            <option value="h265">Encode to H.265 (x265)</option>
-            <option value="av1" selected>Encode to AV1 (SVT-AV1)</option>
-            <option value="h265_copy_audio">H.265 Video Only (Copy Audio)</option>
-            <option value="av1_copy_audio">AV1 Video Only (Copy Audio)</option>
-            <option value="copy_video">Copy Video (Encode Audio Only)</option>
-        </select>
-
-        <div id="batchEncodingOptions" style="display:block;">
-            <div id="batchVideoEncodingOptions">
-                <label>Encoding Mode:</label><select id="batchPassMode" name="pass_mode">
-                    <option value="1-pass" selected>1-pass (CRF)</option>
-                    <option value="2-pass">2-pass (VBR)</option>
-                </select>
-
-                <label>Preset (slower = better quality/smaller file):</label><select id="batchPreset" name="preset"></select>
-
-                <label>Video Bitrate (kb/s, optional):</label><input type="number" id="batchBitrate" name="bitrate" min="100" placeholder="e.g., 600 for AV1, 2000 for H.265">
-
-                <label>CRF (0–63, lower = better quality):</label><input type="number" id="batchCrf" name="crf" value="45" min="0" max="63" step="1" placeholder="e.g., 28 for H.265, 24 for AV1">
-
-                <label>Frame Rate (optional):</label><select name="fps">
-                    <option value="">Original</option><option value="24">24 fps</option><option value="30">30 fps</option><option value="60">60 fps</option>
-                </select>
-
-                <label>Resolution (Scale, optional):</label><select name="scale">
-                    <option value="">Original</option><option value="1920:-2">1080p (1920px wide)</option><option value="1280:-2">720p (1280px wide)</option><option value="854:-2">480p (854px wide)</option><option value="640:-2">360p (640px wide)</option>
-                </select>
-
-                <label>Adaptive Quantization Mode (AV1 only):</label><select id="batchAqMode" name="aq_mode">
-                    <option value="0">Disabled</option><option value="1">PSNR-based</option><option value="2" selected>Variance-based</option>
-                </select>
-
-                <label>Variance Boost (AV1 only, 0–3):</label><input type="number" id="batchVarianceBoost" name="variance_boost" value="2" min="0" max="3" step="1">
-
-                <label>Tiles (AV1 only):</label><select id="batchTiles" name="tiles">
-                    <option value="">None</option><option value="2x2" selected>2x2 (Recommended for 720p)</option><option value="4x4">4x4</option>
-                </select>
-
-                <label><input type="checkbox" id="batchEnableVmaf" name="enable_vmaf"> Compute VMAF Quality Score (slower)</label>
-            </div>
-
-            <div id="batchAudioEncodingOptions">
-                <label>Audio Bitrate (kb/s):</label><input type="number" id="batchAudioBitrate" name="audio_bitrate" value="32" min="32" max="512" step="8" placeholder="e.g., 64, 96, 128">
-
-                <label><input type="checkbox" name="force_stereo"> Force Stereo (2-channel) Audio</label>
-            </div>
-        </div>
-
-        <label><input type="checkbox" id="batchUploadPixeldrain" name="upload_pixeldrain"> Upload to Pixeldrain after encoding</label>
-
-        <div style="margin-top:20px;">
-            <button type="button" onclick="startBatchEncode()" class="encode">Start Batch Encoding</button>
-            <button type="button" onclick="closeBatchEncodeModal()" style="background:#ccc; color:#000;">Cancel</button>
-        </div>
-    </form>
-
-    <script>
-        function updateBatchPresetOptions() {
-            const codec = document.getElementById('batchCodec').value;
-            const presetSelect = document.getElementById('batchPreset');
-            const crfInput = document.getElementById('batchCrf');
-            const videoOpts = document.getElementById('batchVideoEncodingOptions');
-            const audioOpts = document.getElementById('batchAudioEncodingOptions');
-            const aqMode = document.getElementById('batchAqMode');
-            const varianceBoost = document.getElementById('batchVarianceBoost');
-            const tiles = document.getElementById('batchTiles');
-
-            if (codec === 'copy_video') {
-                videoOpts.style.display = 'none';
-                audioOpts.style.display = 'block';
-            } else if (codec.endsWith('_copy_audio')) {
-                videoOpts.style.display = 'block';
-                audioOpts.style.display = 'none';
-            } else if (codec !== 'none') {
-                videoOpts.style.display = 'block';
-                audioOpts.style.display = 'block';
-            } else {
-                videoOpts.style.display = 'none';
-                audioOpts.style.display = 'none';
-            }
-
-            presetSelect.innerHTML = '';
-            if (codec === 'av1' || codec === 'av1_copy_audio') {
-                for (let p = 0; p <= 13; p++) {
-                    let label = p.toString();
-                    if (p === 0) label += ' (slowest)'; else if (p === 13) label += ' (fastest)'; else if (p > 7) label += ' (fast)'; else label += ' (medium)';
-                    const opt = document.createElement('option');
-                    opt.value = p; opt.text = label;
-                    if (p === 7) opt.selected = true;
-                    presetSelect.appendChild(opt);
-                }
-                crfInput.value = crfInput.value || '24'; crfInput.placeholder = 'e.g., 24 for AV1';
-                aqMode.disabled = false; varianceBoost.disabled = false; tiles.disabled = false;
-            } else if (codec === 'h265' || codec === 'h265_copy_audio') {
-                const presets = ['ultrafast', 'superfast', 'veryfast', 'faster', 'fast', 'medium', 'slow', 'slower', 'veryslow', 'placebo'];
-                presets.forEach(p => {
-                    const opt = document.createElement('option');
-                    opt.value = p; opt.text = p;
-                    if (p === 'faster') opt.selected = true;
-                    presetSelect.appendChild(opt);
-                });
-                crfInput.value = crfInput.value || '28'; crfInput.placeholder = 'e.g., 28 for H.265';
-                aqMode.disabled = true; varianceBoost.disabled = true; tiles.disabled = true;
-            } else {
-                aqMode.disabled = true; varianceBoost.disabled = true; tiles.disabled = true;
-            }
-        }
-        updateBatchPresetOptions();
-    </script>
-</div></div>
-
-<script>
-    function getSelectedFilesForMerge() {
-      const selected = [];
-
-      document.querySelectorAll(".file-row").forEach(row => {
-        const cb = row.querySelector("input[type='checkbox']");
-        if (cb && cb.checked) {
-          const name = row.querySelector("[data-filename]")?.dataset.filename;
-          if (name) selected.push(name);
-        }
-      });
-
-      return selected;
-    }
-
-    function startMerge(e) {
-      if (e) e.preventDefault();
-
-      const selected = getSelectedFilesForMerge();
-      console.log("Merge selected:", selected);
-
-      if (selected.length < 2) {
-        alert("Select at least 2 files");
-        return;
-      }
-
-      const output = prompt("Output filename:", "merged.mkv");
-      if (!output) return;
-
-      fetch("/merge_files", {
-        method: "POST",
-        headers: {"Content-Type": "application/json"},
-        body: JSON.stringify({
-          files: selected,
-          output: output
-        })
-      });
-
-      document.getElementById("merge-progress-container").style.display = "block";
-      listenMergeProgress();
+    # Row links and form actions, built once rather than per item; the
+    # per-item ones are prefixes the template appends the item path to
+    urls = {
+        'files': url_for('list_files'),
+        'download': path_url_prefix('download_file', 'filepath'),
+        'encode': path_url_prefix('encode_page', 'filepath'),
+        'trim': path_url_prefix('trim_page', 'filepath'),
+        'pixeldrain': url_for('upload_to_pixeldrain_file'),
+        'pixeldrain_alt': url_for('upload_to_pixeldrain_file_alt'),
+        'fourstream': url_for('upload_to_4stream_file'),
+        'fourstream_alt': url_for('upload_to_4stream_file_alt'),
+        'gofile': url_for('upload_to_gofile_file'),
     }
 
-    function listenMergeProgress() {
-      const es = new EventSource("/progress");
-      const bar = document.getElementById("merge-bar");
-      const stage = document.getElementById("merge-stage");
-
-      es.onmessage = e => {
-        const data = JSON.parse(e.data);
-        if (data.percent) {
-          bar.style.width = data.percent + "%";
-          bar.textContent = data.percent.toFixed(1) + "%";
-        }
-        if (data.stage) stage.textContent = data.stage;
-        if (data.log === "DONE") {
-          stage.textContent = "✅ Merge Complete";
-          es.close();
-          setTimeout(() => location.reload(), 2000);
-        }
-      };
-    }
-
-    let currentFile = '';
-    function showRenameModal(filepath, currentName) {
-        currentFile = filepath;
-        document.getElementById('currentName').textContent = currentName;
-        document.getElementById('newName').value = currentName;
-        document.getElementById('renameModal').style.display = 'block';
-        document.getElementById('newName').focus();
-    }
-    function closeRenameModal() { document.getElementById('renameModal').style.display = 'none'; }
-    function confirmRename() {
-        const newName = document.getElementById('newName').value.trim();
-        if (newName && newName !== currentFile.split('/').pop()) {
-            const form = document.createElement('form'); form.method = 'POST'; form.action = '{{ url_for("rename_file") }}';
-            const oldInput = document.createElement('input'); oldInput.type = 'hidden'; oldInput.name = 'old_name'; oldInput.value = currentFile;
-            const newInput = document.createElement('input'); newInput.type = 'hidden'; newInput.name = 'new_name'; newInput.value = newName;
-            form.append(oldInput, newInput); document.body.appendChild(form); form.submit();
-        }
-        closeRenameModal();
-    }
-    function showInfoModal(filepath) {
-        const modal = document.getElementById('infoModal');
-        const content = document.getElementById('infoContent');
-        const filename = document.getElementById('infoFilename');
-        filename.textContent = filepath.split('/').pop();
-        content.textContent = 'Fetching info...';
-        modal.style.display = 'block';
-        const safePath = filepath.split('/').map(encodeURIComponent).join('/');
-        fetch(`/info/${safePath}`)
-            .then(response => { if (!response.ok) { throw new Error('Network response not ok'); } return response.json(); })
-            .then(data => {
-                if (data.error) { content.textContent = `Error: ${data.error}`; return; }
-                let infoText = `File Size:      ${data.file_size || 'N/A'}\\n`
-                             + `Duration:       ${data.duration || 'N/A'}\\n\\n`
-                             + `Resolution:     ${data.resolution || 'N/A'}\\n`
-                             + `Video Codec:    ${data.video_codec || 'N/A'}\\n`
-                             + `Frame Rate:     ${data.video_fps || 'N/A'} fps\\n`
-                             + `Video Bitrate:  ${data.video_bitrate || 'N/A'}\\n`
-                             + `Stream Size:    ${data.video_stream_size || 'N/A'}\\n\\n`
-                             + `Audio Codec:    ${data.audio_codec || 'N/A'}\\n`
-                             + `Audio Bitrate:  ${data.audio_bitrate || 'N/A'}\\n`
-                             + `Stream Size:    ${data.audio_stream_size || 'N/A'}`;
-                content.textContent = infoText;
-            })
-            .catch(error => { content.textContent = 'Failed to fetch media information.'; });
-    }
-    function closeInfoModal() { document.getElementById('infoModal').style.display = 'none'; }
-
-    let currentMoveFile = '';
-    function showMoveModal(filepath, fileName) {
-        currentMoveFile = filepath;
-        document.getElementById('moveFileName').textContent = fileName;
-        document.getElementById('moveModal').style.display = 'block';
-        populateFolderSelect('moveDestFolder');
-    }
-    function closeMoveModal() { document.getElementById('moveModal').style.display = 'none'; }
-    function confirmMove() {
-        const destFolder = document.getElementById('moveDestFolder').value;
-        const form = document.createElement('form');
-        form.method = 'POST';
-        form.action = '{{ url_for("move_file") }}';
-        const filepathInput = document.createElement('input');
-        filepathInput.type = 'hidden';
-        filepathInput.name = 'filepath';
-        filepathInput.value = currentMoveFile;
-        const destInput = document.createElement('input');
-        destInput.type = 'hidden';
-        destInput.name = 'dest_folder';
-        destInput.value = destFolder;
-        form.append(filepathInput, destInput);
-        document.body.appendChild(form);
-        form.submit();
-        closeMoveModal();
-    }
-
-    function showBatchMoveModal() {
-        const files = getSelectedFiles();
-        if (files.length === 0) { alert('No files selected'); return; }
-        document.getElementById('batchMoveCount').textContent = files.length;
-        document.getElementById('batchMoveModal').style.display = 'block';
-        populateFolderSelect('batchMoveDestFolder');
-        window.batchMoveFiles = files;
-    }
-    function closeBatchMoveModal() { document.getElementById('batchMoveModal').style.display = 'none'; }
-    function confirmBatchMove() {
-        const destFolder = document.getElementById('batchMoveDestFolder').value;
-        const form = document.createElement('form');
-        form.method = 'POST';
-        form.action = '{{ url_for("batch_move") }}';
-        window.batchMoveFiles.forEach(file => {
-            const input = document.createElement('input');
-            input.type = 'hidden';
-            input.name = 'files[]';
-            input.value = file;
-            form.appendChild(input);
-        });
-        const destInput = document.createElement('input');
-        destInput.type = 'hidden';
-        destInput.name = 'dest_folder';
-        destInput.value = destFolder;
-        form.appendChild(destInput);
-        document.body.appendChild(form);
-        form.submit();
-        closeBatchMoveModal();
-    }
-
-    function populateFolderSelect(selectId) {
-        const select = document.getElementById(selectId);
-        fetch('/get_folders')
-            .then(response => response.json())
-            .then(folders => {
-                select.innerHTML = '<option value="/">📁 Home</option>';
-                folders.forEach(folder => {
-                    if (folder !== '/') {
-                        const option = document.createElement('option');
-                        option.value = folder;
-                        option.textContent = '📁 ' + folder;
-                        select.appendChild(option);
-                    }
-                });
-            })
-            .catch(error => console.error('Error fetching folders:', error));
-    }
-
-    let currentDeleteFile = '';
-    function showDeleteModal(filepath, fileName) {
-        currentDeleteFile = filepath;
-        document.getElementById('deleteFileName').textContent = fileName;
-        document.getElementById('deleteModal').style.display = 'block';
-    }
-    function closeDeleteModal() { document.getElementById('deleteModal').style.display = 'none'; }
-    function confirmDelete() {
-        const form = document.createElement('form');
-        form.method = 'POST';
-        form.action = '/delete/' + encodeURIComponent(currentDeleteFile);
-        document.body.appendChild(form);
-        form.submit();
-        closeDeleteModal();
-    }
-
-    // Drag and Drop Upload
-    function setupDragDrop() {
-        const zone = document.getElementById('drag-drop-zone');
-        const currentPath = '{{ current_path }}';
-
-        ['dragenter', 'dragover', 'dragleave', 'drop'].forEach(eventName => {
-            zone.addEventListener(eventName, preventDefaults, false);
-        });
-
-        function preventDefaults(e) {
-            e.preventDefault();
-            e.stopPropagation();
-        }
-
-        ['dragenter', 'dragover'].forEach(eventName => {
-            zone.addEventListener(eventName, () => zone.classList.add('drag-over'));
-        });
-
-        ['dragleave', 'drop'].forEach(eventName => {
-            zone.addEventListener(eventName, () => zone.classList.remove('drag-over'));
-        });
-
-        zone.addEventListener('drop', (e) => {
-            const dt = e.dataTransfer;
-            const files = dt.files;
-            if (files.length > 0) {
-                // Upload files one by one
-                const uploadPromises = [];
-                for (let file of files) {
-                    const fileForm = new FormData();
-                    fileForm.append('current_path', currentPath);
-                    fileForm.append('file', file);
-                    uploadPromises.push(
-                        fetch('{{ url_for("upload_local") }}', {
-                            method: 'POST',
-                            body: fileForm
-                        }).catch(err => console.error('Upload error:', err))
-                    );
-                }
-                // Reload only after ALL files are uploaded
-                Promise.all(uploadPromises).then(() => {
-                    window.location.reload();
-                });
-            }
-        });
-    }
-
-    window.onclick = (event) => {
-        if (event.target == document.getElementById('renameModal')) closeRenameModal();
-        if (event.target == document.getElementById('infoModal')) closeInfoModal();
-        if (event.target == document.getElementById('moveModal')) closeMoveModal();
-        if (event.target == document.getElementById('batchMoveModal')) closeBatchMoveModal();
-        if (event.target == document.getElementById('deleteModal')) closeDeleteModal();
-    };
-
-    // Initialize drag-drop on page load
-    document.addEventListener('DOMContentLoaded', setupDragDrop);
-
-    function toggleSelectAll(checkbox) {
-        document.querySelectorAll('.file-checkbox').forEach(cb => cb.checked = checkbox.checked);
-        updateSelection();
-    }
-
-    function updateSelection() {
-        const checked = document.querySelectorAll('.file-checkbox:checked');
-        const count = checked.length;
-        document.getElementById('selected-count').textContent = count;
-        document.getElementById('batch-operations').style.display = count > 0 ? 'block' : 'none';
-    }
-
-    function getSelectedFiles() {
-        return Array.from(document.querySelectorAll('.file-checkbox:checked')).map(cb => cb.value);
-    }
-
-    function clearSelection() {
-        document.querySelectorAll('.file-checkbox').forEach(cb => cb.checked = false);
-        document.getElementById('select-all').checked = false;
-        updateSelection();
-    }
-
-    function batchDelete() {
-        const files = getSelectedFiles();
-        if (files.length === 0) { alert('No files selected'); return; }
-        if (!confirm(`Delete ${files.length} file(s)? This cannot be undone.`)) return;
-
-        const form = document.createElement('form');
-        form.method = 'POST';
-        form.action = '{{ url_for("batch_delete") }}';
-        files.forEach(file => {
-            const input = document.createElement('input');
-            input.type = 'hidden';
-            input.name = 'files[]';
-            input.value = file;
-            form.appendChild(input);
-        });
-        document.body.appendChild(form);
-        form.submit();
-    }
-
-    function batchDownload() {
-        const files = getSelectedFiles();
-        if (files.length === 0) { alert('No files selected'); return; }
-        window.location.href = '{{ url_for("batch_download") }}?files=' + files.map(encodeURIComponent).join('&files=');
-    }
-
-    function showBatchEncodeModal() {
-        const files = getSelectedFiles();
-        if (files.length === 0) { alert('No files selected'); return; }
-        const mediaFiles = files.filter(f => {
-            const row = document.querySelector(`[data-filepath="${f}"]`);
-            return row && row.dataset.isMedia === 'true';
-        });
-        if (mediaFiles.length === 0) { alert('No media files selected'); return; }
-        document.getElementById('batchEncodeFileCount').textContent = mediaFiles.length;
-        document.getElementById('batchEncodeModal').style.display = 'block';
-        window.batchMediaFiles = mediaFiles;
-    }
-
-    function closeBatchEncodeModal() { 
-        document.getElementById('batchEncodeModal').style.display = 'none'; 
-    }
-
-    function startBatchEncode() {
-        if (!window.batchMediaFiles || window.batchMediaFiles.length === 0) { alert('No files to encode'); return; }
-        const form = document.getElementById('batchEncodeForm');
-        const formData = new FormData(form);
-
-        const params = new URLSearchParams();
-        window.batchMediaFiles.forEach(file => params.append('files[]', file));
-        params.append('codec', formData.get('codec'));
-        params.append('pass_mode', formData.get('pass_mode'));
-        params.append('preset', formData.get('preset'));
-        params.append('bitrate', formData.get('bitrate') || '');
-        params.append('crf', formData.get('crf'));
-        params.append('fps', formData.get('fps') || '');
-        params.append('scale', formData.get('scale') || '');
-        params.append('audio_bitrate', formData.get('audio_bitrate') || '');
-        params.append('force_stereo', formData.get('force_stereo') ? 'true' : 'false');
-        params.append('aq_mode', formData.get('aq_mode') || '1');
-        params.append('variance_boost', formData.get('variance_boost') || '1');
-        params.append('tiles', formData.get('tiles') || '2x2');
-        params.append('enable_vmaf', formData.get('enable_vmaf') ? 'true' : 'false');
-        params.append('upload_pixeldrain', formData.get('upload_pixeldrain') ? 'true' : 'false');
-
-        closeBatchEncodeModal();
-        window.location.href = '{{ url_for("batch_encode") }}?' + params.toString();
-    }
-
-    function batchUploadPixeldrain() {
-        const files = getSelectedFiles();
-        if (files.length === 0) { alert('No files selected'); return; }
-        if (!confirm(`Upload ${files.length} file(s) to Pixeldrain?`)) return;
-
-        const form = document.createElement('form');
-        form.method = 'POST';
-        form.action = '{{ url_for("batch_upload_pixeldrain") }}';
-        files.forEach(file => {
-            const input = document.createElement('input');
-            input.type = 'hidden';
-            input.name = 'files[]';
-            input.value = file;
-            form.appendChild(input);
-        });
-        document.body.appendChild(form);
-        form.submit();
-    }
-
-    function batchUpload4stream() {
-        const files = getSelectedFiles();
-        if (files.length === 0) { alert('No files selected'); return; }
-        if (!confirm(`Upload ${files.length} file(s) to 4stream?`)) return;
-
-        const form = document.createElement('form');
-        form.method = 'POST';
-        form.action = '{{ url_for("batch_upload_4stream") }}';
-        files.forEach(file => {
-            const input = document.createElement('input');
-            input.type = 'hidden';
-            input.name = 'files[]';
-            input.value = file;
-            form.appendChild(input);
-        });
-        document.body.appendChild(form);
-        form.submit();
-    }
-
-    function batchUploadPixeldrainAlt() {
-        const files = getSelectedFiles();
-        if (files.length === 0) { alert('No files selected'); return; }
-        if (!confirm(`Upload ${files.length} file(s) to Pixeldrain 2?`)) return;
-
-        const form = document.createElement('form');
-        form.method = 'POST';
-        form.action = '{{ url_for("batch_upload_pixeldrain_alt") }}';
-        files.forEach(file => {
-            const input = document.createElement('input');
-            input.type = 'hidden';
-            input.name = 'files[]';
-            input.value = file;
-            form.appendChild(input);
-        });
-        document.body.appendChild(form);
-        form.submit();
-    }
-
-    function batchUpload4streamAlt() {
-        const files = getSelectedFiles();
-        if (files.length === 0) { alert('No files selected'); return; }
-        if (!confirm(`Upload ${files.length} file(s) to 4stream 2?`)) return;
-
-        const form = document.createElement('form');
-        form.method = 'POST';
-        form.action = '{{ url_for("batch_upload_4stream_alt") }}';
-        files.forEach(file => {
-            const input = document.createElement('input');
-            input.type = 'hidden';
-            input.name = 'files[]';
-            input.value = file;
-            form.appendChild(input);
-        });
-        document.body.appendChild(form);
-        form.submit();
-    }
-
-    function batchUploadGofile() {
-        const files = getSelectedFiles();
-        if (files.length === 0) { alert('No files selected'); return; }
-        if (!confirm(`Upload ${files.length} file(s) to Gofile?`)) return;
-
-        const form = document.createElement('form');
-        form.method = 'POST';
-        form.action = '{{ url_for("batch_upload_gofile") }}';
-        files.forEach(file => {
-            const input = document.createElement('input');
-            input.type = 'hidden';
-            input.name = 'files[]';
-            input.value = file;
-            form.appendChild(input);
-        });
-        document.body.appendChild(form);
-        form.submit();
-    }
-
-    let draggedRow = null;
-
-    document.addEventListener("dragstart", e => {
-      const row = e.target.closest(".file-row");
-      if (!row) return;
-      draggedRow = row;
-      row.style.opacity = "0.5";
-    });
-
-    document.addEventListener("dragend", e => {
-      if (draggedRow) draggedRow.style.opacity = "";
-      draggedRow = null;
-    });
-
-    document.addEventListener("dragover", e => {
-      e.preventDefault();
-      const row = e.target.closest(".file-row");
-      if (!row || row === draggedRow) return;
-
-      const rect = row.getBoundingClientRect();
-      const after = e.clientY > rect.top + rect.height / 2;
-
-      row.parentNode.insertBefore(
-        draggedRow,
-        after ? row.nextSibling : row
-      );
-    });
-</script>
-</body></html>
-    """,
+    return render_template(
+        "files.html",
         items=all_items,
+        urls=urls,
         current_path=current_path,
         breadcrumbs=breadcrumbs,
         parent_dir=os.path.dirname(current_path),
@@ -5345,10 +3285,10 @@ def upload_to_pixeldrain_file():
     filename = os.path.basename(filepath)
     args = (full_path, filename, progress_queue)
     start_task(upload_to_pixeldrain, args)
-    return render_template_string(FILE_OPERATION_TEMPLATE,
-                                  operation_title=f"Uploading: {filename}",
-                                  download_started=True,
-                                  current_path=current_path)
+    return render_template("file_operation.html",
+                           operation_title=f"Uploading: {filename}",
+                           download_started=True,
+                           current_path=current_path)
 
 
 @app.route("/encode/<path:filepath>")
@@ -5363,18 +3303,18 @@ def encode_page(filepath):
         return redirect(url_for('list_files', current_path=current_path))
     base, _ = os.path.splitext(filepath)
     suggested_output = f"{base}_encoded.mkv"
-    return render_template_string(ENCODE_TEMPLATE,
-                                  filepath=filepath,
-                                  suggested_output=suggested_output,
-                                  download_started=False,
-                                  current_path=current_path,
-                                  codec="av1",
-                                  pass_mode="1-pass",
-                                  crf="45",
-                                  bitrate="",
-                                  audio_bitrate="32",
-                                  force_stereo=True,
-                                  upload_4stream=True)
+    return render_with_etag("encode.html",
+                            filepath=filepath,
+                            suggested_output=suggested_output,
+                            download_started=False,
+                            current_path=current_path,
+                            codec="av1",
+                            pass_mode="1-pass",
+                            crf=default_crf("av1"),
+                            bitrate="",
+                            audio_bitrate="32",
+                            force_stereo=True,
+                            upload_4stream=True)
 
 
 @app.route("/encode/<path:filepath>", methods=["POST"])
@@ -5398,12 +3338,22 @@ def encode_file_post(filepath):
             request.form.get("upload_4stream") == "true",
             request.form.get("upload_gofile") == "true")
     start_task(encode_file, args)
-    return render_template_string(
-        ENCODE_TEMPLATE,
+    # Re-render the form with what was submitted; an empty CRF shows the
+    # codec's default, as on the GET page
+    codec = request.form.get("codec", "av1")
+    return render_template(
+        "encode.html",
         filepath=filepath,
         suggested_output=request.form.get("output_filename"),
         download_started=True,
-        current_path=current_path)
+        current_path=current_path,
+        codec=codec,
+        pass_mode=request.form.get("pass_mode", "1-pass"),
+        crf=default_crf(codec, request.form.get("crf")),
+        bitrate=request.form.get("bitrate", ""),
+        audio_bitrate=request.form.get("audio_bitrate", "32"),
+        force_stereo=request.form.get("force_stereo") == "true",
+        upload_4stream=request.form.get("upload_4stream") == "true")
 
 
 @app.route("/batch_delete", methods=["POST"])
@@ -5439,9 +3389,6 @@ def batch_download():
         flash("No files selected.", "error")
         return redirect(url_for('list_files', current_path=""))
 
-    import zipfile
-    import io
-
     zip_buffer = io.BytesIO()
     with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
         for filepath in files:
@@ -5528,8 +3475,8 @@ def batch_encode():
                     {"error": f"Error encoding {filepath}: {str(e)}"})
 
     start_task(batch_encode_worker, ())
-    return render_template_string(
-        FILE_OPERATION_TEMPLATE,
+    return render_template(
+        "file_operation.html",
         operation_title=f"Batch Encoding {len(files)} file(s)...",
         download_started=True,
         current_path="")
@@ -5561,8 +3508,8 @@ def batch_upload_pixeldrain():
                     {"error": f"Error uploading {filename}: {str(e)}"})
 
     start_task(batch_upload_worker, ())
-    return render_template_string(
-        FILE_OPERATION_TEMPLATE,
+    return render_template(
+        "file_operation.html",
         operation_title=
         f"Batch Uploading {len(files)} file(s) to Pixeldrain...",
         download_started=True,
@@ -5583,8 +3530,8 @@ def upload_to_4stream_file():
     filename = os.path.basename(filepath)
     args = (full_path, filename, progress_queue)
     start_task(upload_to_4stream, args)
-    return render_template_string(
-        FILE_OPERATION_TEMPLATE,
+    return render_template(
+        "file_operation.html",
         operation_title=f"Uploading to 4stream: {filename}",
         download_started=True,
         current_path=current_path)
@@ -5616,8 +3563,8 @@ def batch_upload_4stream():
                     {"error": f"Error uploading {filename}: {str(e)}"})
 
     start_task(batch_upload_worker, ())
-    return render_template_string(
-        FILE_OPERATION_TEMPLATE,
+    return render_template(
+        "file_operation.html",
         operation_title=f"Batch Uploading {len(files)} file(s) to 4stream...",
         download_started=True,
         current_path="")
@@ -5637,8 +3584,8 @@ def upload_to_pixeldrain_file_alt():
     filename = os.path.basename(filepath)
     args = (full_path, filename, progress_queue, PIXELDRAIN_API_KEY_ALT)
     start_task(upload_to_pixeldrain_alt, args)
-    return render_template_string(
-        FILE_OPERATION_TEMPLATE,
+    return render_template(
+        "file_operation.html",
         operation_title=f"Uploading to Pixeldrain 2: {filename}",
         download_started=True,
         current_path=current_path)
@@ -5672,8 +3619,8 @@ def batch_upload_pixeldrain_alt():
                     {"error": f"Error uploading {filename}: {str(e)}"})
 
     start_task(batch_upload_worker, ())
-    return render_template_string(
-        FILE_OPERATION_TEMPLATE,
+    return render_template(
+        "file_operation.html",
         operation_title=
         f"Batch Uploading {len(files)} file(s) to Pixeldrain 2...",
         download_started=True,
@@ -5694,8 +3641,8 @@ def upload_to_4stream_file_alt():
     filename = os.path.basename(filepath)
     args = (full_path, filename, progress_queue, UP4STREAM_API_KEY_ALT)
     start_task(upload_to_4stream_alt, args)
-    return render_template_string(
-        FILE_OPERATION_TEMPLATE,
+    return render_template(
+        "file_operation.html",
         operation_title=f"Uploading to 4stream 2: {filename}",
         download_started=True,
         current_path=current_path)
@@ -5728,8 +3675,8 @@ def batch_upload_4stream_alt():
                     {"error": f"Error uploading {filename}: {str(e)}"})
 
     start_task(batch_upload_worker, ())
-    return render_template_string(
-        FILE_OPERATION_TEMPLATE,
+    return render_template(
+        "file_operation.html",
         operation_title=f"Batch Uploading {len(files)} file(s) to 4stream 2...",
         download_started=True,
         current_path="")
@@ -5752,8 +3699,8 @@ def upload_to_gofile_file():
     filename = os.path.basename(filepath)
     args = (full_path, filename, progress_queue)
     start_task(upload_to_gofile, args)
-    return render_template_string(
-        FILE_OPERATION_TEMPLATE,
+    return render_template(
+        "file_operation.html",
         operation_title=f"Uploading to Gofile: {filename}",
         download_started=True,
         current_path=current_path)
@@ -5775,28 +3722,32 @@ def batch_upload_gofile():
                 upload_to_gofile(full_path, filename, progress_queue)
 
     start_task(batch_upload_worker, ())
-    return render_template_string(
-        FILE_OPERATION_TEMPLATE,
+    return render_template(
+        "file_operation.html",
         operation_title=f"Batch Uploading {len(files)} files to Gofile",
         download_started=True,
         current_path="")
 
 
 
+def render_gofile_manager(items):
+    """Render the Gofile table with each row's size and upload date
+    formatted here, once, rather than by filters in the template loop."""
+    for item in items:
+        item['size_mb'] = round((item.get('size') or 0) / 1048576, 2)
+        item['uploaded'] = format_datetime(item.get('createTime'))
+    return render_template("gofile_manager.html", items=items)
+
+
 @app.route("/gofile_manager")
 @login_required
 def gofile_manager():
     # Load local history first
-    history = []
-    if os.path.exists(GOFILE_HISTORY_FILE):
-        try:
-            with open(GOFILE_HISTORY_FILE, 'r') as f:
-                history = json.load(f)
-        except: pass
+    history = get_gofile_history()
 
     if not GOFILE_API_TOKEN:
         flash("Gofile API Token not configured", "error")
-        return render_template_string(GOFILE_MANAGER_TEMPLATE, items=history)
+        return render_gofile_manager(history)
 
     try:
         # Fetch the dynamic Website Token
@@ -5808,21 +3759,21 @@ def gofile_manager():
 
         # Try to fetch remote files
         # 1. Get account ID from token
-        id_resp = requests.get(
+        id_resp = http_session.get(
             "https://api.gofile.io/accounts/getid",
             headers=headers,
             timeout=5
         )
         if id_resp.status_code == 200:
             account_id = id_resp.json()["data"]["id"]
-            acc_resp = requests.get(
+            acc_resp = http_session.get(
                 f"https://api.gofile.io/accounts/{account_id}",
                 headers=headers,
                 timeout=5
             )
             if acc_resp.status_code == 200:
                 root_folder_id = acc_resp.json()["data"]["rootFolder"]
-                cont_resp = requests.get(
+                cont_resp = http_session.get(
                     f"https://api.gofile.io/contents/{root_folder_id}",
                     headers=headers,
                     timeout=5
@@ -5845,14 +3796,14 @@ def gofile_manager():
                                 remote_items.append(h_item)
                         
                         remote_items.sort(key=lambda x: x.get("createTime", 0), reverse=True)
-                        return render_template_string(GOFILE_MANAGER_TEMPLATE, items=remote_items)
+                        return render_gofile_manager(remote_items)
 
     except Exception as e:
         print(f"Gofile remote sync failed: {e}")
         
     # Fallback to just history
     for item in history: item['is_remote'] = False
-    return render_template_string(GOFILE_MANAGER_TEMPLATE, items=history)
+    return render_gofile_manager(history)
 
 @app.route("/gofile_manager/delete", methods=["POST"])
 @login_required
@@ -5864,7 +3815,7 @@ def gofile_delete():
         
     try:
         # Gofile delete requires contentId and contentIds (plural) sometimes, or just a list
-        resp = requests.delete(
+        resp = http_session.delete(
             "https://api.gofile.io/deleteContent",
             json={"contentsId": [content_id]},
             headers={
@@ -5913,7 +3864,7 @@ def gofile_add_to_local():
         
         if not download_url:
             # Last resort: try to fetch from API (likely to fail for non-premium)
-            resp = requests.get(
+            resp = http_session.get(
                 f"https://api.gofile.io/contents/{file_id}",
                 headers={"Authorization": f"Bearer {GOFILE_API_TOKEN}"},
                 timeout=10
@@ -5954,8 +3905,8 @@ def gofile_add_to_local():
             )
             start_task(download_and_convert, args)
         
-        return render_template_string(
-            FILE_OPERATION_TEMPLATE,
+        return render_template(
+            "file_operation.html",
             operation_title=f"Restoring from Gofile: {filename}",
             download_started=True,
             current_path="")
@@ -5975,11 +3926,11 @@ def trim_page(filepath):
     base, ext = os.path.splitext(os.path.basename(filepath))
     suggested_filename = f"{base}_trimmed{ext}"
     suggested_output = os.path.join(current_path, suggested_filename)
-    return render_template_string(TRIM_TEMPLATE,
-                                  filepath=filepath,
-                                  suggested_output=suggested_output,
-                                  duration=duration,
-                                  current_path=current_path)
+    return render_template("trim.html",
+                           filepath=filepath,
+                           suggested_output=suggested_output,
+                           duration=duration,
+                           current_path=current_path)
 
 
 @app.route("/trim/<path:filepath>", methods=["POST"])
@@ -6029,7 +3980,7 @@ def upload_direct_to_4stream():
     if not file.filename or file.filename == '':
         flash("No selected file.", "error")
         return redirect(url_for('index'))
-    safe_name = secure_filename(file.filename)
+    safe_name = fast_secure_filename(file.filename)
     if not safe_name:
         safe_name = "upload"
     if not safe_name:
@@ -6039,8 +3990,8 @@ def upload_direct_to_4stream():
     file.save(temp_path)
     args = (temp_path, safe_name, progress_queue)
     start_task(upload_to_4stream, args)
-    return render_template_string(
-        FILE_OPERATION_TEMPLATE,
+    return render_template(
+        "file_operation.html",
         operation_title=f"Uploading to 4stream: {safe_name}",
         download_started=True,
         current_path="")
@@ -6048,18 +3999,28 @@ def upload_direct_to_4stream():
 
 @app.route("/stop_encode", methods=["POST"])
 def stop_encode():
-    global current_process
-    if current_process and current_process.poll() is None:
-        try:
-            # Force kill the process (SIGKILL) - don't just terminate
-            current_process.kill()
-            current_process.wait(timeout=2)
-        except Exception as e:
-            print(f"Error killing process: {e}")
-        finally:
-            current_process = None
-            session.pop('task_active', None)
-            session.modified = True
+    # Only the jobs the page names; other users' jobs keep running
+    job_ids = request_job_ids()
+    if not job_ids:
+        return jsonify({
+            "status": "error",
+            "message": "No job id given."
+        }), 400
+    with _running_processes_lock:
+        targets = [
+            p for jid, p in running_processes.items()
+            if p.poll() is None and jid in job_ids
+        ]
+    if targets:
+        for process in targets:
+            try:
+                # Force kill the process (SIGKILL) - don't just terminate
+                process.kill()
+                process.wait(timeout=2)
+            except Exception as e:
+                print(f"Error killing process: {e}")
+        session.pop('task_active', None)
+        session.modified = True
         return jsonify({
             "status": "success",
             "message": "Encoding process stopped."
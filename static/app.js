@@ -0,0 +1,205 @@
+// Main page behaviour: tab switching, the merge tab's progress panel, the
+// global progress modal and the delegated button handler. Values that
+// come from the server are read from data-* attributes on <body>.
+const pageData = document.body.dataset;
+
+function validateYtForm() {
+    const codec = document.getElementById('yt_codec').value;
+    if (codec.includes('h265') || codec.includes('av1')) {
+        const preset = document.getElementById('yt_preset').value;
+        if (!preset) { alert('Please select a preset.'); return false; }
+        const passMode = document.getElementById('yt_pass_mode').value;
+        if (passMode === '2-pass') {
+            const bitrate = document.getElementById('yt_bitrate').value;
+            if (!bitrate || parseInt(bitrate) < 100) { alert('Please specify a valid video bitrate (minimum 100) for 2-pass encoding.'); return false; }
+        }
+    }
+    return true;
+}
+// Called from the delegated click listener with the tab button clicked
+function switchTab(tabName, btnEl) {
+    const tabs = document.querySelectorAll('.tab-content');
+    const btns = document.querySelectorAll('.tab-btn');
+    tabs.forEach(t => t.classList.remove('active'));
+    btns.forEach(b => b.classList.remove('active'));
+    document.getElementById('tab-' + tabName).classList.add('active');
+    btnEl.classList.add('active');
+}
+
+// Format Merge tab
+let mergeUnsubscribe = null;
+let mergeJobs = createJobTracker([]);
+const mergeForm = document.getElementById('merge-form');
+// Looked up once; the SSE handler below only touches these
+const mergeContainer = document.getElementById('merge-progress-container');
+const mergeStage = document.getElementById('merge-progress-stage');
+const mergeBar = document.getElementById('merge-progress-bar-inner');
+const mergeLog = document.getElementById('merge-progress-log');
+const mergeView = createProgressView(mergeStage, mergeBar, mergeLog);
+
+mergeForm.addEventListener('submit', function(e) {
+    if (e.submitter?.value === 'manual_merge') {
+        e.preventDefault();
+        const formData = new FormData(mergeForm);
+        formData.set('action', 'manual_merge');
+
+        mergeContainer.style.display = 'block';
+        mergeLog.textContent = '';
+
+        fetch(mergeForm.getAttribute('action'), { method: 'POST', body: formData, headers: { 'X-Requested-With': 'fetch' } })
+            .then(r => {
+                if (!r.ok) throw new Error('HTTP ' + r.status);
+                return r.json();
+            })
+            .then(data => {
+                addPageJobIds(data.job_ids);
+                mergeJobs = createJobTracker(data.job_ids);
+                startMergeProgressListener();
+            })
+            .catch(err => { mergeLog.textContent = 'Could not start the merge: ' + err.message; });
+    }
+});
+
+function closeMergeStream() {
+    if (mergeUnsubscribe) mergeUnsubscribe();
+    mergeUnsubscribe = null;
+}
+
+function startMergeProgressListener() {
+    closeMergeStream();
+    mergeContainer.style.display = 'block';
+    const view = mergeView, progressBar = mergeBar, jobs = mergeJobs;
+    view.reset();
+
+    mergeUnsubscribe = sseBus.subscribe(function(event) {
+        try {
+            const data = parseProgressEvent(event.data);
+            if (!jobs.accepts(data)) return;
+            if (data.log === 'DONE') {
+                view.setStage('✅ Completed!');
+                progressBar.style.backgroundColor = '#28a745';
+                view.setPercent(100);
+                view.appendLog("\n✅ Operation finished.");
+                closeMergeStream();
+                return;
+            }
+            if (data.error) {
+                view.setStage('❌ Error!');
+                progressBar.style.backgroundColor = '#dc3545';
+                view.appendLog(`\n❌ ERROR: ${data.error}`);
+                closeMergeStream();
+                return;
+            }
+            if (data.stage) view.setStage(data.stage);
+            if (data.percent) view.setPercent(data.percent);
+            if (data.log) view.appendLog(data.log);
+        } catch (e) { console.error('Merge progress error:', e); }
+    }, closeMergeStream);
+}
+
+function stopMergeProgress() {
+    closeMergeStream();
+    navigator.sendBeacon('/stop_process', jobIdParams(mergeJobs.ids()));
+}
+
+function showNotification(message, type = 'info') {
+    const notification = document.createElement('div');
+    notification.className = `notification ${type}`;
+    notification.textContent = message;
+    document.body.appendChild(notification);
+    setTimeout(() => {
+        notification.style.opacity = '0';
+        setTimeout(() => { document.body.removeChild(notification); }, 300);
+    }, 3000);
+}
+
+const globalProgressBtn = document.getElementById('global-progress-btn');
+progressHooks.onError = message => showNotification('Operation failed: ' + message, 'error');
+
+// Set by the download_started block below for the panel it follows
+let stopStartedJob = null;
+
+// Stop requests are fire-and-forget beacons; true means it was queued
+function stopGlobalProcess() {
+    const stage = document.getElementById('global-progress-stage');
+    const ids = pageJobIds();
+    if (!ids.length) {
+        stage.textContent = 'No job to stop.';
+        return;
+    }
+    if (navigator.sendBeacon('/stop_encode', jobIdParams(ids))) {
+        stage.textContent = 'Process stop requested.';
+    }
+}
+
+// One delegated listener for the tab and progress buttons (data-action="...")
+document.body.addEventListener('click', function(e) {
+    const t = e.target.closest('[data-action]');
+    if (!t) return;
+    switch (t.dataset.action) {
+        case 'switch-tab': switchTab(t.dataset.tab, t); break;
+        case 'open-global-progress': openGlobalProgress(); break;
+        case 'close-global-progress': closeGlobalProgressModal(); break;
+        case 'stop-global': stopGlobalProcess(); break;
+        case 'stop-merge': stopMergeProgress(); break;
+        case 'stop-encode-tab': stopEncodeTab(t.dataset.prefix); break;
+        default: return;
+    }
+    if (stopStartedJob && t.id === stopStartedJob.buttonId) stopStartedJob.stop();
+});
+
+document.addEventListener("DOMContentLoaded", function() {
+    if (pageData.taskActive === 'true') {
+        globalProgressBtn.style.display = 'block';
+    }
+
+    if (pageData.downloadStarted === 'true') {
+        var activeTab = pageData.currentTab;
+        var cId = "progress-container", sId = "progress-stage", bId = "progress-bar-inner", lId = "progress-log", stId = "stop-button";
+
+        if (activeTab === "youtube") {
+            cId = "yt-progress-container"; sId = "yt-progress-stage"; bId = "yt-progress-bar-inner"; lId = "yt-progress-log"; stId = "yt-stop-button";
+        } else if (activeTab === "merge") {
+            cId = "merge-progress-container"; sId = "merge-progress-stage"; bId = "merge-progress-bar-inner"; lId = "merge-progress-log"; stId = "merge-stop-button";
+        }
+
+        const progressContainer = document.getElementById(cId);
+        const stage = document.getElementById(sId);
+        const progressBar = document.getElementById(bId);
+        const log = document.getElementById(lId);
+        const view = createProgressView(stage, progressBar, log);
+        const jobs = createJobTracker(pageJobIds());
+
+        if(progressContainer) progressContainer.style.display = 'block';
+        globalProgressBtn.style.display = 'block';
+
+        window.finalUrl = null;
+        let unsubscribe = () => {};
+        // Only open the stream if the job is still running; a job that
+        // already ended can still be reviewed via "View Progress"
+        fetch(pageData.statusUrl + '?' + jobIdParams(jobs.ids())).then(r => r.json()).then(status => {
+            if (!status.active) {
+                if(stage) stage.textContent = 'Job finished. Use "View Progress" for its log.';
+                return;
+            }
+            unsubscribe = sseBus.subscribe(function(event) {
+                handleSseEvent(event, jobs, view, progressBar, unsubscribe, false);
+            }, function(err) {
+                if(stage) stage.textContent = 'Connection error. Please refresh.';
+                unsubscribe();
+                console.error('SSE error:', err);
+            });
+        });
+
+        stopStartedJob = {
+            buttonId: stId,
+            stop() {
+                if (navigator.sendBeacon('/stop_encode', jobIdParams(jobs.ids()))) {
+                    if(stage) stage.textContent = 'Stop requested.';
+                    if(progressBar) progressBar.style.backgroundColor = '#dc3545';
+                    unsubscribe();
+                }
+            },
+        };
+    }
+});
@@ -0,0 +1,137 @@
+// Encode page (templates/encode.html): codec/preset options,
+// form validation and the progress panels. Per-request values come
+// from data-* attributes on <body>.
+const pageData = document.body.dataset;
+
+const codecSelect = document.getElementById('codec');
+const presetSelect = document.getElementById('preset');
+const crfInput = document.getElementById('crf');
+const passModeSelect = document.getElementById('pass_mode');
+const bitrateInput = document.getElementById('bitrate');
+const aqModeSelect = document.getElementById('aq_mode');
+const varianceBoostInput = document.getElementById('variance_boost');
+const tilesSelect = document.getElementById('tiles');
+// Preset option lists rendered by the server (_preset_templates.html)
+const av1Presets = document.getElementById('av1-presets');
+const x265Presets = document.getElementById('x265-presets');
+
+function updatePresetOptions() {
+    const codec = codecSelect.value;
+    const encodingOptions = document.getElementById('encoding-options');
+    const videoEncodingOptions = document.getElementById('video-encoding-options');
+    const audioEncodingOptions = document.getElementById('audio-encoding-options');
+    encodingOptions.style.display = codec !== 'none' ? 'block' : 'none';
+    if (codec === 'copy_video') {
+        videoEncodingOptions.style.display = 'none'; audioEncodingOptions.style.display = 'block';
+    } else if (codec.endsWith('_copy_audio')) {
+        videoEncodingOptions.style.display = 'block'; audioEncodingOptions.style.display = 'none';
+    } else if (codec !== 'none') {
+        videoEncodingOptions.style.display = 'block'; audioEncodingOptions.style.display = 'block';
+    }
+    if (codec === 'av1' || codec === 'av1_copy_audio') {
+        presetSelect.replaceChildren(av1Presets.content.cloneNode(true));
+        crfInput.placeholder = 'e.g., 45 for AV1';
+        aqModeSelect.disabled = false; varianceBoostInput.disabled = false; tilesSelect.disabled = false;
+    } else if (codec === 'h265' || codec === 'h265_copy_audio') {
+        presetSelect.replaceChildren(x265Presets.content.cloneNode(true));
+        crfInput.placeholder = 'e.g., 28 for H.265';
+        aqModeSelect.disabled = true; varianceBoostInput.disabled = true; tilesSelect.disabled = true;
+    } else {
+        presetSelect.replaceChildren();
+        aqModeSelect.disabled = true; varianceBoostInput.disabled = true; tilesSelect.disabled = true;
+    }
+    if (codec === 'none') {
+        bitrateInput.removeAttribute('required'); bitrateInput.removeAttribute('min'); bitrateInput.value = '';
+    } else {
+        bitrateInput.setAttribute('min', '100');
+        if (passModeSelect.value === '2-pass') bitrateInput.setAttribute('required', 'required');
+        else bitrateInput.removeAttribute('required');
+    }
+}
+function validateEncodeForm() {
+    const codec = codecSelect.value;
+    if (codec.includes('h265') || codec.includes('av1')) {
+        if (!presetSelect.value) { alert('Please select a preset.'); return false; }
+        if (passModeSelect.value === '2-pass' && (!bitrateInput.value || parseInt(bitrateInput.value) < 100)) { alert('Please specify a valid video bitrate for 2-pass encoding.'); return false; }
+        if (codec.includes('av1')) {
+            const varianceBoost = parseInt(varianceBoostInput.value);
+            if (isNaN(varianceBoost) || varianceBoost < 0 || varianceBoost > 3) { alert('Variance Boost must be between 0 and 3.'); return false; }
+        }
+    }
+    return true;
+}
+document.getElementById('encode-form').addEventListener('submit', function(e) {
+    if (!validateEncodeForm()) e.preventDefault();
+});
+codecSelect.addEventListener('change', updatePresetOptions);
+passModeSelect.addEventListener('change', function() {
+    if (codecSelect.value !== 'none') {
+        if (this.value === '2-pass') bitrateInput.setAttribute('required', 'required');
+        else bitrateInput.removeAttribute('required');
+    }
+});
+document.addEventListener('DOMContentLoaded', updatePresetOptions);
+
+const globalProgressBtn = document.getElementById('global-progress-btn');
+
+// Unsubscribes the inline panel from /progress (set once it subscribes)
+let closeInlineStream = null;
+
+function stopEncode(fromModal) {
+    fetch('/stop_encode', { method: 'POST', body: jobIdParams(pageJobIds()) }).then(response => {
+        if (!response.ok) return;
+        if (fromModal) {
+            document.getElementById('global-progress-stage').textContent = 'Process stop requested.';
+            return;
+        }
+        document.getElementById('progress-stage').textContent = 'Encoding stopped.';
+        document.getElementById('progress-bar-inner').style.backgroundColor = '#dc3545';
+        if (closeInlineStream) closeInlineStream();
+    });
+}
+
+// One delegated listener for the page's data-action buttons
+document.addEventListener('click', function(e) {
+    const btn = e.target.closest('[data-action]');
+    if (!btn) return;
+    switch (btn.dataset.action) {
+        case 'open-global-progress':
+            openGlobalProgress();
+            break;
+        case 'close-global-progress':
+            closeGlobalProgressModal();
+            break;
+        case 'stop-encode':
+            stopEncode(btn.id === 'global-stop-button');
+            break;
+    }
+});
+
+document.addEventListener("DOMContentLoaded", function() {
+    if (pageData.taskActive === 'true') {
+        globalProgressBtn.style.display = 'block';
+    }
+
+    if (pageData.downloadStarted === 'true') {
+        const progressContainer = document.getElementById('progress-container');
+        const stage = document.getElementById('progress-stage');
+        const progressBar = document.getElementById('progress-bar-inner');
+        const view = createProgressView(stage, progressBar,
+                                        document.getElementById('progress-log'));
+
+        progressContainer.style.display = 'block';
+        globalProgressBtn.style.display = 'block';
+
+        window.finalUrl = null;
+        let unsubscribe = null;
+        const closeStream = () => { if (unsubscribe) { unsubscribe(); unsubscribe = null; } };
+        const jobs = createJobTracker(pageJobIds());
+        unsubscribe = sseBus.subscribe(
+            event => handleSseEvent(event, jobs, view, progressBar, closeStream, false),
+            () => {
+                stage.textContent = 'Connection error. Please refresh.';
+                closeStream();
+            });
+        closeInlineStream = closeStream;
+    }
+});
@@ -0,0 +1,162 @@
+// Codec/preset handling and inline progress for the Advanced ('') and YouTube ('yt_') tabs
+
+// Stop handlers per tab prefix, called from the page's delegated click listener
+const encodeTabStops = {};
+
+function stopEncodeTab(p) {
+    if (encodeTabStops[p]) encodeTabStops[p]();
+}
+
+function bindEncodeTab(p, formId) {
+    const h = p.replace('_', '-');
+    const $ = id => document.getElementById(id);
+    const codecSelect = $(p + 'codec');
+
+    if (codecSelect) {
+        const presetSelect = $(p + 'preset');
+        const crfInput = $(p + 'crf');
+        const passModeSelect = $(p + 'pass_mode');
+        const bitrateInput = $(p + 'bitrate');
+        const aqModeSelect = $(p + 'aq_mode');
+        const varianceBoostInput = $(p + 'variance_boost');
+        const tilesSelect = $(p + 'tiles');
+        const av1Presets = $('av1-presets');
+        const x265Presets = $('x265-presets');
+
+        function updatePresetOptions() {
+            const codec = codecSelect.value;
+            const encodingOptions = $(h + 'encoding-options');
+            const videoEncodingOptions = $(h + 'video-encoding-options');
+            const audioEncodingOptions = $(h + 'audio-encoding-options');
+            encodingOptions.style.display = codec !== 'none' ? 'block' : 'none';
+            if (codec === 'copy_video') {
+                videoEncodingOptions.style.display = 'none';
+                audioEncodingOptions.style.display = 'block';
+            } else if (codec.endsWith('_copy_audio')) {
+                videoEncodingOptions.style.display = 'block';
+                audioEncodingOptions.style.display = 'none';
+            } else if (codec !== 'none') {
+                videoEncodingOptions.style.display = 'block';
+                audioEncodingOptions.style.display = 'block';
+            }
+
+            if (codec === 'av1' || codec === 'av1_copy_audio') {
+                presetSelect.replaceChildren(av1Presets.content.cloneNode(true));
+                crfInput.placeholder = 'e.g., 45 for AV1';
+                aqModeSelect.disabled = false; varianceBoostInput.disabled = false; tilesSelect.disabled = false;
+            } else if (codec === 'h265' || codec === 'h265_copy_audio') {
+                presetSelect.replaceChildren(x265Presets.content.cloneNode(true));
+                crfInput.placeholder = 'e.g., 28 for H.265';
+                aqModeSelect.disabled = true; varianceBoostInput.disabled = true; tilesSelect.disabled = true;
+            } else {
+                presetSelect.replaceChildren();
+                aqModeSelect.disabled = true; varianceBoostInput.disabled = true; tilesSelect.disabled = true;
+            }
+
+            if (codec === 'none') {
+                bitrateInput.removeAttribute('required');
+                bitrateInput.removeAttribute('min');
+                bitrateInput.value = '';
+            } else {
+                bitrateInput.setAttribute('min', '100');
+                if (passModeSelect.value === '2-pass') {
+                    bitrateInput.setAttribute('required', 'required');
+                } else {
+                    bitrateInput.removeAttribute('required');
+                }
+            }
+        }
+        codecSelect.addEventListener('change', updatePresetOptions);
+        passModeSelect.addEventListener('change', function() {
+            if (codecSelect.value !== 'none') {
+                if (this.value === '2-pass') bitrateInput.setAttribute('required', 'required');
+                else bitrateInput.removeAttribute('required');
+            }
+        });
+        updatePresetOptions();
+    }
+
+    let unsubscribe = null;
+    let jobs = createJobTracker([]);
+    const form = $(formId);
+    // getAttribute: the submit buttons are named "action" and shadow form.action
+    const postUrl = form.getAttribute('action');
+    const container = $(h + 'progress-container');
+    const stage = $(h + 'progress-stage');
+    const progressBar = $(h + 'progress-bar-inner');
+    const log = $(h + 'progress-log');
+    const view = createProgressView(stage, progressBar, log);
+
+    function closeStream() {
+        if (unsubscribe) unsubscribe();
+        unsubscribe = null;
+    }
+
+    function startProgressListener() {
+        closeStream();
+        container.style.display = 'block';
+
+        unsubscribe = sseBus.subscribe(function(event) {
+            try {
+                const data = parseProgressEvent(event.data);
+                if (!jobs.accepts(data)) return;
+                if (data.log === 'DONE') {
+                    view.setStage('✅ Completed!');
+                    progressBar.style.backgroundColor = '#28a745';
+                    view.setPercent(100);
+                    view.appendLog("\n✅ Operation finished.");
+                    closeStream();
+                    return;
+                }
+                if (data.error) {
+                    view.setStage('❌ Error!');
+                    progressBar.style.backgroundColor = '#dc3545';
+                    view.appendLog(`\n❌ ERROR: ${data.error}`);
+                    closeStream();
+                    return;
+                }
+                if (data.stage) view.setStage(data.stage);
+                if (data.percent) view.setPercent(data.percent);
+                if (data.log) view.appendLog(data.log);
+            } catch (e) { console.error('Progress error:', e); }
+        }, closeStream);
+    }
+
+    form.addEventListener('submit', function(e) {
+        const action = e.submitter?.value;
+        if (action === p + 'download') {
+            e.preventDefault();
+            const formData = new FormData(form);
+            formData.set('action', p + 'download');
+            container.style.display = 'block';
+            view.reset();
+            // The server answers 202 as soon as the job is queued and keeps
+            // its events for late subscribers, so listen once it has answered
+            fetch(postUrl, { method: 'POST', body: formData, headers: { 'X-Requested-With': 'fetch' } })
+                .then(r => {
+                    if (!r.ok) throw new Error('HTTP ' + r.status);
+                    return r.json();
+                })
+                .then(data => {
+                    // Follow (and stop) only the jobs this submit started
+                    addPageJobIds(data.job_ids);
+                    jobs = createJobTracker(data.job_ids);
+                    startProgressListener();
+                })
+                .catch(err => {
+                    view.setStage('❌ Error!');
+                    view.appendLog('Could not start the job: ' + err.message);
+                });
+        }
+    });
+
+    encodeTabStops[p] = function() {
+        closeStream();
+        navigator.sendBeacon('/stop_process', jobIdParams(jobs.ids()));
+    };
+}
+
+document.addEventListener('DOMContentLoaded', function() {
+    bindEncodeTab('', 'download-form');
+    bindEncodeTab('yt_', 'youtube-form');
+});
@@ -0,0 +1,74 @@
+// File-operation progress page (templates/file_operation.html): the
+// inline progress panel, stop buttons and batch-encode hooks; frame
+// handling and the modal are in progress_view.js. Per-request values
+// come from data-* attributes on <body>.
+const pageData = document.body.dataset;
+const globalProgressBtn = document.getElementById('global-progress-btn');
+
+// Batch-encode extras carried on the progress frames
+progressHooks.onEvent = function(data) {
+    if (data.file_info) {
+        const batchSection = document.getElementById('batch-info-section');
+        if (batchSection) {
+            batchSection.style.display = 'block';
+            batchSection.innerHTML = data.file_info;
+        }
+    }
+    if (data.batch_encode_status) {
+        const batchStopBtn = document.getElementById('batch-stop-button');
+        if (batchStopBtn) batchStopBtn.style.display = 'block';
+    }
+};
+
+function stopEncode(fromModal) {
+    fetch('/stop_encode', { method: 'POST', body: jobIdParams(pageJobIds()) }).then(response => {
+        if (!response.ok) return;
+        if (fromModal) {
+            document.getElementById('global-progress-stage').textContent = 'Process stop requested.';
+            return;
+        }
+        document.getElementById('progress-stage').textContent = 'Batch encoding stop requested.';
+        document.getElementById('progress-bar-inner').style.backgroundColor = '#dc3545';
+    });
+}
+
+// One delegated listener for the page's data-action buttons
+document.addEventListener('click', function(e) {
+    const btn = e.target.closest('[data-action]');
+    if (!btn) return;
+    switch (btn.dataset.action) {
+        case 'open-global-progress':
+            openGlobalProgress();
+            break;
+        case 'close-global-progress':
+            closeGlobalProgressModal();
+            break;
+        case 'stop-encode':
+            stopEncode(btn.id === 'global-stop-button');
+            break;
+    }
+});
+
+document.addEventListener("DOMContentLoaded", function() {
+    if (pageData.taskActive === 'true') {
+        globalProgressBtn.style.display = 'block';
+    }
+
+    if (pageData.downloadStarted === 'true') {
+        const stage = document.getElementById('progress-stage');
+        const progressBar = document.getElementById('progress-bar-inner');
+        const view = createProgressView(stage, progressBar,
+                                        document.getElementById('progress-log'));
+        globalProgressBtn.style.display = 'block';
+        window.finalUrl = null;
+        let unsubscribe = null;
+        const closeStream = () => { if (unsubscribe) { unsubscribe(); unsubscribe = null; } };
+        const jobs = createJobTracker(pageJobIds());
+        unsubscribe = sseBus.subscribe(
+            event => handleSseEvent(event, jobs, view, progressBar, closeStream, false),
+            () => {
+                stage.textContent = 'Connection error. Please refresh.';
+                closeStream();
+            });
+    }
+});
@@ -0,0 +1,340 @@
+// Progress panel helpers.
+//
+// Batched writer for a progress panel (stage heading, bar, log <pre>).
+// SSE handlers call it as often as events arrive; the DOM is touched at
+// most once per animation frame, with stage/percent coalesced to the
+// latest value and buffered log lines appended as one DocumentFragment.
+// The log keeps one text node per line and is capped at MAX_LOG_LINES;
+// logs marked class="vlist" are virtualized instead (see createVirtualLog).
+const MAX_LOG_LINES = 500;
+const VLIST_MAX_LINES = 20000;
+const VLIST_OVERSCAN = 10;
+const virtualLogs = new WeakMap();
+
+// Virtualized log: every line is kept in an array, but only the rows in
+// view (plus some overscan) are in the DOM, positioned over a spacer as
+// tall as the full log. One instance per element, shared by all views.
+function createVirtualLog(el) {
+    if (virtualLogs.has(el)) return virtualLogs.get(el);
+    const lines = [];
+    el.textContent = '';
+    const spacer = el.appendChild(document.createElement('div'));
+    const rows = spacer.appendChild(document.createElement('div'));
+    spacer.className = 'vlist-spacer';
+    rows.className = 'vlist-rows';
+    let lineHeight = 0;
+    let scheduled = false;
+
+    function render(stickToBottom) {
+        scheduled = false;
+        if (!lineHeight) lineHeight = parseFloat(getComputedStyle(el).lineHeight) || 16;
+        spacer.style.height = (lines.length * lineHeight) + 'px';
+        if (stickToBottom) el.scrollTop = el.scrollHeight;
+        const first = Math.max(0, Math.floor(el.scrollTop / lineHeight) - VLIST_OVERSCAN);
+        const count = Math.ceil(el.clientHeight / lineHeight) + 2 * VLIST_OVERSCAN;
+        rows.style.transform = `translateY(${first * lineHeight}px)`;
+        rows.textContent = lines.slice(first, first + count).join('\n');
+    }
+
+    el.addEventListener('scroll', function() {
+        if (scheduled) return;
+        scheduled = true;
+        requestAnimationFrame(() => render(false));
+    }, { passive: true });
+
+    const vlog = {
+        push(newLines) {
+            for (const line of newLines) lines.push(line);
+            if (lines.length > VLIST_MAX_LINES) lines.splice(0, lines.length - VLIST_MAX_LINES);
+        },
+        clear() {
+            lines.length = 0;
+            render(false);
+        },
+        render,
+    };
+    virtualLogs.set(el, vlog);
+    return vlog;
+}
+
+function createProgressView(stage, progressBar, log) {
+    let pendingStage = null;
+    let pendingPercent = null;
+    let pendingLog = [];
+    let scheduled = false;
+    // Last values written, so repeated ticks don't touch the DOM
+    let lastStage = null;
+    let lastPct = -1;
+    // Follow new lines only while the user hasn't scrolled up; measured in
+    // the scroll handler so flush() never reads layout for it
+    let stickToBottom = true;
+    const vlog = log && log.classList.contains('vlist') ? createVirtualLog(log) : null;
+    const maxLines = vlog ? VLIST_MAX_LINES : MAX_LOG_LINES;
+    if (log) {
+        log.addEventListener('scroll', function() {
+            stickToBottom = log.scrollTop + log.clientHeight >= log.scrollHeight - 20;
+        }, { passive: true });
+    }
+
+    function flush() {
+        scheduled = false;
+        if (pendingStage !== null && pendingStage !== lastStage && stage) {
+            // Reuse the heading's text node rather than replacing it
+            if (stage.firstChild) stage.firstChild.nodeValue = pendingStage;
+            else stage.textContent = pendingStage;
+            lastStage = pendingStage;
+        }
+        if (pendingPercent !== null && progressBar) {
+            // Compare at the displayed precision (one decimal)
+            const rounded = Math.round(pendingPercent * 10);
+            if (rounded !== lastPct) {
+                const text = (rounded / 10).toFixed(1) + '%';
+                progressBar.style.width = (rounded / 10) + '%';
+                if (progressBar.firstChild) progressBar.firstChild.nodeValue = text;
+                else progressBar.textContent = text;
+                lastPct = rounded;
+            }
+        }
+        if (vlog && pendingLog.length) {
+            vlog.push(pendingLog);
+            vlog.render(stickToBottom);
+        } else if (log && pendingLog.length) {
+            const frag = document.createDocumentFragment();
+            for (const line of pendingLog) frag.appendChild(document.createTextNode(line + '\n'));
+            log.appendChild(frag);
+            // Drop the oldest lines so the <pre> never grows past the cap
+            let excess = log.childNodes.length - MAX_LOG_LINES;
+            while (excess-- > 0) log.removeChild(log.firstChild);
+            // Single layout read, after all writes of this frame
+            if (stickToBottom) log.scrollTop = log.scrollHeight;
+        }
+        pendingStage = pendingPercent = null;
+        pendingLog = [];
+    }
+
+    function schedule() {
+        if (scheduled) return;
+        scheduled = true;
+        requestAnimationFrame(flush);
+    }
+
+    return {
+        setStage(text) { pendingStage = text; schedule(); },
+        setPercent(percent) { pendingPercent = Math.min(100, percent); schedule(); },
+        // Append a log line, or the list of lines the server batched into
+        // one event (the newline is added on flush)
+        appendLog(lines) {
+            if (Array.isArray(lines)) {
+                for (const line of lines) pendingLog.push(line);
+            } else {
+                pendingLog.push(lines);
+            }
+            if (pendingLog.length > maxLines) pendingLog.splice(0, pendingLog.length - maxLines);
+            schedule();
+        },
+        reset() {
+            pendingStage = pendingPercent = null;
+            pendingLog = [];
+            lastStage = null;
+            lastPct = -1;
+            stickToBottom = true;
+            if (vlog) vlog.clear();
+            else if (log) log.textContent = '';
+        },
+    };
+}
+
+// Decode one /progress message. Coalesced ticks arrive as
+// "P|<percent>|<job_id>|<stage>" plus one line per log line and are split
+// by hand; everything else is "J|<json>".
+function parseProgressEvent(s) {
+    if (s.charCodeAt(0) !== 80) return JSON.parse(s.slice(2)); // not 'P'
+    const nl = s.indexOf('\n');
+    const head = nl < 0 ? s : s.slice(0, nl);
+    const i1 = head.indexOf('|', 2);
+    const i2 = head.indexOf('|', i1 + 1);
+    const data = {};
+    if (i1 > 2) data.percent = parseFloat(head.slice(2, i1));
+    if (i2 > i1 + 1) data.job_id = head.slice(i1 + 1, i2);
+    if (i2 + 1 < head.length) data.stage = head.slice(i2 + 1);
+    if (nl >= 0) data.log = s.slice(nl + 1).split('\n');
+    return data;
+}
+
+// One shared EventSource on /progress for every panel on the page.
+// subscribe(onMessage, onError) returns an unsubscribe function; the
+// connection opens with the first subscriber and closes with the last.
+const sseBus = (() => {
+    let es = null;
+    const subs = new Map();
+
+    function close() {
+        if (es) es.close();
+        es = null;
+    }
+
+    return {
+        subscribe(onMessage, onError) {
+            if (!es) {
+                es = new EventSource('/progress');
+                es.onmessage = e => subs.forEach((_, fn) => fn(e));
+                // While the browser is retrying (it resends Last-Event-ID and
+                // the server replays only what was missed) keep subscribers;
+                // report the error once the connection is given up on
+                es.onerror = e => {
+                    if (es && es.readyState !== EventSource.CLOSED) return;
+                    for (const [, errFn] of [...subs]) if (errFn) errFn(e);
+                };
+            }
+            subs.set(onMessage, onError);
+            return () => {
+                subs.delete(onMessage);
+                if (!subs.size) close();
+            };
+        },
+    };
+})();
+
+// The jobs a panel follows. Frames from other jobs (other tabs, other
+// users) are dropped, and the panel only ends once every job it follows
+// has sent DONE or an error. With no ids every frame is accepted.
+function createJobTracker(ids) {
+    const all = new Set(ids);
+    const pending = new Set(ids);
+    const percents = new Map();
+    let failed = false;
+    return {
+        ids: () => [...all],
+        accepts: data => !all.size || all.has(data.job_id),
+        // Overall percent: the mean over the followed jobs, so several
+        // jobs on one bar don't make it jump between their values
+        percent(data) {
+            if (all.size < 2) return data.percent;
+            percents.set(data.job_id, data.percent);
+            let sum = 0;
+            for (const id of all) sum += percents.get(id) || 0;
+            return sum / all.size;
+        },
+        // Mark the frame's job as ended; true once none are left running
+        finish(data) {
+            if (data.error) failed = true;
+            percents.set(data.job_id, 100);
+            pending.delete(data.job_id);
+            return !pending.size;
+        },
+        failed: () => failed,
+    };
+}
+
+// Job ids of the request that rendered the page (data-job-ids on <body>),
+// plus any added by fetch() submits since. "View Progress" and the global
+// stop button cover all of them.
+function pageJobIds() {
+    return (document.body.dataset.jobIds || '').split(',').filter(Boolean);
+}
+
+function addPageJobIds(ids) {
+    document.body.dataset.jobIds = [...new Set([...pageJobIds(), ...ids])].join(',');
+}
+
+// Query/form parameters naming jobs, for /progress/status and
+// /stop_encode (which refuses a stop request without one)
+function jobIdParams(ids) {
+    const params = new URLSearchParams();
+    for (const id of ids) params.append('job_id', id);
+    return params;
+}
+
+// Page hooks for handleSseEvent: onEvent(data) sees each frame of the
+// followed jobs (file_info, batch status, ...), onError(message) each job
+// error. Pages set only the ones they need.
+const progressHooks = { onEvent: null, onError: null };
+
+// Where a finished job sends the inline panel: the operation-complete
+// page when a job reported a final_url, otherwise the page's file list
+// (data-complete-url / data-files-url on <body>)
+function completionUrl() {
+    const pageData = document.body.dataset;
+    if (!window.finalUrl) return pageData.filesUrl;
+    return pageData.completeUrl + "?url=" + encodeURIComponent(window.finalUrl);
+}
+
+// Apply one /progress frame to a panel. The inline panel redirects once
+// all its jobs are done; the "View Progress" modal just closes.
+function handleSseEvent(event, jobs, view, progressBar, closeStream, isGlobalModal) {
+    try {
+        const data = parseProgressEvent(event.data);
+        if (!jobs.accepts(data)) return;
+        if (data.final_url) { window.finalUrl = data.final_url; }
+
+        if (data.error) {
+            view.appendLog(`\nERROR: ${data.error}`);
+            if (progressHooks.onError) progressHooks.onError(data.error);
+        }
+        if (data.log === 'DONE' || data.error) {
+            // Wait for the rest of the page's jobs before finishing
+            if (!jobs.finish(data)) return;
+            closeStream();
+            document.getElementById('global-progress-btn').style.display = 'none';
+            if (jobs.failed()) {
+                view.setStage('❌ Error!');
+                progressBar.style.backgroundColor = '#dc3545';
+                return;
+            }
+            view.setStage('✅ Completed!');
+            progressBar.style.backgroundColor = '#28a745';
+            view.appendLog("\nOperation finished. Redirecting...");
+
+            if (!isGlobalModal) {
+                const redirectTarget = completionUrl();
+                setTimeout(() => { window.location.href = redirectTarget; }, 2000);
+            } else {
+                setTimeout(closeGlobalProgressModal, 3000);
+            }
+            return;
+        }
+
+        if (data.stage) view.setStage(data.stage);
+        if (data.percent) view.setPercent(jobs.percent(data));
+        if (progressHooks.onEvent) progressHooks.onEvent(data);
+        if (data.log) view.appendLog(data.log);
+    } catch (e) {
+        console.error('Error parsing SSE data:', e);
+    }
+}
+
+// The "View Progress" modal (#global-progress-*), following every job in
+// data-job-ids over the page's shared /progress connection
+let globalView = null;
+let globalUnsubscribe = null;
+
+function closeGlobalStream() {
+    if (globalUnsubscribe) globalUnsubscribe();
+    globalUnsubscribe = null;
+}
+
+function closeGlobalProgressModal() {
+    document.getElementById('global-progress-modal').style.display = 'none';
+    closeGlobalStream();
+}
+
+function openGlobalProgress() {
+    const stage = document.getElementById('global-progress-stage');
+    const progressBar = document.getElementById('global-progress-bar-inner');
+    if (!globalView) {
+        globalView = createProgressView(stage, progressBar,
+                                        document.getElementById('global-progress-log'));
+    }
+    document.getElementById('global-progress-modal').style.display = 'block';
+    closeGlobalStream();
+    globalView.reset();
+    globalView.appendLog('Connecting to progress stream...');
+
+    const jobs = createJobTracker(pageJobIds());
+    globalUnsubscribe = sseBus.subscribe(
+        event => handleSseEvent(event, jobs, globalView, progressBar, closeGlobalStream, true),
+        () => {
+            stage.textContent = 'Connection error. Please refresh.';
+            closeGlobalStream();
+        });
+}
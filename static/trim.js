@@ -0,0 +1,83 @@
+// Trim page (templates/trim.html): two-handle range slider for the
+// start/end points.
+function formatTime(seconds) {
+    let h = Math.floor(seconds / 3600);
+    let m = Math.floor((seconds % 3600) / 60);
+    let s = Math.floor(seconds % 60);
+    return `${h.toString().padStart(2, '0')}:${m.toString().padStart(2, '0')}:${s.toString().padStart(2, '0')}`;
+}
+
+let minRangeValueGap = 1;
+const range = document.getElementById("range_track");
+const minval = document.querySelector(".minvalue");
+const maxval = document.querySelector(".maxvalue");
+const rangeInput = document.querySelectorAll("input[type='range']");
+
+// Read phase: every input value/max the redraw needs, plus the slider
+// width (bubble offsets are in px, as transform % is of the bubble itself)
+const readRange = () => {
+    const minRange = parseInt(rangeInput[0].value);
+    const maxRange = parseInt(rangeInput[1].value);
+    const minPercentage = (minRange / rangeInput[0].max) * 100;
+    const maxPercentage = 100 - (maxRange / rangeInput[1].max) * 100;
+    const width = minval.parentElement.clientWidth;
+    return { minRange, maxRange, minPercentage, maxPercentage, width };
+};
+
+// Write phase: outputs, track fill and bubbles from the numbers alone. The
+// bubbles stay anchored at the slider ends and move by transform only, so
+// a redraw needs no layout. They have no transition: each frame's position
+// is final, and easing it would leave the bubbles trailing the thumb.
+const applyRange = ({ minRange, maxRange, minPercentage, maxPercentage, width }) => {
+    minval.textContent = formatTime(minRange);
+    maxval.textContent = formatTime(maxRange);
+    range.style.left = minPercentage + "%";
+    range.style.right = maxPercentage + "%";
+    minval.style.transform = `translate3d(calc(${width * minPercentage / 100}px - ${minPercentage / 2}%), -100%, 0)`;
+    maxval.style.transform = `translate3d(calc(${maxPercentage / 2}% - ${width * maxPercentage / 100}px), 100%, 0)`;
+};
+
+// Drags fire "input" far more often than frames, so redraws are coalesced
+// to one per frame, all reads ahead of all writes
+let drawPending = false;
+const drawRange = () => {
+    drawPending = false;
+    applyRange(readRange());
+};
+const scheduleDraw = () => {
+    if (drawPending) return;
+    drawPending = true;
+    requestAnimationFrame(drawRange);
+};
+
+drawRange();
+
+// No slider handler calls preventDefault(), so all of them are registered
+// passive and never hold up scrolling or touch panning
+rangeInput.forEach((input) => {
+    input.addEventListener("input", (e) => {
+        // Keep the handles apart right away (values only, no layout) and
+        // leave the drawing to the next frame
+        const minValue = parseInt(rangeInput[0].value);
+        const maxValue = parseInt(rangeInput[1].value);
+        if (maxValue - minValue < minRangeValueGap) {
+            if (e.target.className === "min") rangeInput[0].value = maxValue - minRangeValueGap;
+            else rangeInput[1].value = minValue + minRangeValueGap;
+            e.target.style.zIndex = "2";
+        }
+        scheduleDraw();
+    }, { passive: true });
+});
+
+// Promote the bubbles to their own layer only while a handle is held
+rangeInput.forEach((input) => {
+    input.addEventListener("pointerdown", () => {
+        minval.style.willChange = maxval.style.willChange = "transform";
+    }, { passive: true });
+    const release = () => { minval.style.willChange = maxval.style.willChange = "auto"; };
+    input.addEventListener("pointerup", release, { passive: true });
+    input.addEventListener("pointercancel", release, { passive: true });
+});
+
+// The px offsets depend on the slider width
+window.addEventListener("resize", scheduleDraw, { passive: true });